@@ -0,0 +1,57 @@
+"""
+Throughput of `render_batch` for report-sized batches.
+
+Renders 200 figures of 2000 samples with 20 saved tooltips each to HTML, with
+1 to N worker processes, the figures being built by a factory in the workers.
+
+Usage:
+    python benchmarks/bench_batch_render.py
+"""
+
+import functools
+import os
+import tempfile
+
+import numpy as np
+import plotly.graph_objects as go
+
+import dash_tooltip
+from dash_tooltip import BatchJob, render_batch
+
+N_FIGURES = 200
+N_SAMPLES = 2000
+N_TOOLTIPS = 20
+
+
+def build_figure(seed: int) -> go.Figure:
+    y = np.random.default_rng(seed).normal(size=N_SAMPLES).cumsum()
+    return go.Figure(go.Scatter(x=np.arange(N_SAMPLES), y=y))
+
+
+def saved_points(seed: int):
+    step = N_SAMPLES // N_TOOLTIPS
+    y = np.random.default_rng(seed).normal(size=N_SAMPLES).cumsum()
+    return [
+        {"curveNumber": 0, "pointNumber": i, "x": i, "y": float(y[i])}
+        for i in range(0, N_SAMPLES, step)
+    ]
+
+
+def main() -> None:
+    print(f"dash_tooltip from {dash_tooltip.__file__}")
+    jobs = [
+        BatchJob(f"figure{i}", functools.partial(build_figure, i), saved_points(i))
+        for i in range(N_FIGURES)
+    ]
+    counts = sorted({1, 2, os.cpu_count() or 1})
+    print(f"{'processes':>10} {'time (s)':>10} {'figures/s':>10}")
+    for processes in counts:
+        with tempfile.TemporaryDirectory() as output_dir:
+            report = render_batch(
+                jobs, output_dir, template="%{x}: %{y:.2f}", processes=processes
+            )
+        print(f"{processes:>10} {report.seconds:>10.2f} {report.throughput:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Size of the clientside code and callback dependencies sent to the browser.
+
+Measures, for apps with 1 to 1000 tooltip-enabled graphs using the clientside
+features (hover preview, edit sync, zoom clustering, controls, coalesced
+clicks), the bytes of inline scripts embedded in the index page, of the
+`_dash-dependencies` payload, of the `_dash-layout` payload with its number of
+stores, and of the static scripts of dash_tooltip, which browsers cache.
+
+Usage:
+    python benchmarks/bench_clientside_payload.py
+"""
+
+import json
+import os
+
+import plotly
+from dash import Dash, dcc, html
+from dash.development.base_component import ComponentRegistry
+
+import dash_tooltip
+from dash_tooltip import tooltip, tooltip_controls
+
+GRAPH_COUNTS = (1, 10, 100, 1000)
+
+
+def measure(n_graphs: int):
+    app = Dash(__name__)
+    graph_ids = [f"bench-payload-{n_graphs}-{i}" for i in range(n_graphs)]
+    children = []
+    for graph_id in graph_ids:
+        children += [dcc.Graph(id=graph_id), tooltip_controls(graph_id)]
+    app.layout = html.Div(children)
+    tooltip(
+        app,
+        graph_ids=graph_ids,
+        hover_enrich=lambda graph_id, point: None,
+        coalesce_clicks=True,
+        sync_edits=True,
+        cluster_grid=8,
+    )
+    inline = sum(len(script.encode()) for script in app._inline_scripts)
+    dependencies = len(
+        json.dumps(app._callback_list, cls=plotly.utils.PlotlyJSONEncoder).encode()
+    )
+    layout = len(json.dumps(app.layout, cls=plotly.utils.PlotlyJSONEncoder).encode())
+    stores = sum(isinstance(child, dcc.Store) for child in app.layout.children)
+    return inline, dependencies, layout, stores
+
+
+def static_size() -> int:
+    if "dash_tooltip" not in ComponentRegistry.registry:
+        return 0
+    folder = os.path.dirname(dash_tooltip.__file__)
+    return sum(
+        os.path.getsize(os.path.join(folder, resource["relative_package_path"]))
+        for resource in getattr(dash_tooltip, "_js_dist", [])
+    )
+
+
+def main() -> None:
+    print(f"dash_tooltip from {dash_tooltip.__file__}")
+    print(
+        f"{'graphs':>8} {'inline (KiB)':>14} {'dependencies (KiB)':>20}"
+        f" {'layout (KiB)':>14} {'stores':>8}"
+    )
+    for n_graphs in GRAPH_COUNTS:
+        inline, dependencies, layout, stores = measure(n_graphs)
+        print(
+            f"{n_graphs:>8} {inline / 1024:>14.1f} {dependencies / 1024:>20.1f}"
+            f" {layout / 1024:>14.1f} {stores:>8}"
+        )
+    print(f"static scripts, cached by browsers: {static_size() / 1024:.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
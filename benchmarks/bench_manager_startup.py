@@ -0,0 +1,73 @@
+"""
+Startup cost of `tooltip()` for apps with many graphs.
+
+Measures the time spent in `tooltip()` and the peak resident set size (RSS) of
+the process for 1 to 1000 tooltip-enabled graphs. Each graph count runs in a
+fresh Python process, as the peak RSS of a process never goes down: the peak
+is read with `resource.getrusage` once the app is built, and once `tooltip()`
+returned, so the growth is the peak memory added by `tooltip()`. The
+`resource` module is not available on Windows.
+
+Usage:
+    python benchmarks/bench_manager_startup.py
+"""
+
+import resource
+import subprocess
+import sys
+import time
+
+GRAPH_COUNTS = (1, 10, 100, 1000)
+
+
+def _peak_rss_kib() -> float:
+    """Peak RSS of this process: ``ru_maxrss`` is in KiB on Linux, bytes on macOS."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 if sys.platform == "darwin" else float(peak)
+
+
+def measure(n_graphs: int):
+    """Runs `tooltip()` in this process; call it in a fresh one."""
+    from dash import Dash, dcc, html
+
+    from dash_tooltip import tooltip
+
+    app = Dash(__name__)
+    graph_ids = [f"bench-graph-{n_graphs}-{i}" for i in range(n_graphs)]
+    app.layout = html.Div([dcc.Graph(id=graph_id) for graph_id in graph_ids])
+
+    before = _peak_rss_kib()
+    start = time.perf_counter()
+    manager = tooltip(app, graph_ids=graph_ids)
+    elapsed = time.perf_counter() - start
+    return manager, elapsed, before, _peak_rss_kib()
+
+
+def main() -> None:
+    if len(sys.argv) == 3 and sys.argv[1] == "--graphs":
+        _, elapsed, before, peak = measure(int(sys.argv[2]))
+        print(elapsed, before, peak)
+        return
+
+    import dash_tooltip
+
+    print(f"dash_tooltip from {dash_tooltip.__file__}")
+    print(
+        f"{'graphs':>8} {'time (ms)':>12} {'peak RSS (MiB)':>16} {'growth (MiB)':>14}"
+    )
+    for n_graphs in GRAPH_COUNTS:
+        output = subprocess.run(
+            [sys.executable, __file__, "--graphs", str(n_graphs)],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        elapsed, before, peak = map(float, output.split()[-3:])
+        print(
+            f"{n_graphs:>8} {elapsed * 1000:>12.1f} {peak / 1024:>16.1f}"
+            f" {(peak - before) / 1024:>14.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
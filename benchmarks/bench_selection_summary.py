@@ -0,0 +1,52 @@
+"""
+Cost of the summary of a box or lasso selection.
+
+Times `summarize_selection` over traces of 10^4 to 10^7 samples, for a box
+selecting half of the samples and a 100-vertex lasso around the same region.
+
+Usage:
+    python benchmarks/bench_selection_summary.py
+"""
+
+import time
+
+import numpy as np
+
+import dash_tooltip
+from dash_tooltip.selection import summarize_selection
+
+SAMPLE_COUNTS = (10**4, 10**5, 10**6, 10**7)
+LASSO_VERTICES = 100
+
+
+def measure(n_samples: int, selection) -> float:
+    x = np.arange(n_samples, dtype=float)
+    y = np.random.default_rng(0).normal(size=n_samples)
+    figure = {"data": [{"type": "scattergl", "x": x, "y": y}], "layout": {}}
+    start = time.perf_counter()
+    summarize_selection(figure, selection(n_samples))
+    return time.perf_counter() - start
+
+
+def box(n_samples: int):
+    return {"range": {"x": [n_samples / 4, n_samples * 3 / 4], "y": [-5, 5]}}
+
+
+def lasso(n_samples: int):
+    angles = np.linspace(0, 2 * np.pi, LASSO_VERTICES, endpoint=False)
+    xs = n_samples / 2 + n_samples / 4 * np.cos(angles)
+    ys = 5 * np.sin(angles)
+    return {"lassoPoints": {"x": xs.tolist(), "y": ys.tolist()}}
+
+
+def main() -> None:
+    print(f"dash_tooltip from {dash_tooltip.__file__}")
+    print(f"{'samples':>10} {'box (ms)':>10} {'lasso (ms)':>12}")
+    for n_samples in SAMPLE_COUNTS:
+        box_time = measure(n_samples, box)
+        lasso_time = measure(n_samples, lasso)
+        print(f"{n_samples:>10} {box_time * 1000:>10.1f} {lasso_time * 1000:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
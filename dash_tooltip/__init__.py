@@ -1,13 +1,97 @@
 import logging
-from string import Template
-from typing import Any, Dict, List, Optional, Union
+import uuid
+import weakref
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Union
 
 import plotly.graph_objs as go
-from dash import Input, Output, State, dash
+from dash import Input, Output, Patch, State, callback_context, dash
 
+from .anchors import reanchor
+from .batch import BatchJob, annotate_figure, render_batch
+from .clicks import coalesce_ids
+from .clientside import (
+    CONFIG_STORE_ID,
+    NAMESPACE,
+    SCRIPT,
+    clientside_function,
+    config_data,
+    register_script,
+)
 from .config import DEFAULT_ANNOTATION_CONFIG, DEFAULT_TEMPLATE
+from .crosshair import (
+    CROSSHAIR_MODES,
+    CROSSHAIR_TEMPLATE,
+    crosshair_text,
+)
 from .custom_figure import CustomFigure
-from .utils import _display_click_data, _find_all_graph_ids, add_annotation_store
+from .edits import (
+    EDITABLE_PROPERTIES,
+    edit_ids,
+)
+from .figures import FigureCache, figure_ids
+from .history import (
+    HISTORY_SIZE,
+    Operation,
+    TooltipEntry,
+    control_ids,
+    tooltip_controls,
+)
+from .hover import (
+    PREVIEW_THROTTLE_MS,
+    HoverEnricher,
+    _templates_data,
+    add_preview_tooltip,
+    enrich_point,
+    preview_ids,
+    sync_hover_templates,
+)
+from .indexing import IndexCache, data_revision
+from .links import linked_points
+from .overlay import (
+    demote_overflow,
+    discard,
+    is_overlay_trace,
+    is_tooltip_trace,
+    promote,
+    restore,
+)
+from .peaks import SNAP_MODES, annotate_peaks, find_peaks, snap_click_data
+from .registry import (
+    ANNOTATION_NAME_PREFIX,
+    _annotation_name,
+    _get_annotations,
+    _get_name,
+    _point_key,
+    _remove_annotation,
+)
+from .selection import (
+    SELECTION_NAME,
+    SELECTION_STORE_ID,
+    SELECTION_TEMPLATE,
+    summarize_selection,
+)
+from .state import MAX_SESSIONS, SESSION_STORE_ID, GraphState, SessionState
+from .style import TooltipStyle
+from .utils import (
+    REMOVE_STORE_ID,
+    _display_click_data,
+    _find_all_graph_ids,
+    add_annotation_store,
+    add_stores,
+    make_annotation,
+    make_annotations,
+)
+from .viewport import view_ids
+from .window import window_stats
+
+# Read by Dash from the package module to serve the clientside callbacks, once
+# `register_script` added the package to its registry
+_js_dist = [{"relative_package_path": SCRIPT, "namespace": NAMESPACE}]
+
+try:
+    from ._version import version as __version__
+except ImportError:  # Not built by setuptools_scm
+    __version__ = "0.4.2"
 
 # Logger setup
 logger = logging.getLogger("dash_tooltip")
@@ -32,6 +116,18 @@ logger.debug("dash_tooltip log active")
 
 registered_callbacks = set()
 
+# Managers of each app by graph ID, and the callbacks on the shared stores already
+# registered for the app: those whose outputs are only shared stores are
+# registered once per app, and dispatch their data to the manager of its graph
+_app_managers: "weakref.WeakKeyDictionary[dash.Dash, Dict[str, TooltipManager]]" = (
+    weakref.WeakKeyDictionary()
+)
+_app_callbacks: "weakref.WeakKeyDictionary[dash.Dash, Set[str]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+REPEAT_CLICK_MODES = ("ignore", "toggle", "add")
+
 
 class TooltipManager:
     def __init__(
@@ -42,23 +138,161 @@ class TooltipManager:
         graph_ids: List[str],
         apply_log_fix: bool,
         debug: bool,
+        snap: Optional[str] = None,
+        snap_window: int = 20,
+        avoid_overlap: bool = False,
+        repeat_click: str = "ignore",
+        trace_styles: Optional[Dict[Union[int, str], Dict[Any, Any]]] = None,
+        trace_templates: Optional[Dict[Union[int, str], str]] = None,
+        hover_preview: bool = False,
+        hover_enrich: Optional[HoverEnricher] = None,
+        hover_throttle: int = PREVIEW_THROTTLE_MS,
+        coalesce_clicks: bool = False,
+        overlay_threshold: Optional[int] = None,
+        anchor: Optional[str] = None,
+        sync_edits: bool = False,
+        history_size: int = HISTORY_SIZE,
+        max_sessions: int = MAX_SESSIONS,
+        link_groups: Optional[List[List[str]]] = None,
+        crosshair: Optional[str] = None,
+        stats_window: Optional[int] = None,
+        stats_dx: Any = None,
+        cluster_grid: Optional[int] = None,
+        cull_margin: Optional[float] = None,
+        figure_cache: Optional[int] = None,
+        selection_template: Optional[str] = None,
+        sync_hover: bool = False,
     ):
-        self.figures = {graph_id: CustomFigure() for graph_id in graph_ids}
-        self.templates = {graph_id: template for graph_id in graph_ids}
+        if snap is not None and snap not in SNAP_MODES:
+            raise ValueError(f"Invalid snap mode: {snap}, expected one of {SNAP_MODES}")
+        if crosshair is not None and crosshair not in CROSSHAIR_MODES:
+            raise ValueError(
+                f"Invalid crosshair mode: {crosshair}, expected one of {CROSSHAIR_MODES}"
+            )
+        if crosshair is not None and template == DEFAULT_TEMPLATE:
+            template = CROSSHAIR_TEMPLATE
+        if cull_margin is not None and cull_margin < 0:
+            raise ValueError(f"Invalid cull_margin provided: {cull_margin}")
+        if repeat_click not in REPEAT_CLICK_MODES:
+            raise ValueError(
+                f"Invalid repeat_click: {repeat_click}, "
+                f"expected one of {REPEAT_CLICK_MODES}"
+            )
         self.style = style
         self.apply_log_fix = apply_log_fix
         self.debug = debug
         self.app = app
         self.graph_ids = graph_ids
         self.tooltip_active = True  # Default to active
+        self.snap = snap
+        self.snap_window = snap_window
+        self.repeat_click = repeat_click
+        self._index_cache = IndexCache()
+        self.hover_preview = hover_preview or hover_enrich is not None
+        self.hover_enrich = hover_enrich
+        self.hover_throttle = hover_throttle
+        self.coalesce_clicks = coalesce_clicks
+        self.overlay_threshold = overlay_threshold
+        self.sync_edits = sync_edits
+        self.crosshair = crosshair
+        self.stats_window = stats_window
+        self.stats_dx = stats_dx
+        self.figure_cache = FigureCache(figure_cache) if figure_cache else None
+        self.selection_template = selection_template
+        self.sync_hover = sync_hover
+        self.link_groups: Dict[str, Tuple[str, ...]] = {}
+        for group in link_groups or []:
+            for graph_id in group:
+                if graph_id not in graph_ids or graph_id in self.link_groups:
+                    raise ValueError(
+                        f"Invalid graph ID provided in link_groups: {graph_id}"
+                    )
+                self.link_groups[graph_id] = tuple(group)
+        # Linked clicks visit every trace of a graph in turn: each graph gets a
+        # cache holding the sorted x values of all its traces
+        self._link_caches = {graph_id: IndexCache() for graph_id in self.link_groups}
+        # Resolved once and shared: the frozen style cannot leak between graphs
+        resolved_style = TooltipStyle(style, trace_styles)
+        self.graphs = {
+            graph_id: GraphState(
+                template,
+                resolved_style,
+                avoid_overlap,
+                trace_templates,
+                anchor,
+                sync_edits,
+                history_size,
+                cluster_grid,
+                cull_margin,
+                max_sessions,
+            )
+            for graph_id in graph_ids
+        }
+        # The shared stores in the layout, by ID, once the callbacks are registered
+        self._stores: Dict[str, Any] = {}
         self.initialize_callbacks()
 
-    def update_template(self, graph_id: str, template: str):
-        if graph_id in self.figures:
-            self.templates[graph_id] = template
-            self.figures[graph_id].update_template(template)
+    @property
+    def templates(self) -> Dict[str, str]:
+        """Current template of each graph."""
+        return {graph_id: state.template for graph_id, state in self.graphs.items()}
+
+    def update_template(
+        self,
+        graph_id: str,
+        template: str,
+        trace: Optional[Union[int, str]] = None,
+    ):
+        """Sets the default template of a graph, or the template of one trace."""
+        if graph_id in self.graphs:
+            self.graphs[graph_id].set_template(template, trace)
+            store = self._stores.get(preview_ids(graph_id)["templates"])
+            if store is not None:
+                # Served with the layout, so the preview follows on the next load
+                store.data[graph_id] = _templates_data(self.graphs[graph_id].templates)
+            if self.sync_hover:
+                self.sync_hover_templates(graph_id)
+
+    def sync_hover_templates(self, graph_id: str, figure: Any = None) -> Any:
+        """
+        Sets the hovertemplates of a figure from the tooltip templates of a graph.
+
+        The figure of the graph in the layout is synced when the callbacks are
+        registered and when its template is updated; figures returned by the
+        app's own callbacks can be synced with this method.
+
+        Args:
+            graph_id (str): The ID of the graph whose templates are used.
+            figure (optional): The figure, as a dictionary or a plotly figure,
+                changed in place. Defaults to the figure of the graph in the
+                layout.
+
+        Returns:
+            The figure.
+        """
+        if graph_id not in self.graphs:
+            raise ValueError(f"Invalid graph ID provided: {graph_id}")
+        if figure is None:
+            figure = getattr(self.app.layout[graph_id], "figure", None)
+            if figure is None:
+                return None
+        sync_hover_templates(figure, self.graphs[graph_id].templates)
+        return figure
+
+    def update_style(
+        self,
+        graph_id: str,
+        style: Dict[Any, Any],
+        trace_styles: Optional[Dict[Union[int, str], Dict[Any, Any]]] = None,
+    ):
+        if graph_id in self.graphs:
+            self.graphs[graph_id].style = TooltipStyle(style, trace_styles)
 
     def initialize_callbacks(self):
+        register_script()
+        # A single traversal of the layout, rather than one per graph
+        layout_ids = {i for i in self.app.layout if isinstance(i, str)}
+        graph_ids = []
         for graph_id in self.graph_ids:
             callback_identifier = (graph_id, "figure")
             if callback_identifier in registered_callbacks:
@@ -66,100 +300,1331 @@ class TooltipManager:
                 continue
             registered_callbacks.add(callback_identifier)
 
-            # Check for valid graph ID and add annotation store
-            if graph_id not in self.app.layout:
+            # Check for valid graph ID
+            if graph_id not in layout_ids and graph_id not in self.app.layout:
                 raise ValueError(f"Invalid graph ID provided: {graph_id}")
-            add_annotation_store(self.app.layout, graph_id)
+            graph_ids.append(graph_id)
+        if not graph_ids:
+            return
+        unlinked = [
+            graph_id for graph_id in graph_ids if graph_id not in self.link_groups
+        ]
+        viewed = [i for i in graph_ids if self.graphs[i].follows_view]
+
+        # The stores are shared by all the graphs and added in one pass, so the
+        # layout does not grow with the number of graphs
+        stores = {
+            REMOVE_STORE_ID: None,
+            CONFIG_STORE_ID: config_data(),
+            SESSION_STORE_ID: None,
+        }
+        if self.coalesce_clicks and unlinked:
+            stores.update(dict.fromkeys(coalesce_ids().values()))
+        elif self.figure_cache is not None and unlinked:
+            stores.update(dict.fromkeys(figure_ids().values()))
+        if self.sync_edits:
+            stores.update(dict.fromkeys(edit_ids().values()))
+        if viewed:
+            stores.update(dict.fromkeys(view_ids().values()))
+        if self.hover_preview:
+            ids = preview_ids(graph_ids[0])
+            stores.update({ids["templates"]: {}, ids["enriched"]: None})
+            if self.hover_enrich is not None:
+                stores[ids["hover"]] = None
+        if self.selection_template is not None:
+            stores[SELECTION_STORE_ID] = None
+        self._stores = add_stores(self.app.layout, stores)
+        _app_managers.setdefault(self.app, {}).update(dict.fromkeys(graph_ids, self))
+
+        for graph_id in graph_ids:
+            self._stores[CONFIG_STORE_ID].data["graphs"][graph_id] = {
+                "debug": self.debug,
+                "throttle": self.hover_throttle,
+            }
+            self._register_graph_callbacks(graph_id)
+            if self.hover_preview:
+                self._register_preview_callbacks(graph_id)
+            if self.sync_edits:
+                self._register_edit_callbacks(graph_id)
+            controls = [i for i in control_ids(graph_id).values() if i in layout_ids]
+            if controls:
+                self._register_control_callbacks(graph_id, controls)
+            if self.graphs[graph_id].follows_view:
+                self._register_view_callbacks(graph_id)
+            if self.selection_template is not None:
+                self._register_selection_callbacks(graph_id)
+            if self.sync_hover:
+                # Translated once: hovering is then rendered by plotly.js alone
+                self.sync_hover_templates(graph_id)
+
+        # Callbacks on the shared stores dispatch their data to its graph
+        self._register_session_callback()
+        self._register_remove_callback(graph_ids)
+        if self.coalesce_clicks and unlinked:
+            self._register_click_batch_callback(unlinked)
+        elif self.figure_cache is not None and unlinked:
+            self._register_cached_click_callback(unlinked)
+        if self.sync_edits:
+            self._register_edit_sync_callbacks(graph_ids)
+        if viewed:
+            self._register_view_update_callbacks(viewed)
+        if self.hover_enrich is not None:
+            self._register_enrich_callback(graph_ids)
+        if self.selection_template is not None:
+            self._register_selection_summary_callback(graph_ids)
+        for group in {self.link_groups[i] for i in graph_ids if i in self.link_groups}:
+            self._register_linked_click_callback(group)
+
+    @staticmethod
+    def _dispatched_graph(graph_ids: List[str], data: Optional[Dict[str, Any]]) -> str:
+        """The graph named by the data of a shared store, if among ``graph_ids``."""
+        graph_id = (data or {}).get("graph")
+        if graph_id not in graph_ids:
+            # Sent to a graph of another manager
+            raise dash.PreventUpdate
+        return graph_id
+
+    def _dispatched_manager(
+        self,
+        data: Optional[Dict[str, Any]],
+        enabled: Callable[["TooltipManager", str], bool],
+    ) -> Tuple["TooltipManager", str]:
+        """
+        The manager and the graph named by the data of a shared store, for the
+        callbacks registered once per app; only graphs with the feature
+        ``enabled`` are dispatched to.
+        """
+        graph_id = (data or {}).get("graph")
+        manager = _app_managers.get(self.app, {}).get(graph_id)
+        if manager is None or not enabled(manager, graph_id):
+            raise dash.PreventUpdate
+        return manager, graph_id
+
+    def _register_once(self, name: str) -> bool:
+        """Whether the app still lacks the shared store callback ``name``."""
+        registered = _app_callbacks.setdefault(self.app, set())
+        if name in registered:
+            return False
+        registered.add(name)
+        return True
+
+    @staticmethod
+    def _dispatch(graph_ids: List[str], graph_id: str, update: Any) -> List[Any]:
+        """The figure outputs of ``graph_ids``: ``update`` for ``graph_id`` only."""
+        return [update if i == graph_id else dash.no_update for i in graph_ids]
+
+    def handle_click(
+        self,
+        graph_id: str,
+        clickData: Dict[str, Any],
+        figure: Union[CustomFigure, Dict[str, Any], None],
+        as_patch: bool = True,
+        session: Optional[str] = None,
+    ) -> Union[CustomFigure, Dict[str, Any], Patch]:
+        """
+        Adds the tooltip of a click to the figure of ``graph_id``.
+
+        A click on a sample that already has a tooltip is ignored, or removes
+        that tooltip with ``repeat_click="toggle"``; both are decided with an O(1)
+        index lookup, and a removal is sent back as a minimal `Patch`, or applied
+        to ``figure`` when ``as_patch`` is False. The tooltip is recorded in the
+        browser ``session`` the figure belongs to, see `GraphState.session`.
+        """
+        if not self.tooltip_active:
+            raise dash.PreventUpdate
+
+        if figure is None:
+            figure = CustomFigure()
+
+        points = (clickData or {}).get("points") or [{}]
+        curve_number = points[0].get("curveNumber")
+        data = figure["data"]
+        if curve_number is not None and curve_number < len(data):
+            clicked = data[curve_number]
+            if self.overlay_threshold is not None and is_overlay_trace(clicked):
+                return self._promote(graph_id, points[0], figure, session)
+            if is_tooltip_trace(clicked):
+                # Cluster badges are expanded by zooming in
+                raise dash.PreventUpdate
+
+        if self.snap:
+            clickData = snap_click_data(
+                clickData,
+                figure,
+                self.snap,
+                self.snap_window,
+                self._index_cache,
+                data_revision(graph_id, figure),
+            )
+        if self.crosshair and clickData and clickData.get("points"):
+            clickData = self._with_crosshair(graph_id, clickData, figure)
+        if self.stats_window is not None or self.stats_dx is not None:
+            clickData = self._with_window_stats(graph_id, clickData, figure)
+
+        state = self.graphs[graph_id]
+        tooltips = state.session(session)
+        anchor_key = self._anchor_key(tooltips, clickData, figure)
+        key = None
+        if clickData and clickData.get("points") and self.repeat_click != "add":
+            key = anchor_key or _point_key(clickData["points"][0])
+        if key is not None:
+            annotations = _get_annotations(figure)
+            index = tooltips.click_index
+            position = index.lookup(key, annotations)
+            if position is not None:
+                if self.repeat_click == "ignore":
+                    raise dash.PreventUpdate
+                tooltips.history.record(
+                    "remove", self._forget(tooltips, [_annotation_name(key)])
+                )
+                if not as_patch:
+                    return _remove_annotation(figure, position)
+                patch = Patch()
+                del patch["layout"]["annotations"][position]
+                return patch
+
+        fig = _display_click_data(
+            clickData,
+            self._as_figure(figure),
+            state.templates,
+            state.style,
+            placer=tooltips.placer,
+        )
+
+        added = None
+        if clickData and clickData.get("points"):
+            added = fig.layout.annotations[-1]
+        if added is not None and anchor_key is not None:
+            added.name = _annotation_name(anchor_key)
+        elif added is not None and added.name and self.repeat_click == "add":
+            # Each tooltip of a repeatedly clicked sample gets its own id
+            added.name = f"{added.name}#{uuid.uuid4().hex[:8]}"
+        entries = []
+        if added is not None and added.name:
+            entries.append((added.name, added.to_plotly_json(), anchor_key))
+            self._remember(tooltips, *entries[0])
+
+        demoted = []
+        if self.overlay_threshold is not None:
+            if key is not None:
+                discard(fig, _annotation_name(key))
+            demoted = demote_overflow(fig, self.overlay_threshold)
+        # Undoing the click promotes the tooltips it demoted back
+        tooltips.history.record("add", entries, demoted)
+        if demoted:
+            tooltips.click_index.rebuild(fig.layout.annotations)
+            return fig
+
+        if added is not None and added.name:
+            size = len(fig.layout.annotations)
+            tooltips.click_index.added(added.name, size - 1, size)
+        return fig
+
+    def _with_crosshair(
+        self,
+        graph_id: str,
+        clickData: Dict[str, Any],
+        figure: Union[CustomFigure, Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        """Adds the values of all the traces at the clicked x, as ``crosshair``."""
+        point = dict(clickData["points"][0])
+        point["crosshair"] = crosshair_text(
+            figure,
+            point.get("x"),
+            self.crosshair,
+            self._index_cache,
+            data_revision(graph_id, figure),
+        )
+        return dict(clickData, points=[point] + clickData["points"][1:])
+
+    def _with_window_stats(
+        self,
+        graph_id: str,
+        clickData: Optional[Dict[str, Any]],
+        figure: Union[CustomFigure, Dict[str, Any]],
+    ) -> Optional[Dict[str, Any]]:
+        """Adds the statistics of the window around the clicked sample, as ``win``."""
+        if not clickData or not clickData.get("points"):
+            return clickData
+        point = dict(clickData["points"][0])
+        curve_number = point.get("curveNumber")
+        point_number = point.get("pointNumber")
+        if curve_number is None or not isinstance(point_number, int):
+            return clickData
+        trace = figure["data"][curve_number]
+        if "y" not in trace or trace["y"] is None:
+            return clickData
+        point["win"] = window_stats(
+            trace,
+            point_number,
+            self.stats_window,
+            self.stats_dx,
+            self._index_cache,
+            revision=data_revision(graph_id, figure),
+        )
+        return dict(clickData, points=[point] + clickData["points"][1:])
+
+    @staticmethod
+    def _anchor_key(
+        state: SessionState, clickData: Optional[Dict[str, Any]], figure: Any
+    ) -> Optional[Tuple[Any, Any]]:
+        """``(trace key, sample key)`` of a click when tooltips are anchored."""
+        if state.anchors is None or not clickData or not clickData.get("points"):
+            return None
+        point = clickData["points"][0]
+        curve_number = point.get("curveNumber")
+        point_number = point.get("pointNumber")
+        if curve_number is None or not isinstance(point_number, int):
+            return None
+        try:
+            return state.anchors.key(
+                figure["data"][curve_number], curve_number, point_number
+            )
+        except (KeyError, IndexError, TypeError):
+            return None
+
+    def extend_data(
+        self, graph_id: str, extend_data: Any, session: Optional[str] = None
+    ) -> Patch:
+        """
+        Follows an ``extendData`` update of a graph with anchored tooltips.
+
+        Args:
+            graph_id (str): The ID of the graph.
+            extend_data: The value sent to the ``extendData`` property of the graph:
+                ``[data, trace_indices]`` or ``[data, trace_indices, max_points]``.
+            session (str, optional): The browser session of the graph, the data
+                of the ``tooltip-session`` store, passed as a callback `State`.
+
+        Returns:
+            Patch: A figure patch removing the tooltips whose samples left a
+            rolling window; only those samples are processed.
+        """
+        state = self.graphs[graph_id].session(session)
+        patch = Patch()
+        if state.anchors is None:
+            return patch
+        if isinstance(extend_data, dict):
+            update, curve_numbers, max_points = extend_data, [0], None
+        else:
+            update, curve_numbers = extend_data[0], list(extend_data[1])
+            max_points = extend_data[2] if len(extend_data) > 2 else None
+        names = state.anchors.extend(update, curve_numbers, max_points)
+        # Samples that left the window cannot get their tooltip back
+        return self.remove_tooltips(graph_id, names, undoable=False, session=session)
+
+    def _locate(
+        self,
+        graph_id: str,
+        tooltip_id: Union[str, int],
+        figure: Any = None,
+        session: Optional[str] = None,
+    ) -> Optional[int]:
+        index = self.graphs[graph_id].session(session).click_index
+        if isinstance(tooltip_id, int):
+            return tooltip_id
+        if figure is None:
+            return index.position(tooltip_id)
+        annotations = _get_annotations(figure)
+        if not tooltip_id.startswith(ANNOTATION_NAME_PREFIX):
+            # Other named annotations have no slot: found by name in the figure
+            return next(
+                (i for i, a in enumerate(annotations) if _get_name(a) == tooltip_id),
+                None,
+            )
+        return index.find(tooltip_id, annotations)
+
+    def remove_tooltips(
+        self,
+        graph_id: str,
+        tooltip_ids: List[Union[str, int]],
+        figure: Union[CustomFigure, Dict[str, Any], None] = None,
+        undoable: bool = True,
+        session: Optional[str] = None,
+    ) -> Patch:
+        """
+        Removes tooltips by id, i.e. by annotation ``name``.
+
+        Args:
+            graph_id (str): The ID of the graph.
+            tooltip_ids (list): Tooltip ids; integers are positions of other
+                annotations. Names of other annotations are looked up in
+                ``figure``.
+            figure (optional): The current figure, to check the indexed positions
+                against. Without it the index is trusted.
+            undoable (bool): Whether `undo` can put the tooltips back.
+            session (str, optional): The browser session of the figure.
+
+        Returns:
+            Patch: A figure patch deleting the annotations.
+        """
+        state = self.graphs[graph_id].session(session)
+        positions = {}
+        culled = []
+        for tooltip_id in tooltip_ids:
+            position = self._locate(graph_id, tooltip_id, figure, session)
+            if position is not None:
+                positions[position] = tooltip_id
+            elif state.view is not None and tooltip_id in state.view.points:
+                # Culled out of the figure: only known to the server
+                culled.append(tooltip_id)
+
+        patch = Patch()
+        for position in sorted(positions, reverse=True):
+            del patch["layout"]["annotations"][position]
+        names = culled
+        for tooltip_id in positions.values():
+            if isinstance(tooltip_id, int):
+                # Unnamed annotations have no record: positions are re-read later
+                state.click_index.invalidate()
+            else:
+                names.append(tooltip_id)
+        removed = self._forget(state, names)
+        if undoable:
+            state.history.record("remove", removed)
+        return patch
+
+    @staticmethod
+    def _remember(
+        state: SessionState,
+        name: str,
+        annotation: Dict[str, Any],
+        anchor_key: Optional[Tuple[Any, Any]] = None,
+    ) -> None:
+        """Records an added tooltip, except in the click index."""
+        state.history.remember(name, annotation)
+        if anchor_key is not None and state.anchors is not None:
+            state.anchors.add(name, anchor_key, annotation)
+        if state.records is not None:
+            state.records.add(name, annotation)
+        if state.view is not None:
+            state.view.add(name, annotation)
+
+    @staticmethod
+    def _forget(state: SessionState, names: List[str]) -> List[TooltipEntry]:
+        """
+        Forgets removed tooltips.
+
+        Returns:
+            List[TooltipEntry]: The removed tooltips whose annotation is known, in
+            their latest known form, to undo the removal.
+        """
+        removed = []
+        for name in names:
+            state.click_index.removed(name)
+            annotation = state.history.annotations.pop(name, None)
+            anchor_key = None
+            if state.anchors is not None and name in state.anchors.tooltips:
+                tooltip = state.anchors.tooltips[name]
+                annotation = tooltip.annotation
+                anchor_key = (tooltip.trace_key, tooltip.sample_key)
+                state.anchors.remove(name)
+            if state.records is not None and name in state.records.annotations:
+                annotation = state.records.annotations[name]
+                state.records.remove([name])
+            if state.view is not None:
+                point = state.view.points.get(name)
+                if annotation is None and point is not None:
+                    # Culled tooltips beyond the annotations of the history
+                    annotation = point[3]
+                state.view.remove(name)
+            if state.placer is not None:
+                if annotation is None:
+                    state.placer.reset()
+                else:
+                    state.placer.removed(annotation)
+            if annotation is not None:
+                removed.append((name, annotation, anchor_key))
+        return removed
+
+    def _apply(
+        self, state: SessionState, operation: Optional[Operation], figure: Any
+    ) -> Union[Patch, CustomFigure]:
+        index = state.click_index
+        patch = Patch()
+        if operation is None:
+            return patch
+        if self.overlay_threshold is not None and figure is not None:
+            return self._apply_overlay(state, operation, figure)
+        # Positions are checked by name against the figure of the session
+        annotations = None if figure is None else _get_annotations(figure)
+        if operation.kind == "remove":
+            names = [name for name, _, _ in operation.tooltips]
+            positions = [
+                index.position(name)
+                if annotations is None
+                else index.find(name, annotations)
+                for name in names
+            ]
+            for position in sorted(
+                (p for p in positions if p is not None), reverse=True
+            ):
+                del patch["layout"]["annotations"][position]
+            self._forget(state, names)
+            return patch
+        if annotations is not None:
+            index.sync(annotations)
+        for name, annotation, anchor_key in operation.tooltips:
+            patch["layout"]["annotations"].append(annotation)
+            self._remember(state, name, annotation, anchor_key)
+            if state.placer is not None:
+                state.placer.added(annotation)
+            size = state.click_index.size
+            state.click_index.added(name, size, size + 1)
+        return patch
+
+    def _apply_overlay(
+        self, state: SessionState, operation: Operation, figure: Any
+    ) -> CustomFigure:
+        """
+        Applies an operation to a figure with overlay traces: the tooltips are
+        found by name among the annotations and the overlay points, and the
+        tooltips demoted by an addition are promoted back when it is reverted.
+        """
+        fig = self._as_figure(figure)
+        names = [name for name, _, _ in operation.tooltips]
+        for name in names:
+            discard(fig, name)
+        if operation.kind == "remove":
+            removed = set(names)
+            fig.layout.annotations = [
+                annotation
+                for annotation in fig.layout.annotations
+                if annotation.name not in removed
+            ]
+            self._forget(state, names)
+            restore(fig, operation.demoted)
+        else:
+            for name, annotation, anchor_key in operation.tooltips:
+                fig.add_annotation(**annotation)
+                self._remember(state, name, annotation, anchor_key)
+                if state.placer is not None:
+                    state.placer.added(annotation)
+            demote_overflow(fig, self.overlay_threshold)
+        state.click_index.rebuild(fig.layout.annotations)
+        return fig
+
+    def undo(
+        self,
+        graph_id: str,
+        figure: Union[CustomFigure, Dict[str, Any], None] = None,
+        session: Optional[str] = None,
+    ) -> Union[Patch, CustomFigure]:
+        """
+        Reverts the last tooltip operation of a graph in a browser session: a
+        click adding or removing a tooltip, a deletion, or clearing the graph.
+
+        Args:
+            graph_id (str): The ID of the graph.
+            figure (optional): The current figure, to find the tooltips in.
+                Without it the index is trusted.
+            session (str, optional): The browser session of the figure; each
+                session has its own history, see `GraphState.session`.
+
+        Returns:
+            Union[Patch, CustomFigure]: A figure patch deleting or re-adding the
+            tooltips involved; empty when there is nothing to undo. With
+            ``overlay_threshold`` and a figure, the updated figure, with the
+            tooltips demoted by an undone click promoted back.
+        """
+        state = self.graphs[graph_id].session(session)
+        return self._apply(state, state.history.undo(), figure)
+
+    def redo(
+        self,
+        graph_id: str,
+        figure: Union[CustomFigure, Dict[str, Any], None] = None,
+        session: Optional[str] = None,
+    ) -> Union[Patch, CustomFigure]:
+        """Applies the last undone tooltip operation of a graph again, see `undo`."""
+        state = self.graphs[graph_id].session(session)
+        return self._apply(state, state.history.redo(), figure)
+
+    def clear_tooltips(
+        self,
+        graph_id: str,
+        figure: Union[CustomFigure, Dict[str, Any], None] = None,
+        session: Optional[str] = None,
+    ) -> Patch:
+        """
+        Removes all the tooltips of a graph, as a single operation that `undo`
+        reverts. Other annotations are kept.
+
+        Args:
+            graph_id (str): The ID of the graph.
+            figure (optional): The current figure, to read the tooltips from.
+                Without it the index is trusted.
+            session (str, optional): The browser session of the figure.
+
+        Returns:
+            Patch: A figure patch deleting the tooltip annotations.
+        """
+        state = self.graphs[graph_id].session(session)
+        if figure is None:
+            names = list(state.click_index.slots)
+        else:
+            names = [
+                name
+                for name in map(_get_name, _get_annotations(figure))
+                if name and name.startswith(ANNOTATION_NAME_PREFIX)
+            ]
+        if state.view is not None:
+            names += state.view.culled()
+        return self.remove_tooltips(graph_id, names, figure, session=session)
+
+    def set_visible(
+        self, graph_id: str, visible: bool, session: Optional[str] = None
+    ) -> Patch:
+        """
+        Shows or hides the tooltips of a graph, without removing them.
+
+        Returns:
+            Patch: A figure patch setting ``visible`` on the tooltip annotations.
+        """
+        index = self.graphs[graph_id].session(session).click_index
+        patch = Patch()
+        for name in index.slots:
+            patch["layout"]["annotations"][index.position(name)]["visible"] = visible
+        return patch
+
+    def update_tooltip(
+        self,
+        graph_id: str,
+        tooltip_id: str,
+        figure: Union[CustomFigure, Dict[str, Any], None] = None,
+        session: Optional[str] = None,
+        **properties: Any,
+    ) -> Patch:
+        """
+        Changes annotation properties of a tooltip, found by id.
+
+        Returns:
+            Patch: A figure patch setting ``properties`` on the annotation.
+        """
+        position = self._locate(graph_id, tooltip_id, figure, session)
+        if position is None:
+            raise ValueError(f"Invalid tooltip ID provided: {tooltip_id}")
+        patch = Patch()
+        for name, value in properties.items():
+            patch["layout"]["annotations"][position][name] = value
+        return patch
+
+    def reanchor(
+        self,
+        graph_id: str,
+        figure: Union[CustomFigure, Dict[str, Any], Any],
+        session: Optional[str] = None,
+    ) -> CustomFigure:
+        """
+        Puts the anchored tooltips of a graph back on a regenerated figure.
+
+        Tooltips follow their sample to its position in the new data, and are
+        dropped when their sample or trace is gone. Each browser ``session``, the
+        data of the ``tooltip-session`` store, has its own anchored tooltips.
+        """
+        state = self.graphs[graph_id].session(session)
+        fig = self._as_figure(figure)
+        if state.anchors is not None:
+            anchored = set(state.anchors.tooltips)
+            reanchor(fig, state.anchors, self.apply_log_fix)
+            self._forget(state, list(anchored.difference(state.anchors.tooltips)))
+            state.click_index.rebuild(fig.layout.annotations)
+            if state.placer is not None:
+                state.placer.reset()
+            for name, tooltip in state.anchors.tooltips.items():
+                if name in state.history.annotations:
+                    self._remember(state, name, tooltip.annotation)
+        return fig
+
+    def apply_edits(
+        self,
+        graph_id: str,
+        edits: Optional[Dict[str, Any]],
+        session: Optional[str] = None,
+    ) -> int:
+        """
+        Applies tooltip edits made in the browser to the server-side records.
+
+        Args:
+            graph_id (str): The ID of the graph.
+            edits (dict): Changed annotation properties by tooltip id, e.g.
+                ``{"tooltip_0_12": {"ax": -40, "text": "peak"}}``.
+            session (str, optional): The browser session of the graph.
+
+        Returns:
+            int: The number of tooltips changed.
+        """
+        state = self.graphs[graph_id].session(session)
+        if not edits or state.records is None:
+            return 0
+        if state.anchors is not None:
+            for name, delta in edits.items():
+                tooltip = state.anchors.tooltips.get(name)
+                if tooltip is not None:
+                    tooltip.annotation = dict(
+                        tooltip.annotation,
+                        **{k: v for k, v in delta.items() if k in EDITABLE_PROPERTIES},
+                    )
+        edited = [name for name in edits if name in state.records.annotations]
+        if state.placer is not None:
+            for name in edited:
+                state.placer.removed(state.records.annotations[name])
+        changed = state.records.apply(edits)
+        if state.placer is not None:
+            for name in edited:
+                state.placer.added(state.records.annotations[name])
+        if state.view is not None:
+            for name, delta in edits.items():
+                if name in state.records.annotations and ("x" in delta or "y" in delta):
+                    state.view.add(name, state.records.annotations[name])
+        return changed
+
+    @staticmethod
+    def _as_figure(figure: Union[CustomFigure, Dict[str, Any], Any]) -> CustomFigure:
+        if isinstance(figure, CustomFigure):
+            return figure
+        # Check if figure is a dictionary
+        if isinstance(figure, dict):
+            # Extract data and layout from the figure dictionary
+            raw_data = figure.get("data", [])
+            layout = figure.get("layout", {})
+
+            # Convert dictionary representations of traces into actual trace objects
+            data = []
+            for trace in raw_data:
+                trace_type = trace.pop("type")
+                trace_class = getattr(go, trace_type.capitalize())
+                data.append(trace_class(**trace))
+
+            # Construct the CustomFigure(go.Figure) using data and layout
+            return CustomFigure(data=data, layout=layout)
+        return CustomFigure(figure)
+
+    def _promote(
+        self,
+        graph_id: str,
+        point: Dict[str, Any],
+        figure: Union[CustomFigure, Dict[str, Any]],
+        session: Optional[str] = None,
+    ) -> CustomFigure:
+        """Turns a clicked overlay point back into an editable annotation."""
+        fig = self._as_figure(figure)
+        promote(fig, point["curveNumber"], point["pointNumber"])
+        demote_overflow(fig, self.overlay_threshold)
+        self.graphs[graph_id].session(session).click_index.rebuild(
+            fig.layout.annotations
+        )
+        return fig
+
+    def handle_clicks(
+        self,
+        graph_id: str,
+        batch: Optional[Dict[str, Any]],
+        figure: Union[CustomFigure, Dict[str, Any], None],
+        session: Optional[str] = None,
+    ) -> Tuple[Any, Any]:
+        """
+        Applies a batch of coalesced clicks to the figure of ``graph_id``, in order.
+
+        Returns:
+            Tuple[Any, Any]: The updated figure, or ``no_update`` when no click
+            changed it, and the sequence number acknowledging the batch.
+        """
+        if not batch:
+            raise dash.PreventUpdate
+        fig = figure
+        changed = False
+        if self.tooltip_active:
+            for point in batch.get("points") or []:
+                try:
+                    fig = self.handle_click(
+                        graph_id, {"points": [point]}, fig, False, session
+                    )
+                except dash.PreventUpdate:
+                    continue
+                changed = True
+        return (fig if changed else dash.no_update), batch.get("seq")
+
+    def handle_cached_click(
+        self,
+        graph_id: str,
+        request: Optional[Dict[str, Any]],
+        session: Optional[str] = None,
+    ) -> Tuple[Any, Dict[str, Any]]:
+        """
+        Adds the tooltip of a click sent with the key of a cached figure.
+
+        Args:
+            graph_id (str): The ID of the graph.
+            request (dict): The ``clickData`` with either the ``key`` of the cached
+                traces and the current ``layout``, or the whole ``figure`` and the
+                ``key`` of the previous figure of the session, if any. The figure
+                under that key is replaced by the returned one.
+
+        Returns:
+            Tuple[Any, Dict[str, Any]]: The updated figure and the ``key`` of its
+            cached traces; or ``no_update`` and the click, as ``miss``, when the
+            key was evicted, for the browser to send the figure.
+        """
+        if not request:
+            raise dash.PreventUpdate
+        figure = request.get("figure")
+        if figure is None:
+            data = self.figure_cache.get(graph_id, request.get("key"))
+            if data is None:
+                return dash.no_update, {"miss": request.get("clickData")}
+            # Shallow copies: building the figure pops the trace types
+            figure = {
+                "data": [dict(trace) for trace in data],
+                "layout": request.get("layout") or {},
+            }
+        fig = self.handle_click(
+            graph_id, request.get("clickData"), figure, False, session
+        )
+        if hasattr(fig, "to_plotly_json"):
+            fig = fig.to_plotly_json()
+        key = self.figure_cache.put(graph_id, fig["data"], request.get("key"))
+        return fig, {"key": key}
+
+    def handle_linked_click(
+        self,
+        graph_id: str,
+        clickData: Dict[str, Any],
+        figures: Dict[str, Union[CustomFigure, Dict[str, Any], None]],
+        session: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Adds the tooltip of a click to ``graph_id``, and tooltips at the same x to
+        the graphs linked to it.
+
+        In each linked graph, every trace gets a tooltip on its sample nearest to
+        the clicked x, found by binary search in its cached sorted x values.
+
+        Args:
+            graph_id (str): The ID of the clicked graph.
+            clickData (Dict[str, Any]): The data from the click event.
+            figures (Dict[str, Any]): The current figure of each graph of the group.
+            session (str, optional): The browser session of the figures.
+
+        Returns:
+            Dict[str, Any]: The update of each graph, the clicked one included: a
+            `Patch` appending the new tooltips when the others are unchanged, or
+            removing a toggled one; the figure; or ``no_update``.
+        """
+        updates: Dict[str, Any] = {
+            linked: dash.no_update
+            for linked in self.link_groups.get(graph_id, (graph_id,))
+        }
+        clicked = figures[graph_id]
+        before = [_get_name(a) for a in _get_annotations(clicked or {})]
+        try:
+            update = self.handle_click(graph_id, clickData, clicked, session=session)
+        except dash.PreventUpdate:
+            pass
+        else:
+            if isinstance(update, Patch) or clicked is None:
+                updates[graph_id] = update
+            else:
+                # Like the linked graphs, only the new tooltips are sent
+                updates[graph_id] = self._additions(before, update)
+        points = (clickData or {}).get("points") or [{}]
+        x = points[0].get("x")
+        for linked in updates:
+            figure = figures.get(linked)
+            if linked == graph_id or x is None or figure is None:
+                continue
+            before = [_get_name(a) for a in _get_annotations(figure)]
+            fig = figure
+            cache = self._link_caches[linked]
+            cache.fit(len(figure["data"]))
+            revision = data_revision(linked, figure)
+            for point in linked_points(figure, x, cache, revision=revision):
+                try:
+                    fig = self.handle_click(
+                        linked, {"points": [point]}, fig, False, session
+                    )
+                except dash.PreventUpdate:
+                    continue
+            if fig is not figure:
+                updates[linked] = self._additions(before, fig)
+        if all(update is dash.no_update for update in updates.values()):
+            raise dash.PreventUpdate
+        return updates
+
+    @staticmethod
+    def _additions(before: List[Optional[str]], fig: Any) -> Union[Patch, Any]:
+        """A `Patch` appending the new annotations of ``fig``, if it only has new ones."""
+        annotations = _get_annotations(fig)
+        kept = annotations[: len(before)]
+        if len(kept) != len(before) or [_get_name(a) for a in kept] != before:
+            return fig
+        patch = Patch()
+        for annotation in annotations[len(before) :]:
+            patch["layout"]["annotations"].append(
+                annotation.to_plotly_json()
+                if hasattr(annotation, "to_plotly_json")
+                else annotation
+            )
+        return patch
+
+    def _register_linked_click_callback(self, group: Tuple[str, ...]):
+        @self.app.callback(
+            [Output(graph_id, "figure") for graph_id in group],
+            [Input(graph_id, "clickData") for graph_id in group],
+            [State(graph_id, "figure") for graph_id in group]
+            + [State(SESSION_STORE_ID, "data")],
+        )
+        def display_linked_click_data(*args: Any) -> List[Any]:
+            """Display data on click event in every graph of a link group."""
+            graph_id = callback_context.triggered_id
+            clicks = dict(zip(group, args[: len(group)]))
+            figures = dict(zip(group, args[len(group) : 2 * len(group)]))
+            updates = self.handle_linked_click(
+                graph_id, clicks[graph_id], figures, args[-1]
+            )
+            return [updates[linked] for linked in group]
+
+    def _register_graph_callbacks(self, graph_id: str):
+        if graph_id in self.link_groups:
+            # Clicks are handled by the callback of the whole link group
+            pass
+        elif self.coalesce_clicks:
+            self._register_coalesced_click_callbacks(graph_id)
+        elif self.figure_cache is not None:
+            self._register_cached_click_callbacks(graph_id)
+        else:
 
             @self.app.callback(
                 Output(component_id=graph_id, component_property="figure"),
                 Input(component_id=graph_id, component_property="clickData"),
                 State(component_id=graph_id, component_property="figure"),
+                State(component_id=SESSION_STORE_ID, component_property="data"),
             )
             def display_click_data(
                 clickData: Dict[str, Any],
                 figure: Union[CustomFigure, Dict[str, Any]],
-            ) -> CustomFigure:
+                session: Optional[str],
+            ) -> Union[CustomFigure, Patch]:
                 """Display data on click event."""
-                if not self.tooltip_active:
-                    raise dash.PreventUpdate
+                return self.handle_click(graph_id, clickData, figure, session=session)
 
-                if figure is None:
-                    figure = CustomFigure()
-
-                template = self.templates[graph_id]
-                if isinstance(figure, CustomFigure):
-                    return _display_click_data(clickData, figure, template, self.style)
-                # Check if figure is a dictionary
-                elif isinstance(figure, dict):
-                    # Extract data and layout from the figure dictionary
-                    raw_data = figure.get("data", [])
-                    layout = figure.get("layout", {})
-
-                    # Convert dictionary representations of traces into actual trace objects
-                    data = []
-                    for trace in raw_data:
-                        trace_type = trace.pop("type")
-                        trace_class = getattr(go, trace_type.capitalize())
-                        data.append(trace_class(**trace))
-
-                    # Construct the CustomFigure(go.Figure) using data and layout
-                    custom_figure = CustomFigure(data=data, layout=layout)
-                    return _display_click_data(
-                        clickData, custom_figure, template, self.style
-                    )
-                else:
-                    custom_figure = CustomFigure(figure)
-                    return _display_click_data(
-                        clickData, custom_figure, template, self.style
-                    )
+        # Client-side callback to identify annotations to remove
+        self.app.clientside_callback(
+            clientside_function("removeAnnotations"),
+            Output(REMOVE_STORE_ID, "data", allow_duplicate=True),
+            Input(graph_id, "relayoutData"),
+            State(graph_id, "figure"),
+            State(CONFIG_STORE_ID, "data"),
+            prevent_initial_call=True,
+        )
+
+    def _register_session_callback(self):
+        if self._register_once(SESSION_STORE_ID):
+            # Each browser tab gets its own tooltip state on the server
+            self.app.clientside_callback(
+                clientside_function("initSession"),
+                Output(SESSION_STORE_ID, "data"),
+                Input(CONFIG_STORE_ID, "data"),
+                State(SESSION_STORE_ID, "data"),
+            )
+
+    def _register_remove_callback(self, graph_ids: List[str]):
+        @self.app.callback(
+            [
+                Output(graph_id, "figure", allow_duplicate=True)
+                for graph_id in graph_ids
+            ],
+            Input(REMOVE_STORE_ID, "data"),
+            State(SESSION_STORE_ID, "data"),
+            prevent_initial_call=True,
+        )
+        def remove_empty_annotations(
+            removal: Optional[Dict[str, Any]], session: Optional[str]
+        ) -> List[Any]:
+            """Remove annotations that have been deleted by the user."""
+            graph_id = self._dispatched_graph(graph_ids, removal)
+            ids_to_remove = removal.get("ids")
+            if not ids_to_remove:
+                raise dash.PreventUpdate
+            logger.debug(f"Tooltip IDs to Remove: {ids_to_remove}")
+            # The names sent stand for the figure, to check the index against
+            names = removal.get("names") or []
+            figure = {"layout": {"annotations": [{"name": name} for name in names]}}
+            patch = self.remove_tooltips(
+                graph_id, ids_to_remove, figure, session=session
+            )
+            return self._dispatch(graph_ids, graph_id, patch)
+
+    def _register_coalesced_click_callbacks(self, graph_id: str):
+        ids = coalesce_ids()
+
+        # Clicks made while a batch is in flight are queued in the browser
+        self.app.clientside_callback(
+            clientside_function("coalesceClicks"),
+            Output(ids["batch"], "data", allow_duplicate=True),
+            Input(graph_id, "clickData"),
+            Input(ids["ack"], "data"),
+            State(graph_id, "figure"),
+            State(CONFIG_STORE_ID, "data"),
+            prevent_initial_call=True,
+        )
+
+    def _register_click_batch_callback(self, graph_ids: List[str]):
+        ids = coalesce_ids()
+
+        @self.app.callback(
+            [Output(graph_id, "figure", allow_duplicate=True) for graph_id in graph_ids]
+            + [Output(ids["ack"], "data", allow_duplicate=True)],
+            Input(ids["batch"], "data"),
+            State(SESSION_STORE_ID, "data"),
+            prevent_initial_call=True,
+        )
+        def display_click_batch(
+            batch: Optional[Dict[str, Any]], session: Optional[str]
+        ) -> List[Any]:
+            """Display the data of a batch of click events."""
+            graph_id = self._dispatched_graph(graph_ids, batch)
+            fig, seq = self.handle_clicks(graph_id, batch, batch.get("figure"), session)
+            ack = {"graph": graph_id, "seq": seq}
+            return self._dispatch(graph_ids, graph_id, fig) + [ack]
+
+    def _register_cached_click_callbacks(self, graph_id: str):
+        ids = figure_ids()
+
+        # The figure is only uploaded when its cached traces are stale
+        self.app.clientside_callback(
+            clientside_function("requestClick"),
+            Output(ids["request"], "data", allow_duplicate=True),
+            Input(graph_id, "clickData"),
+            Input(ids["key"], "data"),
+            State(graph_id, "figure"),
+            prevent_initial_call=True,
+        )
+
+    def _register_cached_click_callback(self, graph_ids: List[str]):
+        ids = figure_ids()
+
+        @self.app.callback(
+            [Output(graph_id, "figure", allow_duplicate=True) for graph_id in graph_ids]
+            + [Output(ids["key"], "data", allow_duplicate=True)],
+            Input(ids["request"], "data"),
+            State(SESSION_STORE_ID, "data"),
+            prevent_initial_call=True,
+        )
+        def display_cached_click(
+            request: Optional[Dict[str, Any]], session: Optional[str]
+        ) -> List[Any]:
+            """Display data on click event, from the cached figure."""
+            graph_id = self._dispatched_graph(graph_ids, request)
+            fig, cached = self.handle_cached_click(graph_id, request, session)
+            cached["graph"] = graph_id
+            return self._dispatch(graph_ids, graph_id, fig) + [cached]
+
+    def _register_control_callbacks(self, graph_id: str, controls: List[str]):
+        ids = control_ids(graph_id)
+        actions = {ids[action]: action for action in ("undo", "redo", "clear")}
+        buttons = [control for control in controls if control in actions]
+        if buttons:
 
             @self.app.callback(
                 Output(graph_id, "figure", allow_duplicate=True),
-                Input(f"tooltip-annotations-to-remove-{graph_id}", "data"),
+                [Input(button, "n_clicks") for button in buttons],
                 State(graph_id, "figure"),
+                State(SESSION_STORE_ID, "data"),
                 prevent_initial_call=True,
             )
-            def remove_empty_annotations(
-                indices_to_remove: List[int], current_figure: Dict[str, Any]
-            ) -> Union[Dict[str, Any], dash._callback.NoUpdate]:
-                """Remove annotations that have been deleted by the user."""
-                if indices_to_remove:
-                    annotations = current_figure["layout"].get("annotations", [])
-                    logger.debug(f"Original Annotations: {annotations}")
-                    updated_annotations = [
-                        anno
-                        for idx, anno in enumerate(annotations)
-                        if idx not in indices_to_remove
-                    ]
-                    logger.debug(f"Indices to Remove: {indices_to_remove}")
-                    logger.debug(f"Updated Annotations: {updated_annotations}")
-                    current_figure["layout"]["annotations"] = updated_annotations
-                    return current_figure
-                return dash.no_update
-
-            # Client-side callback to identify annotations to remove
-            dbg_str = "console.log(relayoutData);" if self.debug else ""
+            def apply_tooltip_control(*args: Any) -> Patch:
+                """Undo, redo or clear the tooltips of the graph."""
+                action = actions[callback_context.triggered_id]
+                figure, session = args[-2:]
+                if action == "clear":
+                    return self.clear_tooltips(graph_id, figure, session)
+                return getattr(self, action)(graph_id, figure, session)
+
+        if ids["hide"] in controls:
+            # Hiding needs no server request
             self.app.clientside_callback(
-                Template(
-                    """
-                    function(relayoutData) {
-                        $dbg_str
-                        var annotationPattern = /annotations\\[(\\d+)\\].text/;
-                        var indicesToRemove = [];
-                        for (var key in relayoutData) {
-                            var match = key.match(annotationPattern);
-                            if (match && relayoutData[key] === "") {
-                                indicesToRemove.push(parseInt(match[1]));
-                            }
-                        }
-                        return indicesToRemove;
-                    }
-                    """
-                ).substitute(dbg_str=dbg_str),
-                Output(f"tooltip-annotations-to-remove-{graph_id}", "data"),
-                Input(graph_id, "relayoutData"),
+                clientside_function("hideTooltips"),
+                Output(graph_id, "figure", allow_duplicate=True),
+                Output(ids["hide"], "children"),
+                Input(ids["hide"], "n_clicks"),
+                State(graph_id, "figure"),
+                State(CONFIG_STORE_ID, "data"),
+                prevent_initial_call=True,
+            )
+
+    def update_view(
+        self,
+        graph_id: str,
+        relayout_data: Optional[Dict[str, Any]],
+        session: Optional[str] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Follows the axis ranges of a graph after zooming or panning.
+
+        Args:
+            graph_id (str): The ID of the graph.
+            relayout_data (dict): The ``relayoutData`` of the graph, or its axis
+                range entries.
+            session (str, optional): The browser session of the graph.
+
+        Returns:
+            Optional[Dict[str, Any]]: The tooltips to hide and show and the cluster
+            badges for the new ranges, and with `cull_margin` the tooltips to
+            remove from and add to the figure; None when the ranges did not change.
+        """
+        state = self.graphs[graph_id].session(session)
+        view = state.view
+        if view is None or not view.relayout(relayout_data):
+            return None
+        changes = view.update()
+        # The browser removes first, then appends
+        for name in changes["remove"]:
+            state.click_index.removed(name)
+        for annotation in changes["add"]:
+            size = state.click_index.size
+            state.click_index.added(annotation["name"], size, size + 1)
+        return changes
+
+    def _register_view_callbacks(self, graph_id: str):
+        # Only axis range changes reach the server
+        self.app.clientside_callback(
+            clientside_function("forwardRanges"),
+            Output(view_ids()["ranges"], "data", allow_duplicate=True),
+            Input(graph_id, "relayoutData"),
+            prevent_initial_call=True,
+        )
+
+    def _register_view_update_callbacks(self, graph_ids: List[str]):
+        ids = view_ids()
+        if self._register_once(ids["view"]):
+
+            @self.app.callback(
+                Output(ids["view"], "data", allow_duplicate=True),
+                Input(ids["ranges"], "data"),
+                State(SESSION_STORE_ID, "data"),
+                prevent_initial_call=True,
+            )
+            def update_tooltip_view(
+                ranges: Optional[Dict[str, Any]], session: Optional[str]
+            ) -> Dict[str, Any]:
+                """Cluster or cull the tooltips for the visible axis ranges."""
+                manager, graph_id = self._dispatched_manager(
+                    ranges, lambda manager, i: manager.graphs[i].follows_view
+                )
+                changes = manager.update_view(graph_id, ranges.get("ranges"), session)
+                if changes is None:
+                    raise dash.PreventUpdate
+                return {"graph": graph_id, "changes": changes}
+
+        self.app.clientside_callback(
+            clientside_function("applyView"),
+            [
+                Output(graph_id, "figure", allow_duplicate=True)
+                for graph_id in graph_ids
+            ],
+            Input(ids["view"], "data"),
+            [State(graph_id, "figure") for graph_id in graph_ids],
+            State(CONFIG_STORE_ID, "data"),
+            prevent_initial_call=True,
+        )
+
+    def _register_edit_callbacks(self, graph_id: str):
+        ids = edit_ids()
+
+        # Drags are debounced in the browser: only their end state is sent
+        self.app.clientside_callback(
+            clientside_function("collectEdits"),
+            Output(ids["edits"], "data", allow_duplicate=True),
+            Input(graph_id, "relayoutData"),
+            State(graph_id, "figure"),
+            State(CONFIG_STORE_ID, "data"),
+            prevent_initial_call=True,
+        )
+
+    def _register_edit_sync_callbacks(self, graph_ids: List[str]):
+        ids = edit_ids()
+        if self._register_once(ids["ack"]):
+
+            @self.app.callback(
+                Output(ids["ack"], "data", allow_duplicate=True),
+                Input(ids["edits"], "data"),
+                State(SESSION_STORE_ID, "data"),
+                prevent_initial_call=True,
+            )
+            def sync_tooltip_edits(
+                edits: Optional[Dict[str, Any]], session: Optional[str]
+            ) -> int:
+                """Record the tooltip edits made in the browser."""
+                manager, graph_id = self._dispatched_manager(
+                    edits, lambda manager, i: manager.sync_edits
+                )
+                return manager.apply_edits(graph_id, edits.get("edits"), session)
+
+        if self._register_once(ids["records"]):
+
+            @self.app.callback(
+                Output(ids["records"], "data"),
+                Input(SESSION_STORE_ID, "data"),
+            )
+            def send_tooltip_records(session: Optional[str]) -> Dict[str, Any]:
+                """Send the tooltips recorded for the session, once it is known."""
+                if session is None:
+                    raise dash.PreventUpdate
+                return self.session_records(session)
+
+        # The records of the session are restored in the browser
+        self.app.clientside_callback(
+            clientside_function("restoreTooltips"),
+            [
+                Output(graph_id, "figure", allow_duplicate=True)
+                for graph_id in graph_ids
+            ],
+            Input(ids["records"], "data"),
+            [State(graph_id, "figure") for graph_id in graph_ids],
+            prevent_initial_call=True,
+        )
+
+    def session_records(self, session: Optional[str]) -> Dict[str, Any]:
+        """
+        Tooltip records of a browser session, keyed by graph ID, for the graphs
+        of all the managers of the app that record edits.
+
+        Records are only sent to their own session: the layout is served to all
+        sessions, and does not hold them.
+        """
+        records = {}
+        for graph_id, manager in _app_managers.get(self.app, {}).items():
+            if manager.sync_edits:
+                tooltips = manager.graphs[graph_id].session(session).records
+                if tooltips:
+                    records[graph_id] = tooltips.annotations
+        return records
+
+    def handle_selection(
+        self, graph_id: str, selection: Optional[Dict[str, Any]]
+    ) -> Patch:
+        """
+        Replaces the summary annotation of the previous selection of a graph with
+        the summary of a box or lasso selection, or removes it.
+
+        Args:
+            graph_id (str): The ID of the graph.
+            selection (dict): The ``range`` or ``lassoPoints`` of the selection,
+                the selected ``curves``, and the current ``figure``; without a
+                range or lasso, the selection was cleared.
+
+        Returns:
+            Patch: A figure patch setting, adding or deleting the summary.
+        """
+        selection = selection or {}
+        figure = selection.get("figure") or {}
+        annotation = None
+        if selection.get("range") or selection.get("lassoPoints"):
+            annotation = summarize_selection(
+                figure,
+                selection,
+                self.selection_template,
+                self.graphs[graph_id].style,
+                self.apply_log_fix,
+            )
+        annotations = _get_annotations(figure)
+        position = next(
+            (
+                i
+                for i, existing in enumerate(annotations)
+                if _get_name(existing) == SELECTION_NAME
+            ),
+            None,
+        )
+        patch = Patch()
+        if annotation is None:
+            if position is None:
+                raise dash.PreventUpdate
+            del patch["layout"]["annotations"][position]
+        elif position is None:
+            patch["layout"]["annotations"].append(annotation)
+        else:
+            patch["layout"]["annotations"][position] = annotation
+        return patch
+
+    def _register_selection_callbacks(self, graph_id: str):
+        # Only the geometry of the selection is sent, not its points
+        self.app.clientside_callback(
+            clientside_function("reduceSelection"),
+            Output(SELECTION_STORE_ID, "data", allow_duplicate=True),
+            Input(graph_id, "selectedData"),
+            State(graph_id, "figure"),
+            State(CONFIG_STORE_ID, "data"),
+            prevent_initial_call=True,
+        )
+
+    def _register_selection_summary_callback(self, graph_ids: List[str]):
+        @self.app.callback(
+            [
+                Output(graph_id, "figure", allow_duplicate=True)
+                for graph_id in graph_ids
+            ],
+            Input(SELECTION_STORE_ID, "data"),
+            prevent_initial_call=True,
+        )
+        def summarize_tooltip_selection(
+            selection: Optional[Dict[str, Any]],
+        ) -> List[Any]:
+            """Summarize the samples of a box or lasso selection."""
+            graph_id = self._dispatched_graph(graph_ids, selection)
+            patch = self.handle_selection(graph_id, selection)
+            return self._dispatch(graph_ids, graph_id, patch)
+
+    def handle_hover(
+        self, graph_id: str, point: Optional[Dict[str, Any]]
+    ) -> Optional[Dict[str, Any]]:
+        """Server-side enrichment of the preview of a hovered point."""
+        return enrich_point(self.hover_enrich, graph_id, point)
+
+    def _register_preview_callbacks(self, graph_id: str):
+        ids = preview_ids(graph_id)
+        add_preview_tooltip(self.app.layout, graph_id)
+        self._stores[ids["templates"]].data[graph_id] = _templates_data(
+            self.graphs[graph_id].templates
+        )
+        if self.hover_enrich is not None:
+            # Throttled in the browser: at most one request per interval
+            self.app.clientside_callback(
+                clientside_function("throttleHover"),
+                Output(ids["hover"], "data", allow_duplicate=True),
+                Input(graph_id, "hoverData"),
+                State(CONFIG_STORE_ID, "data"),
+                prevent_initial_call=True,
+            )
+
+        self.app.clientside_callback(
+            clientside_function("previewHover"),
+            Output(ids["tooltip"], "show"),
+            Output(ids["tooltip"], "bbox"),
+            Output(ids["tooltip"], "children"),
+            Input(graph_id, "hoverData"),
+            Input(ids["enriched"], "data"),
+            State(graph_id, "figure"),
+            State(ids["templates"], "data"),
+        )
+
+    def _register_enrich_callback(self, graph_ids: List[str]):
+        ids = preview_ids(graph_ids[0])
+        if not self._register_once(ids["enriched"]):
+            return
+
+        @self.app.callback(
+            Output(ids["enriched"], "data", allow_duplicate=True),
+            Input(ids["hover"], "data"),
+            prevent_initial_call=True,
+        )
+        def enrich_hover(hover: Optional[Dict[str, Any]]) -> Any:
+            """Add server-side details to the hover preview."""
+            manager, graph_id = self._dispatched_manager(
+                hover, lambda manager, i: manager.hover_enrich is not None
             )
+            return manager.handle_hover(graph_id, hover.get("point"))
 
 
 def tooltip(
@@ -169,6 +1634,30 @@ def tooltip(
     graph_ids: Optional[List[str]] = None,
     apply_log_fix: bool = True,
     debug: bool = False,
+    snap: Optional[str] = None,
+    snap_window: int = 20,
+    avoid_overlap: bool = False,
+    repeat_click: str = "ignore",
+    trace_styles: Optional[Dict[Union[int, str], Dict[Any, Any]]] = None,
+    trace_templates: Optional[Dict[Union[int, str], str]] = None,
+    hover_preview: bool = False,
+    hover_enrich: Optional[HoverEnricher] = None,
+    hover_throttle: int = PREVIEW_THROTTLE_MS,
+    coalesce_clicks: bool = False,
+    overlay_threshold: Optional[int] = None,
+    anchor: Optional[str] = None,
+    sync_edits: bool = False,
+    history_size: int = HISTORY_SIZE,
+    max_sessions: int = MAX_SESSIONS,
+    link_groups: Optional[List[List[str]]] = None,
+    crosshair: Optional[str] = None,
+    stats_window: Optional[int] = None,
+    stats_dx: Any = None,
+    cluster_grid: Optional[int] = None,
+    cull_margin: Optional[float] = None,
+    figure_cache: Optional[int] = None,
+    selection_template: Optional[str] = None,
+    sync_hover: bool = False,
 ) -> TooltipManager:
     """
     Add tooltip functionality to Dash graph components.
@@ -183,6 +1672,88 @@ def tooltip(
                                     If not provided, will try to auto-detect from the layout.
         apply_log_fix (bool): If True, applies a fix for logging issues.
         debug (bool): If True, enables debugging mode.
+        snap (str, optional): Snap clicked points to the local extremum of their trace:
+                              "max", "min" or "auto" (the closest of both in value).
+        snap_window (int): Half-width, in samples, of the window searched when snapping.
+        avoid_overlap (bool): If True, new tooltips are offset so that they do not
+                              cover the existing ones.
+        repeat_click (str): What a click on a point that already has a tooltip does:
+                            "ignore" (default), "toggle" to remove the tooltip,
+                            or "add" to add another one.
+        trace_styles (dict, optional): Style overrides per trace, keyed by trace
+                                       index (int) or trace name (str). Name rules
+                                       apply after index rules.
+        trace_templates (dict, optional): Templates per trace, keyed by trace
+                                          index (int), or trace name or meta tag
+                                          (str). Other traces use `template`.
+        hover_preview (bool): If True, the tooltip of the hovered point is previewed
+                              in the browser, without server requests.
+        hover_enrich (callable, optional): `f(graph_id, point)` returning text added
+                                           to the preview. Enables the preview; the
+                                           hovered points are sent at most once per
+                                           `hover_throttle` milliseconds per graph.
+        hover_throttle (int): Minimum interval, in milliseconds, between two
+                              enrichment requests of a graph.
+        coalesce_clicks (bool): If True, clicks made while the previous ones are
+                                still processed are sent together in one request.
+        overlay_threshold (int, optional): Maximum number of tooltip annotations.
+                                           Older tooltips are drawn by a single
+                                           scatter trace; clicking one of its
+                                           points turns it back into an annotation.
+        anchor (str, optional): Trace attribute identifying samples, e.g. "x", "ids"
+                                or "customdata[0]". Tooltips are then anchored to
+                                their sample, see `extend_data` and `reanchor`.
+        sync_edits (bool): If True, tooltips dragged or rewritten in the browser are
+                           recorded on the server, and put back on the figure when
+                           the page is reloaded.
+        history_size (int): Number of tooltip operations kept per graph and
+                            browser session for `undo` and `redo`. Add
+                            `tooltip_controls(graph_id)` to the layout for undo,
+                            redo, clear and hide buttons.
+        max_sessions (int): Number of browser sessions whose tooltip state is
+                            kept per graph; the least recently used one is
+                            forgotten beyond it.
+        link_groups (list, optional): Groups of graph IDs sharing an x-axis, e.g.
+                                      [["g1", "g2", "g3"]]. A click in one graph of
+                                      a group also adds a tooltip on the nearest
+                                      sample of every trace of the other graphs.
+        crosshair (str, optional): "nearest" or "interpolate" to list the value of
+                                   every visible trace at the clicked x in the
+                                   `%{crosshair}` placeholder, shown by the default
+                                   template.
+        stats_window (int, optional): Half-width, in samples, of the window around
+                                      the clicked sample summarized by the
+                                      `%{win.mean}`, `%{win.min}`, `%{win.max}`,
+                                      `%{win.std}` and `%{win.count}` placeholders.
+        stats_dx (optional): Half-width of that window in x units instead, e.g.
+                             a `datetime.timedelta` on date axes.
+        cluster_grid (int, optional): Number of cells per axis across the visible
+                                      ranges. Tooltips sharing a cell are shown as
+                                      one badge with their count, and expanded
+                                      again when zooming in.
+        cull_margin (float, optional): If set, only the tooltips within the visible
+                                       ranges, widened on each side by this
+                                       fraction of their span, are kept in the
+                                       figure. The others stay on the server and
+                                       are added back when panned or zoomed into.
+        figure_cache (int, optional): Number of figures whose traces are kept in
+                                      server memory, across graphs and sessions.
+                                      Clicks then send the key of the cached
+                                      traces and the layout instead of the whole
+                                      figure, which is only sent after its traces
+                                      changed or were evicted.
+        selection_template (str, optional): Template of the summary annotation of
+                                            box and lasso selections, rendered
+                                            for each selected trace with the
+                                            `%{sel.count}`, `%{sel.x_min}`,
+                                            `%{sel.x_max}`, `%{sel.mean}`,
+                                            `%{sel.min}` and `%{sel.max}`
+                                            placeholders, e.g. SELECTION_TEMPLATE.
+        sync_hover (bool): If True, the hovertemplate of each trace of the graph
+                           figures in the layout is set from its tooltip
+                           template, so that hovering shows the same text
+                           without server requests. Templates using `%{crosshair}`,
+                           `%{win.*}` or `%{sel.*}` are left out.
 
     Returns:
         TooltipManager: An instance of TooltipManager class.
@@ -193,12 +1764,54 @@ def tooltip(
             raise ValueError(
                 "No graphs found in the app layout. Please provide a graph ID."
             )
-    return TooltipManager(app, style, template, graph_ids, apply_log_fix, debug)
+    return TooltipManager(
+        app,
+        style,
+        template,
+        graph_ids,
+        apply_log_fix,
+        debug,
+        snap,
+        snap_window,
+        avoid_overlap,
+        repeat_click,
+        trace_styles,
+        trace_templates,
+        hover_preview,
+        hover_enrich,
+        hover_throttle,
+        coalesce_clicks,
+        overlay_threshold,
+        anchor,
+        sync_edits,
+        history_size,
+        max_sessions,
+        link_groups,
+        crosshair,
+        stats_window,
+        stats_dx,
+        cluster_grid,
+        cull_margin,
+        figure_cache,
+        selection_template,
+        sync_hover,
+    )
 
 
 __all__ = [
     "tooltip",
     "add_annotation_store",
+    "annotate_peaks",
+    "find_peaks",
+    "tooltip_controls",
+    "make_annotation",
+    "make_annotations",
+    "render_batch",
+    "BatchJob",
+    "annotate_figure",
+    "summarize_selection",
+    "SELECTION_TEMPLATE",
+    "SESSION_STORE_ID",
     "DEFAULT_ANNOTATION_CONFIG",
     "DEFAULT_TEMPLATE",
 ]
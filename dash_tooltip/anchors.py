@@ -0,0 +1,301 @@
+import math
+from collections import deque
+from typing import Any, Deque, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from .indexing import _as_array
+from .peaks import _sample, _x_value
+from .placement import _axis_key
+from .utils import _parse_path
+
+
+def _hashable(value: Any) -> Hashable:
+    if isinstance(value, list):
+        return tuple(_hashable(item) for item in value)
+    if hasattr(value, "item"):  # numpy scalars
+        return value.item()
+    return value
+
+
+def trace_key(trace: Any, curve_number: int) -> Hashable:
+    """
+    Identity of a trace that survives figure regeneration: its ``uid``, else its
+    ``name``, else its position.
+    """
+    for attribute in ("uid", "name"):
+        value = trace[attribute] if attribute in trace else None
+        if value is not None:
+            return value
+    return curve_number
+
+
+class SampleIndex:
+    """
+    Hash index from the sample keys of a trace to their current position.
+
+    Keys get increasing absolute numbers and a position is the absolute number
+    minus the number of samples dropped from the front, so appending samples
+    and dropping the oldest ones, as ``extendData`` with ``maxPoints`` does,
+    costs as much as the change and not as the trace length.
+    """
+
+    __slots__ = ("keys", "_numbers", "_base")
+
+    def __init__(self, keys: Iterable[Hashable] = ()):
+        self.keys: Deque[Hashable] = deque()
+        self._numbers: Dict[Hashable, int] = {}
+        self._base = 0
+        self.extend(keys)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def position(self, key: Hashable) -> Optional[int]:
+        """Current position of the sample ``key``, or None if it is not in the trace."""
+        number = self._numbers.get(key)
+        return None if number is None else number - self._base
+
+    def _drop(self, count: int) -> List[Hashable]:
+        dropped = []
+        for _ in range(min(count, len(self.keys))):
+            key = self.keys.popleft()
+            if self._numbers.get(key) == self._base:
+                del self._numbers[key]
+                dropped.append(key)
+            self._base += 1
+        return dropped
+
+    def extend(
+        self, keys: Iterable[Hashable], max_points: Optional[int] = None
+    ) -> List[Hashable]:
+        """
+        Appends samples, then drops the oldest ones beyond ``max_points``.
+
+        Returns:
+            List[Hashable]: The keys that left the trace.
+        """
+        for key in keys:
+            self._numbers[key] = self._base + len(self.keys)
+            self.keys.append(key)
+        if max_points is not None and len(self.keys) > max_points:
+            return self._drop(len(self.keys) - max_points)
+        return []
+
+    def sync(self, keys: List[Hashable]) -> List[Hashable]:
+        """
+        Follows the new sample keys of a regenerated trace.
+
+        When the trace is the previous one with samples dropped from the front and
+        appended at the end, only those samples are processed; otherwise the index
+        is rebuilt.
+
+        Returns:
+            List[Hashable]: The keys that left the trace.
+        """
+        first = self.position(keys[0]) if keys else None
+        if first is not None:
+            kept = len(self.keys) - first
+            if kept <= len(keys) and (kept == 0 or keys[kept - 1] == self.keys[-1]):
+                dropped = self._drop(first)
+                self.extend(keys[kept:])
+                return dropped
+        previous = set(self._numbers)
+        self.keys = deque()
+        self._numbers = {}
+        self._base = 0
+        self.extend(keys)
+        return [key for key in previous if key not in self._numbers]
+
+
+class AnchoredTooltip:
+    """A tooltip annotation and the sample it is anchored to."""
+
+    __slots__ = ("trace_key", "sample_key", "annotation")
+
+    def __init__(
+        self, trace_key: Hashable, sample_key: Hashable, annotation: Dict[str, Any]
+    ):
+        self.trace_key = trace_key
+        self.sample_key = sample_key
+        self.annotation = annotation
+
+
+class AnchorRegistry:
+    """
+    Tooltips of a graph anchored to ``(trace key, sample key)`` pairs.
+
+    ``anchor`` names the trace attribute that identifies samples, e.g. ``"x"`` for
+    time series, ``"ids"``, or a column such as ``"customdata[0]"``.
+    """
+
+    __slots__ = ("anchor", "_path", "samples", "tooltips", "_by_sample", "curves")
+
+    def __init__(self, anchor: str):
+        self.anchor = anchor
+        self._path = _parse_path(anchor)[0]
+        self.samples: Dict[Hashable, SampleIndex] = {}
+        self.tooltips: Dict[str, AnchoredTooltip] = {}
+        self._by_sample: Dict[Tuple[Hashable, Hashable], str] = {}
+        self.curves: Dict[int, Hashable] = {}
+
+    def _column(self, values: Any) -> List[Hashable]:
+        column = self._path[1]
+        if isinstance(values, dict):
+            values = _as_array(values)
+        if values is None:
+            return []
+        if hasattr(values, "tolist"):
+            values = values.tolist()
+        if column is not None:
+            return [_hashable(row[column]) for row in values]
+        return [_hashable(value) for value in values]
+
+    def sample_keys(self, trace: Any) -> List[Hashable]:
+        """Sample keys of a trace, in order."""
+        attribute = self._path[0]
+        return self._column(trace[attribute] if attribute in trace else None)
+
+    def index(self, trace: Any, curve_number: int) -> Tuple[Hashable, SampleIndex]:
+        """Sample index of a trace, built on first use."""
+        key = trace_key(trace, curve_number)
+        self.curves[curve_number] = key
+        if key not in self.samples:
+            self.samples[key] = SampleIndex(self.sample_keys(trace))
+        return key, self.samples[key]
+
+    def key(
+        self, trace: Any, curve_number: int, point_number: int
+    ) -> Tuple[Hashable, Hashable]:
+        """``(trace key, sample key)`` of a clicked point."""
+        key, index = self.index(trace, curve_number)
+        attribute, column = self._path
+        value = _sample(trace, attribute, point_number)
+        sample = _hashable(value[column] if column is not None else value)
+        if index.position(sample) != point_number:
+            # The trace changed without the index following it
+            index.sync(self.sample_keys(trace))
+        return key, sample
+
+    def add(
+        self, name: str, key: Tuple[Hashable, Hashable], annotation: Dict[str, Any]
+    ) -> None:
+        self.remove(name)
+        self.tooltips[name] = AnchoredTooltip(key[0], key[1], annotation)
+        self._by_sample[key] = name
+
+    def remove(self, name: str) -> None:
+        tooltip = self.tooltips.pop(name, None)
+        if tooltip is not None:
+            self._by_sample.pop((tooltip.trace_key, tooltip.sample_key), None)
+
+    def retain(self, names: Iterable[str]) -> None:
+        """Forgets the tooltips whose names are not in ``names``."""
+        kept = set(names)
+        for name in [name for name in self.tooltips if name not in kept]:
+            self.remove(name)
+
+    def dropped(self, trace: Hashable, keys: Iterable[Hashable]) -> List[str]:
+        """Removes and returns the tooltips anchored to samples that left ``trace``."""
+        names = []
+        for sample in keys:
+            name = self._by_sample.get((trace, sample))
+            if name is not None:
+                self.remove(name)
+                names.append(name)
+        return names
+
+    def extend(
+        self,
+        update: Dict[str, Any],
+        curve_numbers: List[int],
+        max_points: Any = None,
+    ) -> List[str]:
+        """
+        Follows an ``extendData`` update of the figure.
+
+        Returns:
+            List[str]: The names of the tooltips whose samples left their trace.
+        """
+        attribute = self._path[0]
+        names: List[str] = []
+        for i, curve_number in enumerate(curve_numbers):
+            key = self.curves.get(curve_number)
+            if key is None or attribute not in update:
+                continue
+            if isinstance(max_points, dict):
+                limit = max_points.get(attribute)
+                limit = limit[i] if isinstance(limit, list) else limit
+            else:
+                limit = max_points
+            keys = self._column(update[attribute][i])
+            names += self.dropped(key, self.samples[key].extend(keys, limit))
+        return names
+
+
+def _coordinate(fig: Any, value: Any, ref: str, apply_log_fix: bool) -> Any:
+    if apply_log_fix and value is not None and fig.layout[_axis_key(ref)].type == "log":
+        return math.log10(value)
+    return value
+
+
+def reanchor(fig: Any, registry: AnchorRegistry, apply_log_fix: bool = True) -> None:
+    """
+    Moves the anchored tooltips of a figure to the current position of their
+    samples, adding back the ones the figure lost and dropping the ones whose
+    sample is gone.
+    """
+    traces = {trace_key(trace, i): i for i, trace in enumerate(fig.data)}
+    annotations = list(fig.layout.annotations)
+    positions = {a.name: i for i, a in enumerate(annotations) if a.name}
+    removed = set()
+
+    by_trace: Dict[Hashable, List[str]] = {}
+    for name, tooltip in registry.tooltips.items():
+        by_trace.setdefault(tooltip.trace_key, []).append(name)
+
+    for key, names in by_trace.items():
+        curve_number = traces.get(key)
+        if curve_number is None:
+            removed.update(names)
+            continue
+        trace = fig.data[curve_number]
+        registry.curves[curve_number] = key
+        keys = registry.sample_keys(trace)
+        if key in registry.samples:
+            registry.samples[key].sync(keys)
+        else:
+            registry.samples[key] = SampleIndex(keys)
+        index = registry.samples[key]
+        for name in names:
+            tooltip = registry.tooltips[name]
+            position = index.position(tooltip.sample_key)
+            if position is None:
+                removed.add(name)
+                continue
+            annotation = dict(tooltip.annotation)
+            annotation["x"] = _coordinate(
+                fig,
+                _x_value(trace, position),
+                annotation.get("xref", "x"),
+                apply_log_fix,
+            )
+            annotation["y"] = _coordinate(
+                fig,
+                _sample(trace, "y", position),
+                annotation.get("yref", "y"),
+                apply_log_fix,
+            )
+            tooltip.annotation = annotation
+            if name in positions:
+                annotations[positions[name]].update(
+                    x=annotation["x"], y=annotation["y"]
+                )
+            else:
+                annotations.append(annotation)
+
+    for name in removed:
+        registry.remove(name)
+    fig.layout.annotations = [
+        a
+        for a in annotations
+        if (a["name"] if isinstance(a, dict) else a.name) not in removed
+    ]
@@ -0,0 +1,291 @@
+import functools
+import logging
+import math
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple, Union
+
+import plotly.io as pio
+
+from .config import DEFAULT_TEMPLATE
+from .style import TooltipStyle
+from .utils import (
+    CompiledTemplate,
+    TraceSelector,
+    TraceTemplates,
+    compile_template,
+    make_annotations,
+)
+
+logger = logging.getLogger("dash_tooltip")
+
+BATCH_FORMATS = ("html", "json")
+# Chunks per worker: small enough to balance uneven figures, large enough that
+# the style and templates are resolved once per chunk rather than per figure
+CHUNKS_PER_PROCESS = 4
+
+FigureSource = Union[Dict[str, Any], Any, Callable[[], Any]]
+
+_AXIS_KEY_PATTERN = re.compile(r"^([xy])axis(\d*)$")
+
+
+class BatchJob:
+    """
+    A figure to render with its saved tooltips.
+
+    The figure can be given as a factory, called in the worker process, so that
+    large figures are built where they are rendered instead of being pickled.
+    Factories must be picklable, e.g. module-level functions or
+    `functools.partial` objects.
+
+    Saved tooltips are either clicked points, as in ``clickData["points"]``,
+    annotated like clicks; or annotation dictionaries, such as the records kept
+    by ``sync_edits``, appended as they are. A ``clickData`` dictionary or a
+    mapping of records by tooltip id is also accepted.
+    """
+
+    __slots__ = ("name", "figure", "tooltips")
+
+    def __init__(self, name: str, figure: FigureSource, tooltips: Any = None):
+        self.name = name
+        self.figure = figure
+        self.tooltips = tooltips
+
+
+class BatchReport:
+    """Written files of a batch, in job order, and its throughput."""
+
+    __slots__ = ("paths", "seconds", "processes", "chunksize")
+
+    def __init__(
+        self, paths: List[str], seconds: float, processes: int, chunksize: int
+    ):
+        self.paths = paths
+        self.seconds = seconds
+        self.processes = processes
+        self.chunksize = chunksize
+
+    @property
+    def count(self) -> int:
+        return len(self.paths)
+
+    @property
+    def throughput(self) -> float:
+        """Figures rendered per second."""
+        return self.count / self.seconds if self.seconds > 0 else math.inf
+
+    def __repr__(self) -> str:
+        return (
+            f"BatchReport({self.count} figures in {self.seconds:.2f} s, "
+            f"{self.throughput:.1f} figures/s, {self.processes} processes)"
+        )
+
+
+class _BatchSettings:
+    """Picklable settings of the workers, resolved once per chunk."""
+
+    __slots__ = (
+        "output_dir",
+        "fmt",
+        "template",
+        "trace_templates",
+        "style",
+        "trace_styles",
+        "apply_log_fix",
+        "include_plotlyjs",
+    )
+
+    def __init__(self, **settings: Any):
+        for key, value in settings.items():
+            setattr(self, key, value)
+
+
+def render_batch(
+    jobs: List[BatchJob],
+    output_dir: str,
+    fmt: str = "html",
+    template: str = DEFAULT_TEMPLATE,
+    style: Optional[Dict[Any, Any]] = None,
+    trace_templates: Optional[Dict[TraceSelector, str]] = None,
+    trace_styles: Optional[Dict[TraceSelector, Dict[Any, Any]]] = None,
+    apply_log_fix: bool = True,
+    processes: Optional[int] = None,
+    chunksize: Optional[int] = None,
+    include_plotlyjs: Union[bool, str] = "cdn",
+) -> BatchReport:
+    """
+    Renders figures with their saved tooltips to standalone HTML or figure JSON,
+    across a process pool.
+
+    Tooltips are computed like clicks in an app, with the same templates and
+    style, without a Dash app or callback context. Jobs are split into chunks,
+    a few per process, and the files are written by the workers.
+
+    Args:
+        jobs (List[BatchJob]): The figures, named after their output file.
+        output_dir (str): The directory of the files, created if missing.
+        fmt (str): ``"html"`` for standalone pages, ``"json"`` for figure JSON.
+        template (str): The tooltip template.
+        style (Dict[Any, Any], optional): The annotation style, merged over the
+            default one.
+        trace_templates (dict, optional): Templates of particular traces, see
+            `tooltip`.
+        trace_styles (dict, optional): Styles of particular traces, see `tooltip`.
+        apply_log_fix (bool): Whether to place tooltips on log axes in log10.
+        processes (int, optional): The number of worker processes; defaults to
+            the number of CPUs. With 1, the jobs are rendered in this process.
+        chunksize (int, optional): The number of jobs sent to a worker at once;
+            defaults to about ``CHUNKS_PER_PROCESS`` chunks per process.
+        include_plotlyjs (Union[bool, str]): How HTML pages load plotly.js, see
+            `plotly.io.write_html`; ``"cdn"`` keeps the pages small.
+
+    Returns:
+        BatchReport: The written paths, in job order, and the throughput.
+
+    Note:
+        On platforms starting workers with ``spawn``, such as Windows and macOS,
+        call it under ``if __name__ == "__main__":``.
+    """
+    if fmt not in BATCH_FORMATS:
+        raise ValueError(
+            f"Invalid format provided: {fmt}, expected one of {BATCH_FORMATS}"
+        )
+    if processes is None:
+        processes = os.cpu_count() or 1
+    if processes < 1:
+        raise ValueError(f"Invalid processes provided: {processes}")
+    if chunksize is not None and chunksize < 1:
+        raise ValueError(f"Invalid chunksize provided: {chunksize}")
+    names = set()
+    for job in jobs:
+        if job.name in names:
+            raise ValueError(f"Invalid job name provided: {job.name} is duplicated")
+        names.add(job.name)
+    os.makedirs(output_dir, exist_ok=True)
+
+    settings = _BatchSettings(
+        output_dir=output_dir,
+        fmt=fmt,
+        template=template,
+        trace_templates=trace_templates,
+        style=style,
+        trace_styles=trace_styles,
+        apply_log_fix=apply_log_fix,
+        include_plotlyjs=include_plotlyjs,
+    )
+    if chunksize is None:
+        chunksize = max(1, math.ceil(len(jobs) / (processes * CHUNKS_PER_PROCESS)))
+    chunks = [jobs[i : i + chunksize] for i in range(0, len(jobs), chunksize)]
+    processes = min(processes, len(chunks)) or 1
+
+    start = time.perf_counter()
+    if processes == 1:
+        results = [_render_chunk(settings, chunk) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            results = list(
+                executor.map(functools.partial(_render_chunk, settings), chunks)
+            )
+    report = BatchReport(
+        [path for paths in results for path in paths],
+        time.perf_counter() - start,
+        processes,
+        chunksize,
+    )
+    logger.info(repr(report))
+    return report
+
+
+def _render_chunk(settings: _BatchSettings, jobs: List[BatchJob]) -> List[str]:
+    """Renders a chunk of jobs in a worker and returns the written paths."""
+    template: Union[CompiledTemplate, TraceTemplates] = (
+        TraceTemplates(settings.template, settings.trace_templates)
+        if settings.trace_templates
+        else compile_template(settings.template)
+    )
+    style = TooltipStyle(settings.style, settings.trace_styles)
+    paths = []
+    for job in jobs:
+        figure = annotate_figure(
+            job.figure, job.tooltips, template, style, settings.apply_log_fix
+        )
+        path = os.path.join(settings.output_dir, f"{job.name}.{settings.fmt}")
+        if settings.fmt == "html":
+            pio.write_html(
+                figure,
+                path,
+                include_plotlyjs=settings.include_plotlyjs,
+                validate=False,
+            )
+        else:
+            pio.write_json(figure, path, validate=False)
+        paths.append(path)
+    return paths
+
+
+def annotate_figure(
+    figure: FigureSource,
+    tooltips: Any,
+    template: Union[str, CompiledTemplate, TraceTemplates] = DEFAULT_TEMPLATE,
+    style: Union[Dict[Any, Any], TooltipStyle, None] = None,
+    apply_log_fix: bool = True,
+) -> Dict[str, Any]:
+    """
+    Adds saved tooltips to a figure, as `render_batch` does for each job.
+
+    Args:
+        figure: A plotly figure, a figure dictionary, or a factory of either.
+        tooltips: The saved tooltips, see `BatchJob`.
+        template (Union[str, CompiledTemplate, TraceTemplates]): The template.
+        style (Union[Dict[Any, Any], TooltipStyle], optional): The style.
+        apply_log_fix (bool): Whether to place tooltips on log axes in log10.
+
+    Returns:
+        Dict[str, Any]: The figure dictionary, without changes to the given one.
+    """
+    if callable(figure):
+        figure = figure()
+    if hasattr(figure, "to_plotly_json"):
+        figure = figure.to_plotly_json()
+    figure = dict(figure)
+    layout = dict(figure.get("layout") or {})
+    points, annotations = _split_tooltips(tooltips)
+    if points:
+        log_axes = _log_axes(layout) if apply_log_fix else ()
+        annotations = annotations + make_annotations(
+            {"points": points}, figure.get("data"), template, style, log_axes
+        )
+    layout["annotations"] = list(layout.get("annotations") or []) + annotations
+    figure["layout"] = layout
+    return figure
+
+
+def _split_tooltips(tooltips: Any) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Clicked points and annotation dictionaries of saved tooltips."""
+    if not tooltips:
+        return [], []
+    if isinstance(tooltips, Mapping):
+        if "points" in tooltips:
+            tooltips = tooltips["points"]
+        else:
+            # Records by tooltip id
+            tooltips = list(tooltips.values())
+    points, annotations = [], []
+    for tooltip in tooltips:
+        if "text" in tooltip:
+            annotations.append(dict(tooltip))
+        else:
+            points.append(tooltip)
+    return points, annotations
+
+
+def _log_axes(layout: Dict[str, Any]) -> Tuple[str, ...]:
+    """References of the log axes of a layout, e.g. ("y", "x2")."""
+    refs = []
+    for key, axis in layout.items():
+        match = _AXIS_KEY_PATTERN.match(key)
+        if match and isinstance(axis, Mapping) and axis.get("type") == "log":
+            refs.append(match.group(1) + match.group(2))
+    return tuple(refs)
@@ -0,0 +1,10 @@
+from typing import Dict
+
+# A batch that is not acknowledged within this delay is considered lost, e.g.
+# after a server error, and the queued clicks are sent anyway.
+CLICK_ACK_TIMEOUT_MS = 10000
+
+
+def coalesce_ids() -> Dict[str, str]:
+    """IDs of the stores of the click batches and their acknowledgements."""
+    return {"batch": "tooltip-click-batch", "ack": "tooltip-click-ack"}
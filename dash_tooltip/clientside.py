@@ -0,0 +1,54 @@
+from typing import Any, Dict
+
+from dash import ClientsideFunction
+from dash.development.base_component import ComponentRegistry
+
+from .clicks import CLICK_ACK_TIMEOUT_MS
+from .edits import EDIT_DEBOUNCE_MS, EDITABLE_PROPERTIES
+from .registry import ANNOTATION_NAME_PREFIX
+from .selection import SELECTION_NAME
+from .state import SESSION_STORE_ID
+from .viewport import CLUSTER_UID_PREFIX
+
+NAMESPACE = "dash_tooltip"
+SCRIPT = "dash_tooltip.js"
+CONFIG_STORE_ID = "tooltip-config"
+
+
+def register_script() -> None:
+    """
+    Has Dash serve the clientside callbacks of dash_tooltip as a static script.
+
+    Dash adds the ``_js_dist`` scripts of the packages in its component registry
+    to the index page, with URLs fingerprinted by version and modification time,
+    so browsers cache them for a year instead of downloading inline code on each
+    load.
+    """
+    ComponentRegistry.registry.add(NAMESPACE)
+
+
+def clientside_function(name: str) -> ClientsideFunction:
+    """A clientside callback of the static script, by function name."""
+    return ClientsideFunction(NAMESPACE, name)
+
+
+def config_data() -> Dict[str, Any]:
+    """
+    Initial data of the store of the clientside settings.
+
+    The store is passed as the last argument of the clientside callbacks that
+    need settings: the ``constants`` shared by all graphs, and the ``graphs``
+    settings, such as ``debug``, keyed by graph ID.
+    """
+    return {
+        "constants": {
+            "annotationPrefix": ANNOTATION_NAME_PREFIX,
+            "clusterPrefix": CLUSTER_UID_PREFIX,
+            "timeout": CLICK_ACK_TIMEOUT_MS,
+            "debounce": EDIT_DEBOUNCE_MS,
+            "editable": list(EDITABLE_PROPERTIES),
+            "selectionName": SELECTION_NAME,
+            "sessionKey": SESSION_STORE_ID,
+        },
+        "graphs": {},
+    }
@@ -0,0 +1,180 @@
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+from .indexing import IndexCache, _as_array, data_key
+from .links import SortedX
+from .overlay import is_tooltip_trace
+from .utils import compile_template
+
+CROSSHAIR_MODES = ("nearest", "interpolate")
+
+CROSSHAIR_TEMPLATE = "x: %{x}<br>%{crosshair}"
+
+# One line of the crosshair placeholder per trace
+CROSSHAIR_LINE = "%{name}: %{y:.4g}"
+
+
+def _explicit_x(trace: Any, count: int) -> Any:
+    if "x" in trace and trace["x"] is not None:
+        return trace["x"]
+    x0 = trace["x0"] if "x0" in trace and trace["x0"] is not None else 0
+    dx = trace["dx"] if "dx" in trace and trace["dx"] is not None else 1
+    return x0 + dx * np.arange(count)
+
+
+class _TraceGroup:
+    """Traces sharing their x values: one sorted x index, y values as rows."""
+
+    __slots__ = ("x", "curves", "y")
+
+    def __init__(self, x: SortedX, curves: List[int], y: np.ndarray):
+        self.x = x
+        self.curves = np.asarray(curves)
+        self.y = y
+
+
+class CrosshairIndex:
+    """
+    Values of all the traces of a figure at any x.
+
+    Traces are grouped by x values, and each group keeps its x values sorted once
+    and its y values as a matrix, so a query costs one binary search and one
+    vectorized gather (or interpolation) per group, whatever the number of traces
+    and samples.
+    """
+
+    __slots__ = ("groups", "names")
+
+    def __init__(self, data: Any):
+        self.groups: List[_TraceGroup] = []
+        self.names: List[str] = []
+        by_x: Dict[Hashable, List[Tuple[np.ndarray, List[int], List[Any]]]] = {}
+        for curve_number, trace in enumerate(data):
+            name = trace["name"] if "name" in trace else None
+            self.names.append(
+                str(name) if name is not None else f"trace {curve_number}"
+            )
+            y = trace["y"] if "y" in trace else None
+            if y is None or is_tooltip_trace(trace):
+                continue
+            y = _as_array(y, dtype=float)
+            x = _as_array(_explicit_x(trace, len(y)))
+            # Keys only narrow the candidates: groups share exactly equal x
+            candidates = by_x.setdefault((len(y), data_key(x)), [])
+            group = next(
+                (
+                    candidate
+                    for candidate in candidates
+                    if np.array_equal(candidate[0], x, equal_nan=x.dtype.kind in "fc")
+                ),
+                None,
+            )
+            if group is None:
+                group = (x, [], [])
+                candidates.append(group)
+            group[1].append(curve_number)
+            group[2].append(y)
+        for candidates in by_x.values():
+            for x, curves, ys in candidates:
+                index = SortedX(x)
+                if not len(index):
+                    continue
+                y = np.vstack(ys)
+                if not np.array_equal(index.order, np.arange(y.shape[1])):
+                    y = y[:, index.order]
+                self.groups.append(_TraceGroup(index, curves, y))
+
+    def values(self, x: Any, mode: str = "nearest") -> List[Tuple[int, float]]:
+        """
+        Values of the traces at ``x``, as ``(curve number, y)`` in trace order.
+
+        With ``"nearest"``, each trace gives its sample nearest to ``x``; with
+        ``"interpolate"``, the linear interpolation of its two samples around
+        ``x``, and nothing outside of its x range. NaN values are left out.
+        """
+        rows = []
+        for group in self.groups:
+            sorted_x = group.x.values
+            position = group.x.position(x)
+            if position is None:
+                continue
+            value, right = position
+            if mode == "interpolate":
+                if right == 0 or right == sorted_x.size:
+                    if right == 0 and value == sorted_x[0]:
+                        rows.append((group.curves, group.y[:, 0]))
+                    continue
+                left = right - 1
+                span = sorted_x[right] - sorted_x[left]
+                t = (value - sorted_x[left]) / span if span else 0.0
+                y = group.y[:, left] * (1 - t) + group.y[:, right] * t
+            else:
+                if right == sorted_x.size or (
+                    right > 0 and value - sorted_x[right - 1] <= sorted_x[right] - value
+                ):
+                    right -= 1
+                y = group.y[:, right]
+            rows.append((group.curves, y))
+        result = [
+            (int(curve), float(y))
+            for curves, ys in rows
+            for curve, y in zip(curves, ys)
+            if not np.isnan(y)
+        ]
+        return sorted(result)
+
+
+def crosshair_index(
+    figure: Any, cache: Optional[IndexCache] = None, revision: Hashable = None
+) -> CrosshairIndex:
+    """
+    Crosshair index of a figure, cached by data revision.
+
+    Args:
+        figure: The figure, as a dictionary or plotly figure.
+        cache (IndexCache, optional): Cache of the indices.
+        revision (Hashable, optional): Identity of the figure data, e.g. from
+            `data_revision`. Defaults to the `data_key` of the x and y values of
+            each trace, which costs O(1) per trace whatever its length.
+    """
+    data = figure["data"]
+    if cache is None:
+        return CrosshairIndex(data)
+    if revision is None:
+        revision = tuple(
+            (
+                data_key(trace["x"] if "x" in trace else None),
+                data_key(trace["y"] if "y" in trace else None),
+                trace["x0"] if "x0" in trace else None,
+                trace["dx"] if "dx" in trace else None,
+            )
+            for trace in data
+        )
+    return cache.get_or_build(("crosshair", revision), lambda: CrosshairIndex(data))
+
+
+def _visible(trace: Any) -> bool:
+    visible = trace["visible"] if "visible" in trace else None
+    return visible is None or visible is True
+
+
+def crosshair_text(
+    figure: Any,
+    x: Any,
+    mode: str = "nearest",
+    cache: Optional[IndexCache] = None,
+    revision: Hashable = None,
+) -> str:
+    """
+    Text of the crosshair placeholder: one line per visible trace with its value
+    at ``x``, formatted with `CROSSHAIR_LINE`.
+    """
+    index = crosshair_index(figure, cache, revision)
+    line = compile_template(CROSSHAIR_LINE)
+    data = figure["data"]
+    return "<br>".join(
+        line.render({"name": index.names[curve], "x": x, "y": y})
+        for curve, y in index.values(x, mode)
+        if _visible(data[curve])
+    )
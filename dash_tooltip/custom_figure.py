@@ -1,6 +1,6 @@
 import plotly.graph_objs as go
 
-from dash_tooltip import DEFAULT_TEMPLATE
+from .config import DEFAULT_TEMPLATE
 
 
 class CustomFigure(go.Figure):
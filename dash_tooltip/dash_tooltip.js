@@ -0,0 +1,636 @@
+/*
+ * Clientside callbacks of dash_tooltip, registered on the `dash_tooltip`
+ * namespace of `window.dash_clientside`.
+ *
+ * The settings of each callback are read from the `tooltip-config` store,
+ * passed as its last argument: `constants` shared by all graphs, and `graphs`
+ * holding the settings of each graph, such as `debug` and `throttle`.
+ *
+ * The stores are shared by all graphs: the data sent through them names its
+ * graph, and callbacks ignore the data of other graphs.
+ */
+window.dash_clientside = window.dash_clientside || {};
+
+(function() {
+    "use strict";
+
+    // ID of the graph whose property is the first input of the callback
+    function inputGraph() {
+        var inputs = window.dash_clientside.callback_context.inputs_list;
+        var first = Array.isArray(inputs[0]) ? inputs[0][0] : inputs[0];
+        return first.id;
+    }
+
+    function settings(config, graphId) {
+        config = config || {};
+        return Object.assign(
+            {}, config.constants || {}, (config.graphs || {})[graphId] || {}
+        );
+    }
+
+    // IDs of the graphs whose figures are the outputs of a dispatching callback,
+    // in the order of their figures among the states
+    function outputGraphs() {
+        var outputs = window.dash_clientside.callback_context.outputs_list;
+        return (Array.isArray(outputs) ? outputs : [outputs]).map(
+            function(output) { return output.id; }
+        );
+    }
+
+    // Whether the callback was only triggered by data sent to another graph
+    function otherGraph(data, graphId) {
+        var props = triggeredProps();
+        return Boolean(data) && data.graph !== graphId && props.every(
+            function(prop) { return prop.indexOf(graphId + ".") !== 0; }
+        );
+    }
+
+    function triggeredProps() {
+        return (window.dash_clientside.callback_context.triggered || []).map(
+            function(t) { return t.prop_id; }
+        );
+    }
+
+    function withoutBbox(point) {
+        var copy = {};
+        Object.keys(point).forEach(function(key) {
+            if (key !== "bbox") {
+                copy[key] = point[key];
+            }
+        });
+        return copy;
+    }
+
+    // Renders a tooltip template like `CompiledTemplate.render`. Python format
+    // specs are ported for the usual number formats; other values are shown as
+    // strings, like an invalid format.
+    function extract(point, name) {
+        var temp = point;
+        var parts = name.split(".");
+        for (var i = 0; i < parts.length; i++) {
+            if (!temp || typeof temp !== "object" || Array.isArray(temp)) {
+                return null;
+            }
+            var indexed = /^(\w+)\[(\d+)\]/.exec(parts[i]);
+            if (indexed) {
+                var values = temp[indexed[1]];
+                temp = values ? values[parseInt(indexed[2])] : undefined;
+            } else {
+                temp = temp[parts[i]];
+            }
+        }
+        return temp === undefined ? null : temp;
+    }
+
+    // Significant digits of |value| and its decimal exponent, rounded to
+    // `precision` digits, or to the shortest repr when precision is null
+    function decimal(value, precision) {
+        var parts = Math.abs(value).toExponential(
+            precision === null ? undefined : precision - 1
+        ).split("e");
+        return {digits: parts[0].replace(".", "").replace(/0+$/, "") || "0",
+                exponent: parseInt(parts[1])};
+    }
+
+    // Python's "g" presentation type, and "" for floats (`repr`) when `repr` is
+    // true: 6 significant digits by default, switching to scientific notation
+    // below 1e-4 or from 10 ** precision (1e16 for repr, 10 ** (precision - 1)
+    // with a precision); trailing zeros are removed, except one after the point
+    // for "".
+    function general(value, precision, repr) {
+        var size = precision === null ? (repr ? null : 6) : (precision || 1);
+        var d = decimal(value, size);
+        var digits = d.digits;
+        var exponent = d.exponent;
+        var limit = size === null ? 16 : (repr ? size - 1 : size);
+        if (exponent < -4 || exponent >= limit) {
+            var mantissa = digits.length > 1 ? digits[0] + "." + digits.slice(1) : digits;
+            var power = String(Math.abs(exponent));
+            return mantissa + "e" + (exponent < 0 ? "-" : "+")
+                + (power.length < 2 ? "0" + power : power);
+        }
+        var whole = exponent < 0 ? "0" : digits.slice(0, exponent + 1);
+        while (whole.length < exponent + 1) {
+            whole += "0";
+        }
+        var fraction = exponent < 0
+            ? new Array(-exponent).join("0") + digits
+            : digits.slice(exponent + 1);
+        return whole + (fraction ? "." + fraction : (repr ? ".0" : ""));
+    }
+
+    // Formats a number like `format(value, spec)` in Python, or like `str(value)`
+    // when Python would raise a ValueError. JavaScript has no integer type: safe
+    // integers are formatted as Python ints, as `json` decodes them. Values
+    // exactly halfway, such as 0.125 to 2 decimals, are rounded up rather than
+    // to even.
+    function format(value, spec) {
+        var m = /^([+\- ]?)(,?)(?:\.(\d+))?([fFeE%dgGs]?)$/.exec(spec);
+        if (typeof value !== "number") {
+            return String(value);
+        }
+        var integer = Number.isSafeInteger(value);
+        var digits = m && m[3] !== undefined ? parseInt(m[3]) : null;
+        if (!m || m[4] === "s" || (m[4] === "d" && !integer)
+                || (m[4] === "" && integer && digits !== null)) {
+            return format(value, "");
+        }
+        var kind = m[4].toLowerCase();
+        var text;
+        if (!isFinite(value)) {
+            text = (isNaN(value) ? "nan" : "inf") + (kind === "%" ? "%" : "");
+        } else if (kind === "f") {
+            text = Math.abs(value).toFixed(digits === null ? 6 : digits);
+        } else if (kind === "%") {
+            text = Math.abs(value * 100).toFixed(digits === null ? 6 : digits) + "%";
+        } else if (kind === "e") {
+            text = Math.abs(value).toExponential(digits === null ? 6 : digits)
+                .replace(/e([+-])(\d)$/, "e$10$2");
+        } else if (kind === "g" || (kind === "" && !integer)) {
+            text = general(value, digits, kind === "");
+        } else {
+            text = String(Math.abs(value));
+        }
+        if (kind !== m[4]) {
+            text = text.toUpperCase();
+        }
+        if (m[2]) {
+            var parts = text.split(".");
+            parts[0] = parts[0].replace(/\B(?=(\d{3})+(?!\d))/g, ",");
+            text = parts.join(".");
+        }
+        var sign = value < 0 ? "-" : (m[1] === "-" ? "" : m[1]);
+        return sign + text;
+    }
+
+    function render(template, point) {
+        var text = template;
+        var seen = {};
+        var pattern = /%{(.*?)}/g;
+        var match;
+        while ((match = pattern.exec(template)) !== null) {
+            if (seen[match[1]]) {
+                continue;
+            }
+            seen[match[1]] = true;
+            var parts = match[1].split(":");
+            var value = extract(point, parts[0]);
+            if (value === null) {
+                continue;
+            }
+            var formatted = format(value, parts.length > 1 ? parts[1] : "");
+            text = text.split(match[0]).join(formatted);
+        }
+        return text;
+    }
+
+    function choose(templates, point) {
+        var meta = point.meta;
+        var tag = typeof meta === "string" ? meta
+            : (meta && typeof meta.tag === "string" ? meta.tag : null);
+        var names = templates.names;
+        if (point.name != null && names.hasOwnProperty(point.name)) {
+            return names[point.name];
+        }
+        if (tag !== null && names.hasOwnProperty(tag)) {
+            return names[tag];
+        }
+        if (templates.indices.hasOwnProperty(String(point.curveNumber))) {
+            return templates.indices[String(point.curveNumber)];
+        }
+        return templates["default"];
+    }
+
+    // The figure with the records missing from it, or no_update
+    function restore(records, figure) {
+        var names = Object.keys(records || {});
+        if (!names.length || !figure) {
+            return window.dash_clientside.no_update;
+        }
+        var layout = Object.assign({}, figure.layout || {});
+        var annotations = (layout.annotations || []).slice();
+        var present = {};
+        annotations.forEach(function(annotation) {
+            if (annotation && annotation.name) {
+                present[annotation.name] = true;
+            }
+        });
+        names.forEach(function(name) {
+            if (!present[name]) {
+                annotations.push(records[name]);
+            }
+        });
+        layout.annotations = annotations;
+        return Object.assign({}, figure, {layout: layout});
+    }
+
+    // A random hexadecimal id, from the browser CSPRNG when there is one
+    function randomId() {
+        var bytes = new Uint8Array(16);
+        if (window.crypto && window.crypto.getRandomValues) {
+            window.crypto.getRandomValues(bytes);
+        } else {
+            for (var i = 0; i < bytes.length; i++) {
+                bytes[i] = Math.floor(Math.random() * 256);
+            }
+        }
+        return Array.prototype.map.call(bytes, function(byte) {
+            return (byte < 16 ? "0" : "") + byte.toString(16);
+        }).join("");
+    }
+
+    window.dash_clientside.dash_tooltip = {
+        // Gives the browser tab the id of its session, which scopes the tooltip
+        // state kept on the server. The id is kept in sessionStorage, so that a
+        // reloaded tab finds its tooltips again.
+        initSession: function(config, session) {
+            if (session) {
+                throw window.dash_clientside.PreventUpdate;
+            }
+            var key = settings(config).sessionKey;
+            var storage = null;
+            try {
+                storage = window.sessionStorage;
+            } catch (e) {
+                // Disabled storage: the session only lasts until a reload
+            }
+            var id = storage && storage.getItem(key);
+            if (!id) {
+                id = randomId();
+                if (storage) {
+                    storage.setItem(key, id);
+                }
+            }
+            return id;
+        },
+
+        // Sends the ids of the tooltips whose text was erased, which do not
+        // shift like indices, and the positions of the other erased annotations,
+        // with the annotation names to locate them in the figure; zooming and
+        // panning need no server round trip.
+        removeAnnotations: function(relayoutData, figure, config) {
+            var graphId = inputGraph();
+            if (settings(config, graphId).debug) {
+                console.log(relayoutData);
+            }
+            var annotationPattern = /annotations\[(\d+)\].text/;
+            var annotations = (figure && figure.layout
+                && figure.layout.annotations) || [];
+            var prefix = settings(config).annotationPrefix;
+            var idsToRemove = [];
+            for (var key in relayoutData) {
+                var match = key.match(annotationPattern);
+                if (match && relayoutData[key] === "") {
+                    var index = parseInt(match[1]);
+                    var name = annotations[index] && annotations[index].name;
+                    // Other annotations, named or not, are removed by position
+                    var isTooltip = typeof name === "string" && name.indexOf(prefix) === 0;
+                    idsToRemove.push(isTooltip ? name : index);
+                }
+            }
+            if (!idsToRemove.length) {
+                throw window.dash_clientside.PreventUpdate;
+            }
+            var names = annotations.map(function(annotation) {
+                return (annotation && annotation.name) || null;
+            });
+            return {graph: graphId, ids: idsToRemove, names: names};
+        },
+
+        // Sends the clicks of a graph one batch at a time: clicks arriving while
+        // a batch is in flight are queued, and sent together once the server
+        // acknowledges it, or after `timeout` ms, e.g. after a server error.
+        // The batch carries the figure, the dispatcher only holding its graph.
+        coalesceClicks: function(clickData, ack, figure, config) {
+            var dc = window.dash_clientside;
+            var graphId = inputGraph();
+            var timeout = settings(config, graphId).timeout;
+            var graphs = window.dashTooltipClicks = window.dashTooltipClicks || {};
+            var state = graphs[graphId] = graphs[graphId]
+                || {seq: 0, sent: null, sentAt: 0, queue: []};
+            if (otherGraph(ack, graphId)) {
+                throw dc.PreventUpdate;
+            }
+            if (triggeredProps().indexOf(graphId + ".clickData") !== -1
+                    && clickData && clickData.points) {
+                clickData.points.forEach(function(clicked) {
+                    state.queue.push(withoutBbox(clicked));
+                });
+            }
+            if (ack && ack.graph === graphId && ack.seq === state.sent) {
+                state.sent = null;
+            }
+            if (state.sent !== null && Date.now() - state.sentAt < timeout) {
+                throw dc.PreventUpdate;
+            }
+            if (!state.queue.length) {
+                state.sent = null;
+                throw dc.PreventUpdate;
+            }
+            state.seq += 1;
+            state.sent = state.seq;
+            state.sentAt = Date.now();
+            var batch = {graph: graphId, seq: state.seq, points: state.queue, figure: figure};
+            state.queue = [];
+            return batch;
+        },
+
+        // Sends a click with the key of the cached traces, and the layout, which
+        // zooming and dragging change in place; the whole figure is only sent
+        // when its traces changed since the server returned it, or when the
+        // server missed the key.
+        requestClick: function(clickData, cached, figure) {
+            var dc = window.dash_clientside;
+            var graphId = inputGraph();
+            var graphs = window.dashTooltipFigures = window.dashTooltipFigures || {};
+            var data = (figure && figure.data) || [];
+            var lengths = data.map(function(trace) {
+                var values = (trace && (trace.x || trace.y)) || [];
+                return values.length;
+            }).join(",");
+            if (triggeredProps().indexOf(graphId + ".clickData") === -1) {
+                if (!cached || cached.graph !== graphId) {
+                    throw dc.PreventUpdate;
+                }
+                if (cached.miss) {
+                    return {graph: graphId, clickData: cached.miss, figure: figure};
+                }
+                if (cached.key) {
+                    graphs[graphId] = {key: cached.key, data: data, lengths: lengths};
+                }
+                throw dc.PreventUpdate;
+            }
+            if (!clickData) {
+                throw dc.PreventUpdate;
+            }
+            var known = graphs[graphId];
+            if (known && known.data === data && known.lengths === lengths) {
+                return {
+                    graph: graphId, clickData: clickData, key: known.key, layout: figure.layout
+                };
+            }
+            // The previous key is sent for the server to drop its stale figure
+            return {
+                graph: graphId, clickData: clickData, figure: figure,
+                key: known ? known.key : null
+            };
+        },
+
+        // Shows or hides the tooltips of a graph, without a server request.
+        hideTooltips: function(n_clicks, figure, config) {
+            var dc = window.dash_clientside;
+            if (!n_clicks || !figure || !figure.layout || !figure.layout.annotations) {
+                throw dc.PreventUpdate;
+            }
+            var prefix = settings(config).annotationPrefix;
+            var visible = n_clicks % 2 === 0;
+            var annotations = figure.layout.annotations.map(function(annotation) {
+                if (annotation && typeof annotation.name === "string"
+                        && annotation.name.indexOf(prefix) === 0) {
+                    return Object.assign({}, annotation, {visible: visible});
+                }
+                return annotation;
+            });
+            var layout = Object.assign({}, figure.layout, {annotations: annotations});
+            return [Object.assign({}, figure, {layout: layout}), visible ? "Hide" : "Show"];
+        },
+
+        // Forwards the axis ranges of a relayout event, and nothing for other
+        // events such as dragged tooltips.
+        forwardRanges: function(relayoutData) {
+            var ranges = {};
+            var found = false;
+            for (var key in relayoutData) {
+                if (/^[xy]axis\d*\.(range|autorange)/.test(key)) {
+                    ranges[key] = relayoutData[key];
+                    found = true;
+                }
+            }
+            if (!found) {
+                throw window.dash_clientside.PreventUpdate;
+            }
+            return {graph: inputGraph(), ranges: ranges};
+        },
+
+        // Applies a view update: removes culled tooltips, hides and shows
+        // tooltips in place, appends the tooltips coming into view, and replaces
+        // the cluster badge traces. Badge coordinates on log axes are in log10,
+        // like the annotations they stand for. Dispatches the update to its
+        // graph, among the figures passed before the settings.
+        applyView: function(update) {
+            var dc = window.dash_clientside;
+            var graphs = outputGraphs();
+            var config = arguments[arguments.length - 1];
+            var index = update ? graphs.indexOf(update.graph) : -1;
+            var figure = index === -1 ? null : arguments[index + 1];
+            if (!figure) {
+                throw dc.PreventUpdate;
+            }
+            var view = update.changes;
+            var prefix = settings(config).clusterPrefix;
+            var removed = {};
+            (view.remove || []).forEach(function(name) { removed[name] = true; });
+            var visible = {};
+            (view.hide || []).forEach(function(name) { visible[name] = false; });
+            (view.show || []).forEach(function(name) { visible[name] = true; });
+            var layout = Object.assign({}, figure.layout || {});
+            layout.annotations = (layout.annotations || []).filter(function(annotation) {
+                return !(annotation && removed[annotation.name]);
+            }).map(function(annotation) {
+                if (annotation && visible.hasOwnProperty(annotation.name)) {
+                    return Object.assign({}, annotation, {visible: visible[annotation.name]});
+                }
+                return annotation;
+            }).concat(view.add || []);
+            var data = (figure.data || []).filter(function(trace) {
+                return !(trace && typeof trace.uid === "string"
+                    && trace.uid.indexOf(prefix) === 0);
+            });
+            (view.traces || []).forEach(function(trace) {
+                var badge = Object.assign({}, trace);
+                ["x", "y"].forEach(function(axis) {
+                    var ref = trace[axis + "axis"];
+                    var axisSettings = layout[axis + "axis" + ref.slice(1)];
+                    if (axisSettings && axisSettings.type === "log") {
+                        badge[axis] = trace[axis].map(function(v) { return Math.pow(10, v); });
+                    }
+                });
+                data.push(badge);
+            });
+            return graphs.map(function(graphId, i) {
+                return i === index
+                    ? Object.assign({}, figure, {data: data, layout: layout})
+                    : dc.no_update;
+            });
+        },
+
+        // Collects the tooltip drags and text edits of a graph by tooltip name,
+        // and sends them once they stopped for `debounce` ms.
+        collectEdits: function(relayoutData, figure, config) {
+            var dc = window.dash_clientside;
+            var graphId = inputGraph();
+            var options = settings(config, graphId);
+            var graphs = window.dashTooltipEdits = window.dashTooltipEdits || {};
+            var state = graphs[graphId] = graphs[graphId] || {pending: {}, seq: 0};
+            var annotations = (figure && figure.layout && figure.layout.annotations) || [];
+            var pattern = new RegExp(
+                "^annotations\\[(\\d+)\\]\\.(" + options.editable.join("|") + ")$"
+            );
+            var found = false;
+            for (var key in relayoutData) {
+                var match = pattern.exec(key);
+                if (!match) {
+                    continue;
+                }
+                var annotation = annotations[parseInt(match[1])];
+                var value = relayoutData[key];
+                if (!annotation || !annotation.name || (match[2] === "text" && value === "")) {
+                    continue;
+                }
+                state.pending[annotation.name] = state.pending[annotation.name] || {};
+                state.pending[annotation.name][match[2]] = value;
+                found = true;
+            }
+            if (!found) {
+                throw dc.PreventUpdate;
+            }
+            var seq = ++state.seq;
+            return new Promise(function(resolve, reject) {
+                setTimeout(function() {
+                    if (seq !== state.seq) {
+                        reject(dc.PreventUpdate);
+                        return;
+                    }
+                    var edits = state.pending;
+                    state.pending = {};
+                    resolve({graph: graphId, edits: edits});
+                }, options.debounce);
+            });
+        },
+
+        // Puts the recorded tooltips missing from the figures back on page load;
+        // the records are keyed by graph, whose figures are the other arguments.
+        restoreTooltips: function(records) {
+            var dc = window.dash_clientside;
+            var figures = Array.prototype.slice.call(arguments, 1);
+            var restored = false;
+            var updates = outputGraphs().map(function(graphId, i) {
+                var figure = restore((records || {})[graphId], figures[i]);
+                restored = restored || figure !== dc.no_update;
+                return figure;
+            });
+            if (!restored) {
+                throw dc.PreventUpdate;
+            }
+            return updates;
+        },
+
+        // Sends the geometry of a box or lasso selection, without its points,
+        // which the server selects again from the full-resolution data; a
+        // cleared selection is sent when the figure shows a summary.
+        reduceSelection: function(selectedData, figure, config) {
+            var dc = window.dash_clientside;
+            var graphId = inputGraph();
+            var selection = {graph: graphId, figure: figure};
+            if (selectedData && (selectedData.range || selectedData.lassoPoints)) {
+                var curves = {};
+                (selectedData.points || []).forEach(function(point) {
+                    curves[point.curveNumber] = true;
+                });
+                selection.range = selectedData.range;
+                selection.lassoPoints = selectedData.lassoPoints;
+                if (Object.keys(curves).length) {
+                    // Otherwise every trace is searched: the points may be downsampled
+                    selection.curves = Object.keys(curves).map(Number);
+                }
+                return selection;
+            }
+            var name = settings(config, graphId).selectionName;
+            var annotations = (figure && figure.layout && figure.layout.annotations) || [];
+            if (!annotations.some(function(a) { return a && a.name === name; })) {
+                throw dc.PreventUpdate;
+            }
+            return selection;
+        },
+
+        // Sends at most one hovered point per `throttle` ms: the first point of
+        // a burst is sent at once and the last one when the interval ends; the
+        // ones in between are dropped, as is a point equal to the last one sent.
+        throttleHover: function(hoverData, config) {
+            var dc = window.dash_clientside;
+            var graphId = inputGraph();
+            var interval = settings(config, graphId).throttle;
+            var timers = window.dashTooltipHover = window.dashTooltipHover || {};
+            var state = timers[graphId] = timers[graphId] || {last: 0, seq: 0, key: null};
+            var seq = ++state.seq;
+            if (!hoverData || !hoverData.points || !hoverData.points.length) {
+                throw dc.PreventUpdate;
+            }
+            var point = withoutBbox(hoverData.points[0]);
+            var key = JSON.stringify([point.curveNumber, point.pointNumber]);
+            function send() {
+                if (key === state.key) {
+                    throw dc.PreventUpdate;
+                }
+                state.last = Date.now();
+                state.key = key;
+                return {graph: graphId, point: point};
+            }
+            var wait = state.last + interval - Date.now();
+            if (wait <= 0) {
+                return send();
+            }
+            return new Promise(function(resolve, reject) {
+                setTimeout(function() {
+                    if (seq !== state.seq) {
+                        reject(dc.PreventUpdate);
+                        return;
+                    }
+                    try {
+                        resolve(send());
+                    } catch (e) {
+                        reject(e);
+                    }
+                }, wait);
+            });
+        },
+
+        // Renders the preview of the hovered point, with the enrichment sent for
+        // it, if any; the templates are keyed by graph.
+        previewHover: function(hoverData, enriched, figure, templates) {
+            var dc = window.dash_clientside;
+            var graphId = inputGraph();
+            if (otherGraph(enriched, graphId)) {
+                throw dc.PreventUpdate;
+            }
+            templates = (templates || {})[graphId];
+            if (!templates) {
+                throw dc.PreventUpdate;
+            }
+            if (!hoverData || !hoverData.points || !hoverData.points.length) {
+                return [false, dc.no_update, dc.no_update];
+            }
+            var point = Object.assign({}, hoverData.points[0]);
+            var trace = (figure && figure.data && figure.data[point.curveNumber]) || {};
+            if (trace.meta !== undefined) {
+                point.meta = trace.meta;
+            }
+            if (trace.name !== undefined) {
+                point.name = trace.name;
+            }
+            var text = render(choose(templates, point), point);
+            if (enriched && enriched.graph === graphId && JSON.stringify([enriched.curveNumber, enriched.pointNumber])
+                    === JSON.stringify([point.curveNumber, point.pointNumber])) {
+                text += "<br>" + enriched.text;
+            }
+            var children = [];
+            text.split(/<br\s*\/?>/i).forEach(function(line, i) {
+                if (i) {
+                    children.push({namespace: "dash_html_components", type: "Br", props: {}});
+                }
+                children.push(line.replace(/<[^>]*>/g, ""));
+            });
+            return [true, point.bbox, children];
+        }
+    };
+})();
@@ -0,0 +1,62 @@
+from typing import Any, Dict, Iterable
+
+EDIT_DEBOUNCE_MS = 300
+
+EDITABLE_PROPERTIES = ("x", "y", "ax", "ay", "text")
+
+
+class TooltipRecords:
+    """
+    Server-side copy of the tooltip annotations of a graph in a browser session,
+    by tooltip id.
+
+    The dictionary is the entry of the graph in the records store sent to the
+    session when its page loads, so that a reloaded page gets its tooltips back.
+    """
+
+    __slots__ = ("annotations",)
+
+    def __init__(self) -> None:
+        self.annotations: Dict[str, Dict[str, Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self.annotations)
+
+    def add(self, name: str, annotation: Dict[str, Any]) -> None:
+        self.annotations[name] = annotation
+
+    def remove(self, names: Iterable[str]) -> None:
+        for name in names:
+            self.annotations.pop(name, None)
+
+    def apply(self, edits: Dict[str, Dict[str, Any]]) -> int:
+        """
+        Applies edit deltas, ``{tooltip id: {property: value}}``, to the records.
+
+        Returns:
+            int: The number of records changed.
+        """
+        changed = 0
+        for name, delta in edits.items():
+            annotation = self.annotations.get(name)
+            if annotation is None:
+                continue
+            annotation.update(
+                (key, value)
+                for key, value in delta.items()
+                if key in EDITABLE_PROPERTIES
+            )
+            changed += 1
+        return changed
+
+
+def edit_ids() -> Dict[str, str]:
+    """
+    IDs of the stores of the tooltip records, sent to each session on page load
+    and keyed by graph ID, and of the tooltip edits and their acknowledgements.
+    """
+    return {
+        "records": "tooltip-records",
+        "edits": "tooltip-edits",
+        "ack": "tooltip-edits-ack",
+    }
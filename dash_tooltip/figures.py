@@ -0,0 +1,67 @@
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional
+
+FIGURE_CACHE_SIZE = 16
+
+
+class FigureCache:
+    """
+    Small LRU cache of the traces of the figures returned by click callbacks.
+
+    Each cached figure gets a new random key, which the browser sends back with
+    its next click instead of the figure while the traces are unchanged. Keys
+    cannot be guessed, so the sessions of an app share the cache safely. The
+    previous figure of the session is dropped when the next one is cached, so
+    the cache holds the last figure of up to ``maxsize`` sessions and graphs.
+    Entries are changed under a lock, as Dash serves callbacks from several
+    threads.
+    """
+
+    __slots__ = ("maxsize", "_entries", "_lock")
+
+    def __init__(self, maxsize: int = FIGURE_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, List[Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def put(
+        self,
+        graph_id: str,
+        data: List[Dict[str, Any]],
+        replaces: Optional[str] = None,
+    ) -> str:
+        """
+        Caches the traces of a figure of ``graph_id`` and returns their key.
+
+        Args:
+            graph_id (str): The ID of the graph.
+            data (list): The traces of the figure.
+            replaces (str, optional): The key of the previous figure of the
+                session, removed from the cache.
+        """
+        key = uuid.uuid4().hex
+        with self._lock:
+            if replaces is not None:
+                self._entries.pop((graph_id, replaces), None)
+            self._entries[(graph_id, key)] = data
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return key
+
+    def get(self, graph_id: str, key: Optional[str]) -> Optional[List[Dict[str, Any]]]:
+        """The traces cached under ``key``, or None when they were evicted."""
+        with self._lock:
+            data = self._entries.get((graph_id, key))
+            if data is not None:
+                self._entries.move_to_end((graph_id, key))
+            return data
+
+
+def figure_ids() -> Dict[str, str]:
+    """IDs of the stores of the click requests and of the cached figure keys."""
+    return {"request": "tooltip-click-request", "key": "tooltip-figure-key"}
@@ -0,0 +1,126 @@
+from collections import deque
+from typing import Any, Deque, Dict, Hashable, List, Optional, Tuple
+
+from dash import html
+
+HISTORY_SIZE = 50
+
+# Live tooltip annotations kept per history, to undo their removal
+ANNOTATIONS_SIZE = 1000
+
+# A tooltip as recorded by an operation: its id, its annotation, and the
+# sample it is anchored to, if any.
+TooltipEntry = Tuple[str, Dict[str, Any], Optional[Tuple[Hashable, Hashable]]]
+
+
+class Operation:
+    """
+    Tooltips added or removed together, e.g. by a click or by clearing a graph.
+
+    ``demoted`` holds the annotations an addition moved to the overlay traces
+    (see `demote_overflow`): reverting the addition promotes them back.
+    """
+
+    __slots__ = ("kind", "tooltips", "demoted")
+
+    def __init__(
+        self,
+        kind: str,
+        tooltips: List[TooltipEntry],
+        demoted: Optional[List[Dict[str, Any]]] = None,
+    ):
+        self.kind = kind
+        self.tooltips = tooltips
+        self.demoted = demoted or []
+
+    def inverse(self) -> "Operation":
+        kind = "remove" if self.kind == "add" else "add"
+        return Operation(kind, self.tooltips, self.demoted)
+
+
+class OperationHistory:
+    """
+    Bounded undo and redo stacks of the tooltip operations of a graph.
+
+    Both stacks are ring buffers of ``size`` operations: the oldest operation is
+    forgotten when a new one is recorded, so memory does not grow with the
+    session. The annotations of the live tooltips are kept by id, so that a
+    removal can be undone without reading the figure; beyond
+    ``annotations_size`` tooltips, the oldest ones are forgotten, and their
+    removal cannot be undone.
+    """
+
+    __slots__ = ("done", "undone", "annotations", "annotations_size")
+
+    def __init__(
+        self, size: int = HISTORY_SIZE, annotations_size: int = ANNOTATIONS_SIZE
+    ):
+        self.done: Deque[Operation] = deque(maxlen=size)
+        self.undone: Deque[Operation] = deque(maxlen=size)
+        self.annotations: Dict[str, Dict[str, Any]] = {}
+        self.annotations_size = annotations_size
+
+    def remember(self, name: str, annotation: Dict[str, Any]) -> None:
+        """Keeps the annotation of a live tooltip, as its latest one."""
+        self.annotations.pop(name, None)
+        self.annotations[name] = annotation
+        if len(self.annotations) > self.annotations_size:
+            del self.annotations[next(iter(self.annotations))]
+
+    def record(
+        self,
+        kind: str,
+        tooltips: List[TooltipEntry],
+        demoted: Optional[List[Dict[str, Any]]] = None,
+    ) -> None:
+        """Records an operation done by the user, which clears the redo stack."""
+        if not tooltips:
+            return
+        self.done.append(Operation(kind, tooltips, demoted))
+        self.undone.clear()
+
+    def undo(self) -> Optional[Operation]:
+        """The operation reverting the last one, or None when there is none."""
+        if not self.done:
+            return None
+        operation = self.done.pop()
+        self.undone.append(operation)
+        return operation.inverse()
+
+    def redo(self) -> Optional[Operation]:
+        """The last undone operation, or None when there is none."""
+        if not self.undone:
+            return None
+        operation = self.undone.pop()
+        self.done.append(operation)
+        return operation
+
+
+def control_ids(graph_id: str) -> Dict[str, str]:
+    """IDs of the tooltip control buttons of a graph."""
+    return {
+        action: f"tooltip-{action}-{graph_id}"
+        for action in ("undo", "redo", "clear", "hide")
+    }
+
+
+def tooltip_controls(graph_id: str, **div_props: Any) -> html.Div:
+    """
+    Buttons undoing, redoing, clearing and hiding the tooltips of a graph.
+
+    Place the returned component in the layout before calling `tooltip`, which
+    then registers the callbacks of the buttons it finds.
+
+    Args:
+        graph_id (str): The ID of the graph the buttons act on.
+        **div_props: Properties of the `html.Div` holding the buttons.
+
+    Returns:
+        dash.html.Div: The buttons.
+    """
+    ids = control_ids(graph_id)
+    labels = {"undo": "Undo", "redo": "Redo", "clear": "Clear", "hide": "Hide"}
+    return html.Div(
+        [html.Button(labels[action], id=ids[action]) for action in labels],
+        **div_props,
+    )
@@ -0,0 +1,158 @@
+import functools
+import re
+from typing import Any, Callable, Dict, Optional
+
+from dash import dcc
+from dash.html import Div
+
+from .overlay import is_tooltip_trace
+from .utils import TraceTemplates, compile_template
+
+PREVIEW_THROTTLE_MS = 150
+# Placeholders computed by the server when a tooltip is pinned: templates using
+# them cannot be rendered by plotly.js
+SERVER_PLACEHOLDERS = ("crosshair", "win", "sel")
+# Placeholders named differently in Plotly hovertemplates
+HOVER_PLACEHOLDERS = {"name": "fullData.name"}
+
+# The Python format specs that mean the same in d3-format, used by plotly.js
+_D3_FORMAT_PATTERN = re.compile(
+    r"^(?:.?[<>=^])?[-+ ]?#?0?\d*,?(?:\.\d+)?[bcdefgnoxX%]?$"
+)
+_DATE_FORMAT_PATTERN = re.compile(r"%[a-zA-Z]")
+
+HoverEnricher = Callable[[str, Dict[str, Any]], Any]
+
+
+def preview_ids(graph_id: str) -> Dict[str, str]:
+    """
+    IDs of the preview tooltip of a graph and of the stores shared by the graphs:
+    the templates, keyed by graph ID, and the hovered and enriched points.
+    """
+    return {
+        "tooltip": f"tooltip-preview-{graph_id}",
+        "templates": "tooltip-preview-templates",
+        "hover": "tooltip-hover",
+        "enriched": "tooltip-enriched",
+    }
+
+
+def add_preview_tooltip(layout: Div, graph_id: str) -> str:
+    """
+    Adds the preview tooltip of a graph to the layout.
+
+    The graph is set to clear its ``hoverData`` on unhover, so that the preview
+    is hidden when the pointer leaves the point.
+
+    Args:
+        layout (dash.html.Div): The Dash app layout, whose children are a list.
+        graph_id (str): The ID of the graph to preview.
+
+    Returns:
+        str: The ID of the preview tooltip.
+    """
+    tooltip_id = preview_ids(graph_id)["tooltip"]
+    layout[graph_id].clear_on_unhover = True
+    layout.children.append(dcc.Tooltip(id=tooltip_id))
+    return tooltip_id
+
+
+def _templates_data(templates: TraceTemplates) -> Dict[str, Any]:
+    """JSON form of the templates of a graph, read by the preview renderer."""
+    names = {}
+    indices = {}
+    for selector, template in templates.rules.items():
+        if isinstance(selector, int):
+            indices[str(selector)] = template
+        else:
+            names[selector] = template
+    return {"default": templates.default, "names": names, "indices": indices}
+
+
+@functools.lru_cache(maxsize=256)
+def hover_template(template: str) -> Optional[str]:
+    """
+    Translates a tooltip template into the equivalent Plotly hovertemplate.
+
+    ``%{name}`` becomes ``%{fullData.name}``, date formats such as ``%{x:%d/%m}``
+    use the ``|`` separator of plotly.js, and the trace name box is hidden so that
+    the hover label shows the tooltip text only. Translations are cached.
+
+    Args:
+        template (str): The tooltip template.
+
+    Returns:
+        Optional[str]: The hovertemplate, or None when the template uses
+        placeholders computed by the server, or formats plotly.js does not share.
+    """
+    hover = template
+    for placeholder, var_name, path, format_spec in compile_template(
+        template
+    ).placeholders:
+        if path[0][0] in SERVER_PLACEHOLDERS:
+            return None
+        var_name = HOVER_PLACEHOLDERS.get(var_name, var_name)
+        if format_spec is None:
+            translated = var_name
+        elif _DATE_FORMAT_PATTERN.search(format_spec):
+            translated = f"{var_name}|{format_spec}"
+        elif _D3_FORMAT_PATTERN.match(format_spec):
+            translated = f"{var_name}:{format_spec}"
+        else:
+            return None
+        hover = hover.replace(f"%{{{placeholder}}}", f"%{{{translated}}}")
+    return hover + "<extra></extra>"
+
+
+def sync_hover_templates(figure: Any, templates: TraceTemplates) -> int:
+    """
+    Sets the hovertemplate of each trace of a figure from its tooltip template.
+
+    Traces whose template cannot be translated, see `hover_template`, keep
+    their hover label, as do tooltip traces and trace types without
+    hovertemplates.
+
+    Args:
+        figure: The figure, as a dictionary or a plotly figure, changed in place.
+        templates (TraceTemplates): The tooltip templates of the graph.
+
+    Returns:
+        int: The number of traces whose hovertemplate was set.
+    """
+    data = figure["data"] if "data" in figure else None
+    count = 0
+    for curve, trace in enumerate(data or []):
+        if is_tooltip_trace(trace):
+            continue
+        if hasattr(trace, "to_plotly_json") and "hovertemplate" not in trace:
+            continue
+        name = trace["name"] if "name" in trace else None
+        meta = trace["meta"] if "meta" in trace else None
+        hover = hover_template(templates.resolve(curve, name, meta).template)
+        if hover is not None:
+            trace["hovertemplate"] = hover
+            count += 1
+    return count
+
+
+def enrich_point(
+    enrich: Optional[HoverEnricher], graph_id: str, point: Optional[Dict[str, Any]]
+) -> Optional[Dict[str, Any]]:
+    """
+    Runs the server-side enrichment of a hovered point.
+
+    Returns:
+        Optional[Dict[str, Any]]: The graph and point identity and the text to
+        append to the preview, or None when there is nothing to add.
+    """
+    if enrich is None or not point:
+        return None
+    text = enrich(graph_id, point)
+    if text is None:
+        return None
+    return {
+        "graph": graph_id,
+        "curveNumber": point.get("curveNumber"),
+        "pointNumber": point.get("pointNumber"),
+        "text": str(text),
+    }
@@ -0,0 +1,239 @@
+import base64
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+import numpy as np
+
+# Plotly >= 6 serialises numpy arrays as base64 "typed arrays"
+_TYPED_ARRAY_DTYPES = {
+    "f8": np.float64,
+    "f4": np.float32,
+    "i4": np.int32,
+    "u4": np.uint32,
+    "i2": np.int16,
+    "u2": np.uint16,
+    "i1": np.int8,
+    "u1": np.uint8,
+}
+
+
+def _as_array(values: Any, dtype: Any = None) -> Optional[np.ndarray]:
+    """
+    Converts trace data (list, tuple, ndarray or plotly typed array) to a numpy array.
+
+    Returns None when no data is available.
+    """
+    if values is None:
+        return None
+    if isinstance(values, dict) and "bdata" in values:
+        raw = base64.b64decode(values["bdata"])
+        array = np.frombuffer(raw, dtype=_TYPED_ARRAY_DTYPES[values.get("dtype", "f8")])
+        shape = values.get("shape")
+        if shape:
+            if isinstance(shape, str):
+                shape = tuple(int(part) for part in shape.split(","))
+            array = array.reshape(shape)
+        return array.astype(dtype) if dtype is not None else array
+    return np.asarray(values, dtype=dtype)
+
+
+def _length(values: Any) -> int:
+    """Number of samples of trace data, without decoding plotly typed arrays."""
+    if isinstance(values, dict) and "bdata" in values:
+        bdata = values["bdata"]
+        size = len(bdata) // 4 * 3 - bdata[-2:].count("=")
+        return size // np.dtype(_TYPED_ARRAY_DTYPES[values.get("dtype", "f8")]).itemsize
+    return len(values)
+
+
+def _array_slice(values: Any, start: int, stop: int, dtype: Any = None) -> np.ndarray:
+    """
+    ``values[start:stop]`` of 1-D trace data as a numpy array.
+
+    Only the slice is converted: plotly typed arrays are decoded from the base64
+    characters covering it, so the cost does not depend on the trace length.
+    """
+    start = max(0, start)
+    if isinstance(values, dict) and "bdata" in values and not values.get("shape"):
+        item = np.dtype(_TYPED_ARRAY_DTYPES[values.get("dtype", "f8")])
+        stop = max(start, min(stop, _length(values)))
+        first, last = start * item.itemsize, stop * item.itemsize
+        # Base64 encodes 3 bytes as 4 characters
+        group = first // 3
+        raw = base64.b64decode(values["bdata"][4 * group : 4 * -(-last // 3)])
+        offset = first - 3 * group
+        array = np.frombuffer(raw[offset : offset + last - first], dtype=item)
+        return array.astype(dtype) if dtype is not None else array
+    if isinstance(values, dict):
+        return _as_array(values, dtype)[start:stop]
+    return np.asarray(values[start:stop], dtype=dtype)
+
+
+def data_revision(graph_id: str, figure: Any) -> Hashable:
+    """
+    Revision key of the data of a figure with ``layout.datarevision``, else None.
+
+    Reading it costs O(1), so cached indices keyed on it are reused without looking
+    at the data; Plotly likewise expects ``datarevision`` to change with the data.
+    """
+    layout = figure["layout"] if "layout" in figure else None
+    revision = layout["datarevision"] if layout and "datarevision" in layout else None
+    return None if revision is None else (graph_id, len(figure["data"]), revision)
+
+
+def data_key(values: Any) -> Hashable:
+    """
+    Cheap identity of trace data: its type, length and first and last samples.
+
+    It is read in O(1), so it can key cached indices on every click; a change
+    that keeps the length and both ends is only noticed through
+    ``layout.datarevision`` (see `data_revision`).
+    """
+    if values is None:
+        return None
+    if isinstance(values, dict) and "bdata" in values:
+        bdata = values["bdata"]
+        return (
+            "bdata",
+            values.get("dtype"),
+            str(values.get("shape")),
+            len(bdata),
+            bdata[:16],
+            bdata[-16:],
+        )
+    if isinstance(values, str):
+        return values
+    size = len(values)
+    if not size:
+        return (type(values).__name__, 0)
+    return (type(values).__name__, size, repr(values[0]), repr(values[-1]))
+
+
+class IndexCache:
+    """
+    Small LRU cache for per-trace indices, keyed by data revisions.
+
+    Dash serves callbacks from several threads: the entries are only read and
+    changed under a lock, while indices are built outside of it, so concurrent
+    misses may build the same index twice but never see a half-evicted entry.
+    """
+
+    def __init__(self, maxsize: int = 32):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_build(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+        value = factory()
+        with self._lock:
+            self._entries[key] = value
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return value
+
+    def fit(self, size: int) -> None:
+        """Grows the cache to hold at least ``size`` entries."""
+        self.maxsize = max(self.maxsize, size)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SparseTable:
+    """
+    Range maximum/minimum index over a 1-D array.
+
+    Samples are grouped in blocks of ``block_size``; a sparse table over the block
+    extrema answers the aligned part of a query with two lookups, and the ragged
+    ends scan at most ``2 * block_size`` samples. A query therefore costs O(1)
+    whatever the window size, while the table only holds
+    ``n / block_size * log2(n / block_size)`` indices. NaNs never win a query.
+    """
+
+    __slots__ = ("values", "block_size", "_high", "_low", "_max_levels", "_min_levels")
+
+    def __init__(self, values: Any, block_size: int = 64):
+        array = _as_array(values, dtype=float)
+        self.values = array if array is not None else np.empty(0)
+        self.block_size = block_size
+        n = self.values.size
+        nan_mask = np.isnan(self.values)
+        if nan_mask.any():
+            self._high = np.where(nan_mask, -np.inf, self.values)
+            self._low = np.where(nan_mask, np.inf, self.values)
+        else:
+            self._high = self._low = self.values
+
+        n_blocks = -(-n // block_size)
+        pad = n_blocks * block_size - n
+        offsets = np.arange(n_blocks) * block_size
+        high_blocks = np.concatenate([self._high, np.full(pad, -np.inf)])
+        low_blocks = np.concatenate([self._low, np.full(pad, np.inf)])
+        block_argmax = high_blocks.reshape(n_blocks, block_size).argmax(axis=1)
+        block_argmin = low_blocks.reshape(n_blocks, block_size).argmin(axis=1)
+        last = max(n - 1, 0)
+        self._max_levels = self._build_levels(
+            np.minimum(block_argmax + offsets, last), self._high, np.greater_equal
+        )
+        self._min_levels = self._build_levels(
+            np.minimum(block_argmin + offsets, last), self._low, np.less_equal
+        )
+
+    @staticmethod
+    def _build_levels(level: np.ndarray, keys: np.ndarray, better: Any) -> list:
+        levels = [level]
+        span = 1
+        while 2 * span <= level.size:
+            previous = levels[-1]
+            left = previous[: previous.size - span]
+            right = previous[span:]
+            levels.append(np.where(better(keys[left], keys[right]), left, right))
+            span *= 2
+        return levels
+
+    def __len__(self) -> int:
+        return int(self.values.size)
+
+    def _query(
+        self, start: int, stop: int, levels: list, keys: np.ndarray, pick: Callable
+    ) -> int:
+        start = max(0, int(start))
+        stop = min(self.values.size, int(stop))
+        if start >= stop:
+            raise ValueError(f"Empty range [{start}, {stop}) for a {len(self)} samples")
+        size = self.block_size
+        first_block, last_block = start // size, (stop - 1) // size
+        if first_block == last_block:
+            return start + int(pick(keys[start:stop]))
+
+        head_end = (first_block + 1) * size
+        tail_start = last_block * size
+        candidates = [
+            start + int(pick(keys[start:head_end])),
+            tail_start + int(pick(keys[tail_start:stop])),
+        ]
+        if last_block - first_block > 1:
+            lo, hi = first_block + 1, last_block - 1
+            k = (hi - lo + 1).bit_length() - 1
+            level = levels[k]
+            candidates.insert(1, int(level[lo]))
+            candidates.insert(2, int(level[hi - (1 << k) + 1]))
+        # ``pick`` returns the first extremum, keeping the leftmost sample on ties
+        return candidates[int(pick(keys[candidates]))]
+
+    def argmax(self, start: int, stop: int) -> int:
+        """Index of the largest value in ``values[start:stop]``."""
+        return self._query(start, stop, self._max_levels, self._high, np.argmax)
+
+    def argmin(self, start: int, stop: int) -> int:
+        """Index of the smallest value in ``values[start:stop]``."""
+        return self._query(start, stop, self._min_levels, self._low, np.argmin)
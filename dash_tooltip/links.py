@@ -0,0 +1,141 @@
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .indexing import IndexCache, _as_array, _length, data_key
+from .overlay import is_tooltip_trace
+from .peaks import _sample, _x_value
+
+
+def _x_numbers(values: Any) -> Optional[np.ndarray]:
+    """
+    Numeric form of x values: numbers as floats, dates as nanoseconds.
+
+    Returns None for values that cannot be ordered this way, e.g. categories.
+    """
+    array = _as_array(values)
+    if array is None:
+        return None
+    if array.dtype.kind in "iufb":
+        return array.astype(float).ravel()
+    if array.dtype.kind == "O":
+        # Numbers with gaps (None) are floats, anything else is tried as dates
+        try:
+            return array.astype(float).ravel()
+        except (TypeError, ValueError):
+            pass
+    try:
+        return array.astype("datetime64[ns]").astype(np.int64).astype(float).ravel()
+    except (TypeError, ValueError):
+        return None
+
+
+class SortedX:
+    """
+    x values of a trace sorted once, to find the sample nearest to any x with a
+    binary search (`numpy.searchsorted`) rather than a scan.
+    """
+
+    __slots__ = ("order", "values")
+
+    def __init__(self, values: Any):
+        numbers = _x_numbers(values)
+        if numbers is None:
+            numbers = np.empty(0)
+        keep = np.flatnonzero(~np.isnan(numbers))
+        order = keep[np.argsort(numbers[keep], kind="stable")]
+        self.order = order
+        self.values = numbers[order]
+
+    def __len__(self) -> int:
+        return int(self.values.size)
+
+    def position(self, x: Any) -> Optional[Tuple[float, int]]:
+        """
+        ``x`` in numeric form and its insertion point in the sorted values, or
+        None when ``x`` cannot be compared with them.
+        """
+        numbers = _x_numbers([x])
+        if numbers is None or not self.values.size or np.isnan(numbers[0]):
+            return None
+        return numbers[0], int(np.searchsorted(self.values, numbers[0]))
+
+    def nearest(self, x: Any) -> Optional[int]:
+        """Index, in the trace, of the sample whose x is nearest to ``x``."""
+        position = self.position(x)
+        if position is None:
+            return None
+        value, right = position
+        if right == self.values.size:
+            return int(self.order[-1])
+        if right > 0 and value - self.values[right - 1] <= self.values[right] - value:
+            right -= 1
+        return int(self.order[right])
+
+
+def _nearest_index(
+    trace: Any, x: Any, cache: Optional[IndexCache], key: Hashable
+) -> Optional[int]:
+    values = trace["x"] if "x" in trace else None
+    if values is None:
+        # Implicit x: x0 + i * dx
+        count = _length(trace["y"])
+        x0 = trace["x0"] if "x0" in trace and trace["x0"] is not None else 0
+        dx = trace["dx"] if "dx" in trace and trace["dx"] is not None else 1
+        numbers = _x_numbers([x])
+        if not count or numbers is None or np.isnan(numbers[0]):
+            return None
+        return int(min(max(round((numbers[0] - x0) / dx), 0), count - 1))
+    if cache is None:
+        return SortedX(values).nearest(x)
+    index = cache.get_or_build(
+        ("sorted-x", key, data_key(values)), lambda: SortedX(values)
+    )
+    return index.nearest(x)
+
+
+def linked_points(
+    figure: Any,
+    x: Any,
+    cache: Optional[IndexCache] = None,
+    skip: Sequence[int] = (),
+    revision: Hashable = None,
+) -> List[Dict[str, Any]]:
+    """
+    Click points of the samples nearest to ``x`` in each trace of a figure.
+
+    Args:
+        figure: The figure, as a dictionary or plotly figure.
+        x: The x value to match, a number or a date.
+        cache (IndexCache, optional): Cache of sorted x indices reused across
+            clicks. It should hold an index per trace of the figure: the traces
+            are visited in turn, so a smaller LRU cache never reuses one.
+        skip (Sequence[int]): Curve numbers to leave out.
+        revision (Hashable, optional): Identity of the figure data, e.g. from
+            `data_revision`. Defaults to the `data_key` of the x values, read in
+            O(1).
+
+    Returns:
+        List[Dict[str, Any]]: One point per trace with data, in trace order.
+    """
+    points = []
+    for curve_number, trace in enumerate(figure["data"]):
+        if curve_number in skip or is_tooltip_trace(trace):
+            continue
+        if "y" not in trace or trace["y"] is None:
+            continue
+        index = _nearest_index(trace, x, cache, (revision, curve_number))
+        if index is None:
+            continue
+        point: Dict[str, Any] = {
+            "curveNumber": curve_number,
+            "pointNumber": index,
+            "pointIndex": index,
+            "x": _x_value(trace, index),
+            "y": _sample(trace, "y", index),
+        }
+        for key in ("customdata", "text", "hovertext"):
+            if key in trace and trace[key] is not None:
+                point[key] = _sample(trace, key, index)
+        points.append(point)
+    return points
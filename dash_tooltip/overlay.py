@@ -0,0 +1,197 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+import plotly.graph_objs as go
+
+from .placement import _AXIS_REF_PATTERN, _axis_key
+from .registry import ANNOTATION_NAME_PREFIX, _get_name
+
+# Traces drawn by the tooltip layer have a ``uid`` starting with this prefix
+TOOLTIP_UID_PREFIX = "dash-tooltip-"
+
+OVERLAY_UID_PREFIX = "dash-tooltip-overlay"
+
+_OVERLAY_ARRAYS = ("x", "y", "text", "hovertext", "customdata")
+
+
+def _overlay_uid(xref: str, yref: str) -> str:
+    return f"{OVERLAY_UID_PREFIX}-{xref}-{yref}"
+
+
+def _has_uid_prefix(trace: Any, prefix: str) -> bool:
+    uid = trace.get("uid") if isinstance(trace, dict) else getattr(trace, "uid", None)
+    return isinstance(uid, str) and uid.startswith(prefix)
+
+
+def is_overlay_trace(trace: Any) -> bool:
+    """Whether a trace, given as a dictionary or plotly trace, is a tooltip overlay."""
+    return _has_uid_prefix(trace, OVERLAY_UID_PREFIX)
+
+
+def is_tooltip_trace(trace: Any) -> bool:
+    """Whether a trace is drawn by the tooltip layer rather than holding data."""
+    return _has_uid_prefix(trace, TOOLTIP_UID_PREFIX)
+
+
+def _is_tooltip(annotation: Any) -> bool:
+    name = _get_name(annotation)
+    return bool(name) and name.startswith(ANNOTATION_NAME_PREFIX)
+
+
+def _axis_type(fig: go.Figure, ref: str) -> Optional[str]:
+    return fig.layout[_axis_key(ref)].type
+
+
+def _anchor(fig: go.Figure, annotation: Dict[str, Any], axis: str) -> Any:
+    """Data value of an annotation coordinate: log axes hold its log10."""
+    value = annotation.get(axis)
+    if value is not None and _axis_type(fig, annotation[f"{axis}ref"]) == "log":
+        return 10**value
+    return value
+
+
+def _overlay_trace(fig: go.Figure, xref: str, yref: str, style: Dict[str, Any]) -> Any:
+    """The overlay trace of an axis pair, added on first use."""
+    uid = _overlay_uid(xref, yref)
+    for trace in fig.data:
+        if trace.uid == uid:
+            return trace
+    font = style.get("font") or {}
+    fig.add_trace(
+        go.Scatter(
+            x=[],
+            y=[],
+            text=[],
+            hovertext=[],
+            customdata=[],
+            uid=uid,
+            name="tooltips",
+            xaxis=xref,
+            yaxis=yref,
+            mode="markers+text",
+            textposition="top center",
+            hoverinfo="text",
+            showlegend=False,
+            marker={"color": style.get("arrowcolor", "black"), "size": 6},
+            textfont={k: font[k] for k in ("color", "family", "size") if k in font},
+        )
+    )
+    return fig.data[-1]
+
+
+def _extend(trace: Any, columns: Dict[str, List[Any]]) -> None:
+    with_values = {
+        key: list(trace[key] or []) + values for key, values in columns.items()
+    }
+    trace.update(with_values)
+
+
+def demote_overflow(fig: go.Figure, threshold: int) -> List[Dict[str, Any]]:
+    """
+    Moves the oldest tooltip annotations beyond ``threshold`` to the overlay traces.
+
+    Each overlay point keeps its annotation in ``customdata``, so that it can be
+    promoted back unchanged. Annotations that are not tooltips, or not anchored
+    to data axes, are left in place.
+
+    Returns:
+        List[Dict[str, Any]]: The annotations moved, oldest first.
+    """
+    annotations = list(fig.layout.annotations)
+    tooltips = [
+        position
+        for position, annotation in enumerate(annotations)
+        if _is_tooltip(annotation)
+        and _AXIS_REF_PATTERN.match(annotation.xref or "")
+        and _AXIS_REF_PATTERN.match(annotation.yref or "")
+    ]
+    excess = len(tooltips) - threshold
+    if excess <= 0:
+        return []
+
+    moved = set(tooltips[:excess])
+    demoted = []
+    columns: Dict[Tuple[str, str], Dict[str, List[Any]]] = {}
+    styles: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    for position in sorted(moved):
+        annotation = annotations[position].to_plotly_json()
+        demoted.append(annotation)
+        axes = (annotation["xref"], annotation["yref"])
+        column = columns.setdefault(axes, {key: [] for key in _OVERLAY_ARRAYS})
+        styles.setdefault(axes, annotation)
+        column["x"].append(_anchor(fig, annotation, "x"))
+        column["y"].append(_anchor(fig, annotation, "y"))
+        column["text"].append(annotation.get("text"))
+        column["hovertext"].append(annotation.get("text"))
+        column["customdata"].append(annotation)
+
+    for (xref, yref), column in columns.items():
+        _extend(_overlay_trace(fig, xref, yref, styles[(xref, yref)]), column)
+    fig.layout.annotations = [
+        annotation
+        for position, annotation in enumerate(annotations)
+        if position not in moved
+    ]
+    return demoted
+
+
+def _remove_points(trace: Any, positions: List[int]) -> None:
+    skip = set(positions)
+    trace.update(
+        {
+            key: [v for i, v in enumerate(trace[key] or []) if i not in skip]
+            for key in _OVERLAY_ARRAYS
+        }
+    )
+
+
+def promote(fig: go.Figure, curve_number: int, point_number: int) -> Dict[str, Any]:
+    """
+    Moves a point of an overlay trace back to a tooltip annotation.
+
+    Returns:
+        Dict[str, Any]: The restored annotation.
+    """
+    trace = fig.data[curve_number]
+    annotation = dict(trace.customdata[point_number])
+    _remove_points(trace, [point_number])
+    fig.add_annotation(**annotation)
+    return annotation
+
+
+def discard(fig: go.Figure, name: str) -> None:
+    """Removes the overlay points of the tooltip ``name``, e.g. once re-added."""
+    for trace in fig.data:
+        if is_overlay_trace(trace) and trace.customdata:
+            positions = [
+                i for i, item in enumerate(trace.customdata) if item.get("name") == name
+            ]
+            if positions:
+                _remove_points(trace, positions)
+
+
+def restore(fig: go.Figure, annotations: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Moves demoted tooltips back from the overlay traces, found by name.
+
+    They are put before the other annotations, where they were when they were
+    demoted, so that the oldest tooltips are still the first ones demoted again.
+
+    Returns:
+        List[Dict[str, Any]]: The restored annotations; tooltips no longer in the
+        overlay, e.g. promoted by a click, are skipped.
+    """
+    names = {annotation.get("name") for annotation in annotations}
+    restored = []
+    for trace in fig.data:
+        if is_overlay_trace(trace) and trace.customdata:
+            positions = [
+                i
+                for i, item in enumerate(trace.customdata)
+                if item.get("name") in names
+            ]
+            restored += [dict(trace.customdata[i]) for i in positions]
+            if positions:
+                _remove_points(trace, positions)
+    if restored:
+        fig.layout.annotations = restored + list(fig.layout.annotations)
+    return restored
@@ -0,0 +1,237 @@
+import bisect
+import copy
+from typing import Any, Dict, Hashable, List, Optional, Union
+
+import numpy as np
+
+from .config import DEFAULT_ANNOTATION_CONFIG, DEFAULT_TEMPLATE
+from .custom_figure import CustomFigure
+from .indexing import IndexCache, SparseTable, _array_slice, _as_array, _length
+from .style import TooltipStyle
+from .utils import _display_click_data, compile_template
+
+SNAP_MODES = ("max", "min", "auto")
+
+
+def find_peaks(
+    values: Any, k: Optional[int] = None, kind: str = "max", distance: int = 1
+) -> np.ndarray:
+    """
+    Finds local extrema of a 1-D array with vectorized NumPy operations.
+
+    Plateaus count as a single peak located at their first sample; NaNs are ignored.
+
+    Args:
+        values: The samples to search.
+        k (int, optional): Keep only the ``k`` highest peaks (lowest for ``kind="min"``).
+        kind (str): ``"max"`` for peaks, ``"min"`` for valleys.
+        distance (int): Minimum number of samples between two returned peaks;
+                        higher peaks win.
+
+    Returns:
+        np.ndarray: Peak indices, by position when ``k`` is None, otherwise sorted
+                    from the most to the least extreme.
+    """
+    if kind not in ("max", "min"):
+        raise ValueError(f"Invalid peak kind: {kind}, expected 'max' or 'min'")
+    y = _as_array(values, dtype=float)
+    if y is None or y.size < 3:
+        return np.empty(0, dtype=np.intp)
+    if kind == "min":
+        y = -y
+    y = np.where(np.isnan(y), -np.inf, y)
+
+    sign = np.sign(np.diff(y))
+    # For each diff, the sign of the first non-flat step at or after it
+    positions = np.arange(sign.size)
+    next_step = np.where(sign != 0, positions, sign.size)
+    next_step = np.minimum.accumulate(next_step[::-1])[::-1]
+    next_sign = np.append(sign, 0)[next_step]
+    peaks = np.flatnonzero((sign[:-1] > 0) & (next_sign[1:] < 0)) + 1
+
+    if k is None and distance <= 1:
+        return peaks
+    if k is not None and k <= 0:
+        return np.empty(0, dtype=np.intp)
+
+    if distance <= 1:
+        if k is not None and k < peaks.size:
+            peaks = peaks[np.argpartition(-y[peaks], k - 1)[:k]]
+        return peaks[np.argsort(-y[peaks], kind="stable")]
+
+    ranked = peaks[np.argsort(-y[peaks], kind="stable")]
+    accepted: List[int] = []
+    for peak in ranked.tolist():
+        pos = bisect.bisect_left(accepted, peak)
+        if pos > 0 and peak - accepted[pos - 1] < distance:
+            continue
+        if pos < len(accepted) and accepted[pos] - peak < distance:
+            continue
+        accepted.insert(pos, peak)
+        if k is not None and len(accepted) >= k:
+            break
+    result = np.asarray(accepted, dtype=np.intp)
+    if k is None:
+        return result
+    return result[np.argsort(-y[result], kind="stable")]
+
+
+def snap_index(table: SparseTable, index: int, window: int, kind: str = "max") -> int:
+    """
+    Returns the index of the extremum within ``window`` samples of ``index``.
+
+    With ``kind="auto"`` the maximum or minimum closest in value to the clicked
+    sample is chosen, so a click near a valley snaps down and a click near a peak
+    snaps up.
+    """
+    if kind not in SNAP_MODES:
+        raise ValueError(f"Invalid snap mode: {kind}, expected one of {SNAP_MODES}")
+    start, stop = index - window, index + window + 1
+    if kind == "max":
+        return table.argmax(start, stop)
+    if kind == "min":
+        return table.argmin(start, stop)
+    high, low = table.argmax(start, stop), table.argmin(start, stop)
+    value = table.values[index]
+    if abs(table.values[high] - value) <= abs(value - table.values[low]):
+        return high
+    return low
+
+
+def _get_trace(figure: Union[CustomFigure, Dict[str, Any]], curve_number: int) -> Any:
+    return figure["data"][curve_number]
+
+
+def _sample(trace: Any, key: str, index: int) -> Any:
+    values = trace[key] if key in trace else None
+    if values is None:
+        return None
+    if isinstance(values, dict):
+        return _array_slice(values, index, index + 1)[0].tolist()
+    if isinstance(values, str):  # scalar attributes such as ``text="A"``
+        return values
+    value = values[index]
+    return value.tolist() if isinstance(value, (np.ndarray, np.generic)) else value
+
+
+def _x_value(trace: Any, index: int) -> Any:
+    if "x" in trace and trace["x"] is not None:
+        return _sample(trace, "x", index)
+    x0 = trace["x0"] if "x0" in trace and trace["x0"] is not None else 0
+    dx = trace["dx"] if "dx" in trace and trace["dx"] is not None else 1
+    return x0 + index * dx
+
+
+def snap_click_data(
+    clickData: Dict[str, Any],
+    figure: Union[CustomFigure, Dict[str, Any]],
+    kind: str = "max",
+    window: int = 20,
+    cache: Optional[IndexCache] = None,
+    revision: Hashable = None,
+) -> Dict[str, Any]:
+    """
+    Moves the clicked point to the local extremum of its trace.
+
+    With a ``revision``, the range index of the whole trace is built once per
+    revision and each click costs O(1); without one, only the samples of the
+    window are read, as telling whether the data changed would cost more.
+
+    Args:
+        clickData (Dict[str, Any]): The data from the click event.
+        figure (Union[CustomFigure, Dict[str, Any]]): The figure holding the trace.
+        kind (str): ``"max"``, ``"min"`` or ``"auto"``.
+        window (int): Half-width of the search window, in samples.
+        cache (IndexCache, optional): Cache of range indices reused across clicks.
+        revision (Hashable, optional): Identity of the figure data, e.g. from
+            `data_revision`.
+
+    Returns:
+        Dict[str, Any]: A copy of ``clickData`` pointing at the snapped sample.
+    """
+    if not clickData or not clickData.get("points"):
+        return clickData
+    point = clickData["points"][0]
+    index = point.get("pointNumber", point.get("pointIndex"))
+    # Points of 2-D traces (heatmaps) are numbered by lists
+    if not isinstance(index, int) or figure is None or "curveNumber" not in point:
+        return clickData
+    trace = _get_trace(figure, point["curveNumber"])
+    y = trace["y"] if "y" in trace else None
+    if y is None or not 0 <= index < _length(y):
+        return clickData
+
+    if cache is not None and revision is not None:
+        offset = 0
+        table = cache.get_or_build(
+            ("sparse", revision, point["curveNumber"], _length(y)),
+            lambda: SparseTable(y),
+        )
+    else:
+        offset = max(0, index - window)
+        table = SparseTable(_array_slice(y, offset, index + window + 1, dtype=float))
+    snapped = offset + snap_index(table, index - offset, window, kind)
+    if snapped == index:
+        return clickData
+
+    new_point = dict(point)
+    new_point["pointNumber"] = new_point["pointIndex"] = snapped
+    new_point["x"] = _x_value(trace, snapped)
+    new_point["y"] = float(table.values[snapped - offset])
+    for key in ("customdata", "text", "hovertext"):
+        if key in new_point:
+            new_point[key] = _sample(trace, key, snapped)
+    return dict(clickData, points=[new_point] + clickData["points"][1:])
+
+
+def annotate_peaks(
+    figure: Union[CustomFigure, Dict[str, Any]],
+    curve_number: int = 0,
+    k: int = 5,
+    kind: str = "max",
+    distance: int = 1,
+    template: str = DEFAULT_TEMPLATE,
+    style: Union[Dict[Any, Any], TooltipStyle] = DEFAULT_ANNOTATION_CONFIG,
+    apply_log_fix: bool = True,
+) -> CustomFigure:
+    """
+    Adds tooltips on the ``k`` highest peaks (or lowest valleys) of a trace.
+
+    Args:
+        figure (Union[CustomFigure, Dict[str, Any]]): The figure to annotate.
+        curve_number (int): Index of the trace to search.
+        k (int): Number of peaks to annotate.
+        kind (str): ``"max"`` for peaks, ``"min"`` for valleys.
+        distance (int): Minimum number of samples between annotated peaks.
+        template (str): The template for the tooltips.
+        style (Union[Dict[Any, Any], TooltipStyle]): The configuration for the tooltips.
+        apply_log_fix (bool): Whether to apply the log axis fix.
+
+    Returns:
+        CustomFigure: The annotated figure.
+    """
+    if isinstance(figure, dict):
+        # _display_click_data consumes the trace dicts it converts
+        figure = copy.deepcopy(figure)
+    if not isinstance(style, TooltipStyle):
+        style = TooltipStyle(style)
+    template = compile_template(template)
+    trace = _get_trace(figure, curve_number)
+    y = trace["y"] if "y" in trace else None
+    for index in find_peaks(y, k=k, kind=kind, distance=distance).tolist():
+        point = {
+            "curveNumber": curve_number,
+            "pointNumber": index,
+            "pointIndex": index,
+            "x": _x_value(trace, index),
+            "y": _sample(trace, "y", index),
+        }
+        if "customdata" in trace and trace["customdata"] is not None:
+            point["customdata"] = _sample(trace, "customdata", index)
+        figure = _display_click_data(
+            {"points": [point]}, figure, template, style, apply_log_fix
+        )
+        trace = _get_trace(figure, curve_number)
+    if isinstance(figure, dict):
+        figure = _display_click_data({}, figure, template, style, apply_log_fix)
+    return figure
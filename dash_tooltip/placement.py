@@ -0,0 +1,399 @@
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Any, Dict, Hashable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from .indexing import IndexCache, _as_array, data_key
+
+Box = Tuple[float, float, float, float]  # x0, y0, x1, y1 in pixels, y pointing down
+
+# Approximate glyph metrics, relative to the font size
+CHAR_WIDTH = 0.6
+LINE_HEIGHT = 1.3
+# Padding around the text (plotly's default borderpad + border), in pixels
+BOX_PADDING = 4
+
+# Plotly defaults used when the layout leaves them unset
+DEFAULT_FIGURE_SIZE = (700, 450)
+DEFAULT_MARGIN = {"l": 80, "r": 80, "t": 100, "b": 80}
+DEFAULT_OFFSET = (-10, -30)
+DEFAULT_FONT_SIZE = 12
+# Fraction of the data span plotly adds on each side of an autoranged axis
+AUTORANGE_PADDING = 0.05
+
+_TAG_PATTERN = re.compile(r"<[^>]+>")
+_LINE_BREAK_PATTERN = re.compile(r"<br\s*/?>", re.IGNORECASE)
+_AXIS_REF_PATTERN = re.compile(r"^[xy]\d*$")
+
+
+def estimate_text_size(text: str, font_size: float) -> Tuple[float, float]:
+    """Estimates the rendered size of annotation text, in pixels."""
+    lines = _LINE_BREAK_PATTERN.split(text or "")
+    longest = max(len(_TAG_PATTERN.sub("", line)) for line in lines)
+    width = longest * font_size * CHAR_WIDTH + 2 * BOX_PADDING
+    height = len(lines) * font_size * LINE_HEIGHT + 2 * BOX_PADDING
+    return width, height
+
+
+def _overlaps(a: Box, b: Box) -> bool:
+    return a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
+
+
+class GridIndex:
+    """
+    Spatial hash of axis-aligned boxes over a uniform grid.
+
+    A box is registered in every cell it covers. With cells about the size of a
+    tooltip, inserting, removing or testing a box touches a constant number of
+    cells, so each operation is O(1) expected instead of a scan of all boxes.
+    """
+
+    def __init__(self, cell_size: float = 64):
+        self.cell_size = cell_size
+        self._cells: Dict[Tuple[int, int], List[Hashable]] = defaultdict(list)
+        self._boxes: Dict[Hashable, Box] = {}
+
+    def _cells_of(self, box: Box) -> List[Tuple[int, int]]:
+        size = self.cell_size
+        return [
+            (i, j)
+            for i in range(int(box[0] // size), int(box[2] // size) + 1)
+            for j in range(int(box[1] // size), int(box[3] // size) + 1)
+        ]
+
+    def insert(self, key: Hashable, box: Box) -> None:
+        self._boxes[key] = box
+        for cell in self._cells_of(box):
+            self._cells[cell].append(key)
+
+    def remove(self, key: Hashable) -> None:
+        box = self._boxes.pop(key, None)
+        if box is None:
+            return
+        for cell in self._cells_of(box):
+            self._cells[cell].remove(key)
+            if not self._cells[cell]:
+                del self._cells[cell]
+
+    def count_overlaps(self, box: Box) -> int:
+        """Number of stored boxes intersecting ``box``."""
+        hits = set()
+        for cell in self._cells_of(box):
+            for key in self._cells.get(cell, ()):
+                if key not in hits and _overlaps(box, self._boxes[key]):
+                    hits.add(key)
+        return len(hits)
+
+    def clear(self) -> None:
+        self._cells.clear()
+        self._boxes.clear()
+
+    def __len__(self) -> int:
+        return len(self._boxes)
+
+
+def _axis_key(ref: str) -> str:
+    """Maps an annotation reference such as ``x2`` to its layout key ``xaxis2``."""
+    return ref[0] + "axis" + ref[1:]
+
+
+def _to_numeric(values: Any, axis_type: str) -> Optional[np.ndarray]:
+    """Converts axis values to floats: log10 for log axes, milliseconds for dates."""
+    array = _as_array(values)
+    if array is None:
+        return None
+    if axis_type == "date" or array.dtype.kind in "OUSM":
+        try:
+            return array.astype("datetime64[ms]").astype(float)
+        except (TypeError, ValueError):
+            return None
+    array = array.astype(float)
+    if axis_type == "log":
+        with np.errstate(divide="ignore", invalid="ignore"):
+            array = np.log10(np.where(array > 0, array, np.nan))
+    return array
+
+
+class AnnotationPlacer:
+    """
+    Chooses tooltip offsets (``ax``/``ay``) that avoid the other annotations.
+
+    Annotation boxes are estimated from their text and font size and kept in a
+    `GridIndex` in screen pixels. Candidate offsets are tried on rings of growing
+    radius around the clicked point, and the first one whose text box is free is
+    used.
+
+    A placer follows the annotations of one figure, i.e. of one graph in one
+    browser session. Tooltips are inserted in and removed from the grid as they
+    are `added` and `removed`, so placing one costs O(1) expected time. The
+    figure is only read again, in O(n), when it holds another number of
+    annotations than expected, e.g. after another callback changed them; boxes
+    are computed again when the axes change, e.g. after zooming.
+    """
+
+    def __init__(
+        self,
+        radii: Tuple[float, ...] = (40, 70, 110, 160),
+        directions: int = 8,
+        cell_size: float = 64,
+    ):
+        self.radii = radii
+        self.directions = directions
+        self.index = GridIndex(cell_size)
+        self._annotations: Dict[int, Dict[str, Any]] = {}
+        self._keys: Dict[Tuple[Any, ...], List[int]] = defaultdict(list)
+        self._refs: "Counter[str]" = Counter()
+        self._transforms: Dict[str, Any] = {}
+        self._transform: Optional[Tuple[Any, ...]] = None
+        self._synced = False
+        self._next_key = 0
+        self._extents = IndexCache(maxsize=64)
+
+    # ---- Screen transform ----
+    def _data_extent(
+        self, fig: Any, ref: str, axis_type: str
+    ) -> Optional[Tuple[float, float]]:
+        letter = ref[0]
+        low, high = math.inf, -math.inf
+        revision = fig.layout.datarevision
+        for curve_number, trace in enumerate(fig.data):
+            trace_ref = getattr(trace, letter + "axis", None) or letter
+            values = getattr(trace, letter, None)
+            if trace_ref != ref or values is None or len(values) == 0:
+                continue
+
+            def extent(values: Any = values) -> Tuple[float, float]:
+                numeric = _to_numeric(values, axis_type)
+                if numeric is None or not np.isfinite(numeric).any():
+                    return math.inf, -math.inf
+                return float(np.nanmin(numeric)), float(np.nanmax(numeric))
+
+            key = (ref, axis_type, revision, curve_number, data_key(values))
+            trace_low, trace_high = self._extents.get_or_build(key, extent)
+            low, high = min(low, trace_low), max(high, trace_high)
+        if low > high:
+            return None
+        pad = (high - low) * AUTORANGE_PADDING or 1
+        return low - pad, high + pad
+
+    def _axis_transform(
+        self, fig: Any, ref: str, plot: Box
+    ) -> Optional[Tuple[str, float, float, float, float]]:
+        try:
+            axis = fig.layout[_axis_key(ref)].to_plotly_json()
+        except (KeyError, ValueError):
+            axis = {}
+        axis_type = axis.get("type") or "-"
+        if axis_type == "category":
+            return None
+        axis_range = axis.get("range")
+        if axis_range and axis.get("autorange") is not True:
+            # Layout ranges of log axes are already expressed in log10
+            numeric = _to_numeric(
+                list(axis_range), "-" if axis_type == "log" else axis_type
+            )
+            if numeric is None:
+                return None
+            start, end = numeric
+        else:
+            extent = self._data_extent(fig, ref, axis_type)
+            if extent is None:
+                return None
+            start, end = extent
+        if not (np.isfinite(start) and np.isfinite(end)) or start == end:
+            return None
+        domain = axis.get("domain", [0, 1])
+        if ref[0] == "x":
+            pixel_start = plot[0] + domain[0] * (plot[2] - plot[0])
+            pixel_end = plot[0] + domain[1] * (plot[2] - plot[0])
+        else:  # screen y grows downwards
+            pixel_start = plot[3] - domain[0] * (plot[3] - plot[1])
+            pixel_end = plot[3] - domain[1] * (plot[3] - plot[1])
+        return axis_type, float(start), float(end), pixel_start, pixel_end
+
+    def _to_pixel(self, value: Any, transform: Tuple[Any, ...]) -> Optional[float]:
+        axis_type, start, end, pixel_start, pixel_end = transform
+        if axis_type == "log":  # tooltip coordinates on log axes are log10 already
+            numeric = _to_numeric([value], "-")
+        else:
+            numeric = _to_numeric([value], axis_type)
+        if numeric is None or not np.isfinite(numeric[0]):
+            return None
+        fraction = (numeric[0] - start) / (end - start)
+        return pixel_start + fraction * (pixel_end - pixel_start)
+
+    # ---- Boxes ----
+    def _text_box(
+        self, x: float, y: float, ax: float, ay: float, text: str, style: Dict[str, Any]
+    ) -> Box:
+        font = style.get("font") or {}
+        width, height = estimate_text_size(text, font.get("size") or DEFAULT_FONT_SIZE)
+        tail_x, tail_y = x + ax, y + ay
+        xanchor = style.get("xanchor", "auto")
+        if xanchor == "left":
+            x0 = tail_x
+        elif xanchor == "right":
+            x0 = tail_x - width
+        else:
+            x0 = tail_x - width / 2
+        yanchor = style.get("yanchor", "auto")
+        if yanchor == "top":
+            y0 = tail_y
+        elif yanchor == "bottom":
+            y0 = tail_y - height
+        else:
+            y0 = tail_y - height / 2
+        return x0, y0, x0 + width, y0 + height
+
+    def _annotation_box(
+        self, annotation: Dict[str, Any], transforms: Dict[str, Any]
+    ) -> Optional[Box]:
+        x_transform = transforms.get(annotation.get("xref", "x"))
+        y_transform = transforms.get(annotation.get("yref", "y"))
+        if x_transform is None or y_transform is None:
+            return None
+        x = self._to_pixel(annotation.get("x"), x_transform)
+        y = self._to_pixel(annotation.get("y"), y_transform)
+        if x is None or y is None:
+            return None
+        ax = annotation.get("ax", DEFAULT_OFFSET[0])
+        ay = annotation.get("ay", DEFAULT_OFFSET[1])
+        if annotation.get("showarrow") is False:
+            ax = ay = 0
+        return self._text_box(x, y, ax, ay, annotation.get("text", ""), annotation)
+
+    @staticmethod
+    def _signature(annotation: Dict[str, Any]) -> Tuple[Any, ...]:
+        font = annotation.get("font") or {}
+        return (
+            annotation.get("xref"),
+            annotation.get("yref"),
+            str(annotation.get("x")),
+            str(annotation.get("y")),
+            annotation.get("ax"),
+            annotation.get("ay"),
+            annotation.get("text"),
+            font.get("size"),
+            annotation.get("xanchor"),
+            annotation.get("yanchor"),
+            annotation.get("showarrow"),
+        )
+
+    def added(self, annotation: Dict[str, Any]) -> None:
+        """Inserts an annotation added to the figure."""
+        key = self._next_key
+        self._next_key += 1
+        self._annotations[key] = dict(annotation)
+        self._keys[self._signature(annotation)].append(key)
+        self._refs.update((annotation.get("xref", "x"), annotation.get("yref", "y")))
+        box = self._annotation_box(annotation, self._transforms)
+        if box is not None:
+            self.index.insert(key, box)
+
+    def removed(self, annotation: Dict[str, Any]) -> None:
+        """Removes an annotation deleted from the figure."""
+        signature = self._signature(annotation)
+        keys = self._keys.get(signature)
+        if not keys:
+            # Changed since it was added, e.g. dragged: the figure is read again
+            self._synced = False
+            return
+        key = keys.pop()
+        if not keys:
+            del self._keys[signature]
+        del self._annotations[key]
+        self._refs.subtract((annotation.get("xref", "x"), annotation.get("yref", "y")))
+        self.index.remove(key)
+
+    def reset(self) -> None:
+        """Reads the annotations of the figure again on the next placement."""
+        self._synced = False
+
+    def sync(self, annotations: List[Dict[str, Any]]) -> None:
+        """Replaces the annotations followed by those of the figure, in O(n)."""
+        self.index.clear()
+        self._annotations.clear()
+        self._keys.clear()
+        self._refs.clear()
+        self._transforms = {}
+        self._transform = None
+        for annotation in annotations:
+            self.added(annotation)
+        self._synced = True
+
+    def _update_transforms(self, fig: Any, refs: Set[str], plot: Box) -> None:
+        """Computes the axis transforms, and the boxes again when they changed."""
+        transforms = {
+            ref: self._axis_transform(fig, ref, plot)
+            for ref in refs
+            if _AXIS_REF_PATTERN.match(ref or "")
+        }
+        transform_state = tuple(sorted(transforms.items()))
+        if transform_state == self._transform:
+            return
+        self._transforms = transforms
+        self._transform = transform_state
+        self.index.clear()
+        for key, annotation in self._annotations.items():
+            box = self._annotation_box(annotation, transforms)
+            if box is not None:
+                self.index.insert(key, box)
+
+    def place(
+        self,
+        fig: Any,
+        x: Any,
+        y: Any,
+        xref: str,
+        yref: str,
+        text: str,
+        style: Dict[str, Any],
+    ) -> Optional[Tuple[float, float]]:
+        """
+        Returns the ``(ax, ay)`` offset for a new tooltip, or None when the point
+        cannot be located on screen (e.g. category axes).
+        """
+        layout = fig.layout
+        width = layout.width or DEFAULT_FIGURE_SIZE[0]
+        height = layout.height or DEFAULT_FIGURE_SIZE[1]
+        margin = dict(DEFAULT_MARGIN, **layout.margin.to_plotly_json())
+        plot = (margin["l"], margin["t"], width - margin["r"], height - margin["b"])
+
+        annotations = layout.annotations
+        if not self._synced or len(annotations) != len(self._annotations):
+            self.sync([a.to_plotly_json() for a in annotations])
+        refs = {ref for ref, count in self._refs.items() if count > 0}
+        self._update_transforms(fig, refs | {xref, yref}, plot)
+        transforms = self._transforms
+
+        if transforms.get(xref) is None or transforms.get(yref) is None:
+            return None
+        px = self._to_pixel(x, transforms[xref])
+        py = self._to_pixel(y, transforms[yref])
+        if px is None or py is None:
+            return None
+
+        default = (
+            style.get("ax", DEFAULT_OFFSET[0]),
+            style.get("ay", DEFAULT_OFFSET[1]),
+        )
+        candidates = [default]
+        for radius in self.radii:
+            for step in range(self.directions):
+                angle = -math.pi / 4 + 2 * math.pi * step / self.directions
+                candidates.append(
+                    (round(radius * math.cos(angle)), round(radius * math.sin(angle)))
+                )
+
+        best, best_overlaps = default, math.inf
+        for ax, ay in candidates:
+            box = self._text_box(px, py, ax, ay, text, style)
+            outside = box[0] < 0 or box[1] < 0 or box[2] > width or box[3] > height
+            overlaps = self.index.count_overlaps(box) + (0.5 if outside else 0)
+            if overlaps < best_overlaps:
+                best, best_overlaps = (ax, ay), overlaps
+                if overlaps == 0:
+                    break
+        return best
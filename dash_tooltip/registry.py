@@ -0,0 +1,168 @@
+from typing import Any, Dict, Hashable, Optional, Sequence
+
+ANNOTATION_NAME_PREFIX = "dash-tooltip"
+
+
+def _point_key(point: Dict[str, Any]) -> Optional[Hashable]:
+    """Identity of a clicked sample: its ``(curveNumber, pointNumber)`` pair."""
+    curve_number = point.get("curveNumber")
+    point_number = point.get("pointNumber", point.get("pointIndex"))
+    if curve_number is None or point_number is None:
+        return None
+    if isinstance(point_number, list):  # e.g. [row, column] on heatmaps
+        point_number = tuple(point_number)
+    return curve_number, point_number
+
+
+def _annotation_name(key: Hashable) -> str:
+    """Annotation ``name`` used to recognise the tooltip of a sample."""
+    curve_number, point_number = key  # type: ignore[misc]
+    if isinstance(point_number, tuple):
+        point_number = "-".join(str(part) for part in point_number)
+    return f"{ANNOTATION_NAME_PREFIX}-{curve_number}-{point_number}"
+
+
+def _get_name(annotation: Any) -> Optional[str]:
+    if isinstance(annotation, dict):
+        return annotation.get("name")
+    return getattr(annotation, "name", None)
+
+
+def _get_annotations(figure: Any) -> Sequence[Any]:
+    """Annotations of a figure given as a dictionary or a plotly figure."""
+    if isinstance(figure, dict):
+        return (figure.get("layout") or {}).get("annotations") or []
+    return figure.layout.annotations
+
+
+def _remove_annotation(figure: Any, position: int) -> Any:
+    """Removes the annotation at ``position`` of a dictionary or plotly figure."""
+    if isinstance(figure, dict):
+        del figure["layout"]["annotations"][position]
+    else:
+        annotations = list(figure.layout.annotations)
+        del annotations[position]
+        figure.layout.annotations = annotations
+    return figure
+
+
+class _DeletedSlots:
+    """Fenwick tree counting the deleted slots before a slot, in O(log n)."""
+
+    __slots__ = ("_flags", "_tree", "total")
+
+    def __init__(self) -> None:
+        self._flags = bytearray()
+        self._tree = [0]
+        self.total = 0
+
+    def _resize(self, capacity: int) -> None:
+        self._flags.extend(bytes(capacity - len(self._flags)))
+        tree = [0] * (capacity + 1)
+        for i in range(1, capacity + 1):
+            tree[i] += self._flags[i - 1]
+            parent = i + (i & -i)
+            if parent <= capacity:
+                tree[parent] += tree[i]
+        self._tree = tree
+
+    def add(self, slot: int) -> None:
+        if slot >= len(self._flags):
+            self._resize(max(slot + 1, 2 * len(self._flags)))
+        if self._flags[slot]:
+            return
+        self._flags[slot] = 1
+        self.total += 1
+        i = slot + 1
+        while i < len(self._tree):
+            self._tree[i] += 1
+            i += i & -i
+
+    def before(self, slot: int) -> int:
+        total = 0
+        i = min(slot, len(self._flags))
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+
+class ClickIndex:
+    """
+    Index from tooltip ids to the position of their annotation.
+
+    A tooltip id is the ``name`` of its annotation, and its record is a slot: the
+    position the annotation was appended at. Removals are counted per slot in a
+    Fenwick tree, so finding the current position of a tooltip and recording a
+    removal take O(log n), without shifting the other records.
+
+    Positions are checked against the annotation ``name`` and the list length,
+    and the index is only rebuilt from the figure when they disagree, e.g. after
+    the figure was regenerated, reordered by another callback, or the page
+    reloaded.
+    """
+
+    __slots__ = ("slots", "size", "_next", "_deleted")
+
+    def __init__(self) -> None:
+        self.slots: Dict[str, int] = {}
+        self.size = 0
+        self._next = 0
+        self._deleted = _DeletedSlots()
+
+    def rebuild(self, annotations: Sequence[Any]) -> None:
+        self.slots = {}
+        for position, annotation in enumerate(annotations):
+            name = _get_name(annotation)
+            if name and name.startswith(ANNOTATION_NAME_PREFIX):
+                self.slots[name] = position
+        self.size = len(annotations)
+        self._next = len(annotations)
+        self._deleted = _DeletedSlots()
+
+    def invalidate(self) -> None:
+        """Forces a rebuild on the next lookup."""
+        self.size = -1
+
+    def position(self, name: str) -> Optional[int]:
+        """Recorded position of the tooltip ``name``, without checking the figure."""
+        slot = self.slots.get(name)
+        return None if slot is None else slot - self._deleted.before(slot)
+
+    def sync(self, annotations: Sequence[Any]) -> None:
+        """Rebuilds the index when its size disagrees with ``annotations``."""
+        if len(annotations) != self.size:
+            self.rebuild(annotations)
+
+    def find(self, name: str, annotations: Sequence[Any]) -> Optional[int]:
+        """Position of the tooltip ``name`` in ``annotations``, if any."""
+        self.sync(annotations)
+        position = self.position(name)
+        if position is not None and (
+            position >= len(annotations) or _get_name(annotations[position]) != name
+        ):
+            self.rebuild(annotations)
+            position = self.position(name)
+        return position
+
+    def lookup(self, key: Hashable, annotations: Sequence[Any]) -> Optional[int]:
+        """Position of the tooltip of the sample ``key`` in ``annotations``, if any."""
+        return self.find(_annotation_name(key), annotations)
+
+    def added(self, name: str, position: int, size: int) -> None:
+        """Records the tooltip ``name`` appended at ``position`` of a list now ``size`` long."""
+        if position == self._next - self._deleted.total and size == self.size + 1:
+            self.slots[name] = self._next
+            self._next += 1
+            self.size = size
+        else:
+            self.invalidate()
+
+    def removed(self, name: str) -> None:
+        """Records the removal of the tooltip ``name``."""
+        slot = self.slots.pop(name, None)
+        if slot is None:
+            self.invalidate()
+            return
+        self._deleted.add(slot)
+        self.size -= 1
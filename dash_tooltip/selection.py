@@ -0,0 +1,277 @@
+import datetime
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from .crosshair import _explicit_x
+from .indexing import _as_array
+from .links import _x_numbers
+from .overlay import is_tooltip_trace
+from .placement import _axis_key
+from .style import TooltipStyle
+from .utils import CompiledTemplate, _log_value, compile_template
+from .viewport import _number
+
+SELECTION_STATS = ("count", "x_min", "x_max", "mean", "min", "max")
+SELECTION_TEMPLATE = (
+    "%{name}: %{sel.count} points, x: %{sel.x_min} to %{sel.x_max}<br>"
+    "mean: %{sel.mean:.4g}, min: %{sel.min:.4g}, max: %{sel.max:.4g}"
+)
+# Not a tooltip name: the summary is replaced by the next selection instead of
+# being indexed, undone or synced like tooltips
+SELECTION_NAME = "selection-summary"
+SELECTION_STORE_ID = "tooltip-selection"
+
+Selected = Tuple[np.ndarray, np.ndarray]
+
+
+def _in_polygon(
+    x: np.ndarray, y: np.ndarray, xs: np.ndarray, ys: np.ndarray
+) -> np.ndarray:
+    """
+    Mask of the points inside a polygon, by the even-odd rule.
+
+    Only the points within the bounding box of the polygon are tested. They are
+    sorted by y once, so that each edge only tests the band of points between
+    its ends, found by binary search: about two tests per point for a convex
+    polygon, whatever its number of vertices.
+    """
+    inside = (x >= xs.min()) & (x <= xs.max()) & (y >= ys.min()) & (y <= ys.max())
+    candidates = np.flatnonzero(inside)
+    order = np.argsort(y[candidates], kind="stable")
+    candidates = candidates[order]
+    cx, cy = x[candidates], y[candidates]
+    odd = np.zeros(candidates.size, dtype=bool)
+    for i in range(xs.size):
+        x0, y0, x1, y1 = xs[i - 1], ys[i - 1], xs[i], ys[i]
+        if y0 == y1:
+            continue
+        # The edge crosses the rays of the points with min(y0, y1) <= y < max
+        start, stop = np.searchsorted(cy, sorted((y0, y1)), "left")
+        band = slice(start, stop)
+        odd[band] ^= cx[band] < x0 + (cy[band] - y0) * (x1 - x0) / (y1 - y0)
+    inside[candidates] = odd
+    return inside
+
+
+def _bounds(values: List[Any]) -> Optional[np.ndarray]:
+    numbers = [_number(value) for value in values or []]
+    if not numbers or None in numbers:
+        return None
+    return np.asarray(numbers, dtype=float)
+
+
+def selection_mask(
+    x: np.ndarray, y: np.ndarray, selection: Dict[str, Any], xref: str, yref: str
+) -> Optional[np.ndarray]:
+    """
+    Samples of a trace within a box or lasso selection.
+
+    Args:
+        x (np.ndarray): The x values, as numbers (dates in nanoseconds).
+        y (np.ndarray): The y values, as numbers.
+        selection (Dict[str, Any]): The ``range`` of a box selection or the
+            ``lassoPoints`` of a lasso selection, keyed by axis reference, as in
+            ``selectedData``.
+        xref (str): The x axis of the trace, e.g. "x2".
+        yref (str): The y axis of the trace.
+
+    Returns:
+        Optional[np.ndarray]: The mask of the selected samples, or None when the
+        selection is not on the axes of the trace.
+    """
+    box = selection.get("range") or {}
+    lasso = selection.get("lassoPoints") or {}
+    if box:
+        mask = None
+        for values, ref in ((x, xref), (y, yref)):
+            if ref not in box:
+                if any(key[:1] == ref[:1] for key in box):
+                    # Bounded on another subplot
+                    return None
+                continue
+            bounds = _bounds(box[ref])
+            if bounds is None:
+                return None
+            within = (values >= bounds.min()) & (values <= bounds.max())
+            mask = within if mask is None else mask & within
+        return mask
+    xs, ys = _bounds(lasso.get(xref)), _bounds(lasso.get(yref))
+    if xs is None or ys is None or xs.size != ys.size or xs.size < 3:
+        return None
+    return _in_polygon(x, y, xs, ys)
+
+
+def _is_numeric(values: Any) -> bool:
+    array = _as_array(values)
+    if array.dtype.kind in "iufb":
+        return True
+    if array.dtype.kind != "O":
+        return False
+    try:
+        array.astype(float)
+    except (TypeError, ValueError):
+        return False
+    return True
+
+
+def _as_x(value: float, dates: bool) -> Any:
+    """An x coordinate back from its numeric form: dates as `datetime`."""
+    if not dates:
+        return value
+    return np.datetime64(int(value), "ns").astype("datetime64[us]").item()
+
+
+def _select(
+    trace: Any, selection: Dict[str, Any], xref: str, yref: str
+) -> Optional[Selected]:
+    """The x (as numbers) and y values of the selected samples of a trace."""
+    y = _as_array(trace["y"] if "y" in trace else None, dtype=float)
+    if y is None:
+        return None
+    y = y.ravel()
+    x = _x_numbers(_explicit_x(trace, y.size))
+    if x is None or x.size != y.size:
+        # Categories cannot be compared to the selection bounds
+        return None
+    mask = selection_mask(x, y, selection, xref, yref)
+    if mask is None:
+        return None
+    # Gaps are not selected, even by a selection bounded in x only
+    mask &= ~np.isnan(y)
+    return x[mask], y[mask]
+
+
+def _stats(selected: Selected, dates: bool) -> Dict[str, Any]:
+    x, y = selected
+    if not x.size:
+        return dict(dict.fromkeys(SELECTION_STATS), count=0)
+    return {
+        "count": int(x.size),
+        "x_min": _as_x(float(x.min()), dates),
+        "x_max": _as_x(float(x.max()), dates),
+        "mean": float(y.mean()),
+        "min": float(y.min()),
+        "max": float(y.max()),
+    }
+
+
+def _refs(trace: Any) -> Tuple[str, str]:
+    # Traces on the default axes may hold None rather than "x"/"y"
+    xref = (trace["xaxis"] if "xaxis" in trace else None) or "x"
+    yref = (trace["yaxis"] if "yaxis" in trace else None) or "y"
+    return xref, yref
+
+
+def _has_dates(trace: Any) -> bool:
+    return "x" in trace and trace["x"] is not None and not _is_numeric(trace["x"])
+
+
+def selection_stats(trace: Any, selection: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Statistics of the ``sel.*`` placeholders for the samples of a trace within a
+    selection, computed with NumPy over all its samples.
+
+    Returns:
+        Optional[Dict[str, Any]]: ``count``, ``x_min`` and ``x_max`` (dates as
+        `datetime`), and the ``mean``, ``min`` and ``max`` of y; None when the
+        selection is not on the axes of the trace.
+    """
+    selected = _select(trace, selection, *_refs(trace))
+    if selected is None:
+        return None
+    return _stats(selected, _has_dates(trace))
+
+
+def summarize_selection(
+    figure: Any,
+    selection: Dict[str, Any],
+    template: Union[str, CompiledTemplate] = SELECTION_TEMPLATE,
+    style: Union[Dict[Any, Any], TooltipStyle, None] = None,
+    apply_log_fix: bool = True,
+) -> Optional[Dict[str, Any]]:
+    """
+    Computes the summary annotation of a box or lasso selection.
+
+    The selected samples are found again from the geometry of the selection
+    over the full-resolution trace data, rather than read from the points of
+    ``selectedData``, which may be downsampled or huge. The template is rendered
+    for each trace with selected samples, one after the other, and the
+    annotation is placed at the centroid of the samples selected on the axes of
+    the first one.
+
+    Args:
+        figure: The figure, as a dictionary or a plotly figure.
+        selection (Dict[str, Any]): The ``range`` or ``lassoPoints`` of the
+            selection, and optionally the selected ``curves``.
+        template (Union[str, CompiledTemplate]): The template rendered for each
+            trace, with the `selection_stats` as ``sel``.
+        style (Union[Dict[Any, Any], TooltipStyle], optional): The annotation
+            style, merged over the default one.
+        apply_log_fix (bool): Whether to place the summary on log axes in log10.
+
+    Returns:
+        Optional[Dict[str, Any]]: The annotation, or None when no sample is
+        selected.
+    """
+    if hasattr(figure, "to_plotly_json"):
+        figure = figure.to_plotly_json()
+    data = figure.get("data") or []
+    layout = figure.get("layout") or {}
+    if isinstance(template, str):
+        template = compile_template(template)
+    if not isinstance(style, TooltipStyle):
+        style = TooltipStyle(style)
+    curves = selection.get("curves")
+    if curves is None:
+        curves = range(len(data))
+
+    lines = []
+    first: Optional[Tuple[int, Any, Tuple[str, str], bool]] = None
+    sums = np.zeros(2)
+    count = 0
+    for curve in curves:
+        if not 0 <= curve < len(data) or is_tooltip_trace(data[curve]):
+            continue
+        trace = data[curve]
+        refs = _refs(trace)
+        selected = _select(trace, selection, *refs)
+        if selected is None or not selected[0].size:
+            continue
+        dates = _has_dates(trace)
+        point = {
+            "curveNumber": curve,
+            "name": trace.get("name") or f"trace {curve}",
+            "sel": _stats(selected, dates),
+        }
+        if trace.get("meta") is not None:
+            point["meta"] = trace["meta"]
+        lines.append(template.render(point))
+        if first is None:
+            first = (curve, trace.get("name"), refs, dates)
+        if refs == first[2]:
+            sums += (selected[0].sum(), selected[1].sum())
+            count += selected[0].size
+    if first is None:
+        return None
+
+    curve, name, (xref, yref), dates = first
+    x, y = sums / count
+    log_axes = {
+        ref
+        for ref in (xref, yref)
+        if apply_log_fix and (layout.get(_axis_key(ref)) or {}).get("type") == "log"
+    }
+    center = _as_x(float(x), dates)
+    annotation = {
+        "x": _log_value(center) if xref in log_axes else center,
+        "y": _log_value(float(y)) if yref in log_axes else float(y),
+        "xref": xref,
+        "yref": yref,
+        "text": "<br>".join(lines),
+    }
+    if isinstance(center, datetime.datetime):
+        annotation["x"] = center.isoformat(sep=" ")
+    annotation.update(style.annotation_kwargs(curve, name))
+    annotation["name"] = SELECTION_NAME
+    return annotation
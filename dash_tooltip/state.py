@@ -0,0 +1,171 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from .anchors import AnchorRegistry
+from .edits import TooltipRecords
+from .history import HISTORY_SIZE, OperationHistory
+from .placement import AnnotationPlacer
+from .registry import ClickIndex
+from .style import TooltipStyle
+from .utils import CompiledTemplate, TraceSelector, TraceTemplates
+from .viewport import TooltipView
+
+SESSION_STORE_ID = "tooltip-session"
+
+MAX_SESSIONS = 100
+
+
+class SessionState:
+    """
+    Tooltips of a graph in one browser session: the index of their annotations,
+    their undo history, their anchors, their records, their view and their
+    placer, which follow the figure of that session only.
+    """
+
+    __slots__ = ("click_index", "history", "anchors", "records", "view", "placer")
+
+    def __init__(
+        self,
+        history_size: int = HISTORY_SIZE,
+        anchors: Optional[AnchorRegistry] = None,
+        records: Optional[TooltipRecords] = None,
+        view: Optional[TooltipView] = None,
+        placer: Optional[AnnotationPlacer] = None,
+    ):
+        self.click_index = ClickIndex()
+        self.history = OperationHistory(history_size)
+        self.anchors = anchors
+        self.records = records
+        self.view = view
+        self.placer = placer
+
+
+class GraphState:
+    """
+    Tooltip state of one graph.
+
+    A plain record with ``__slots__``: apps register hundreds of graphs per worker,
+    and the state must stay a few small objects per graph. The tooltips are kept
+    per browser session, as each session has its own figure, for the
+    ``max_sessions`` most recently used sessions.
+    """
+
+    __slots__ = (
+        "templates",
+        "style",
+        "avoid_overlap",
+        "anchor",
+        "sync_edits",
+        "history_size",
+        "cluster_grid",
+        "cull_margin",
+        "max_sessions",
+        "sessions",
+        "_lock",
+    )
+
+    def __init__(
+        self,
+        template: str,
+        style: TooltipStyle,
+        avoid_overlap: bool = False,
+        trace_templates: Optional[Dict[TraceSelector, str]] = None,
+        anchor: Optional[str] = None,
+        sync_edits: bool = False,
+        history_size: int = HISTORY_SIZE,
+        cluster_grid: Optional[int] = None,
+        cull_margin: Optional[float] = None,
+        max_sessions: int = MAX_SESSIONS,
+    ):
+        self.templates = TraceTemplates(template, trace_templates)
+        self.style = style
+        self.avoid_overlap = avoid_overlap
+        self.anchor = anchor
+        self.sync_edits = sync_edits
+        self.history_size = history_size
+        self.cluster_grid = cluster_grid
+        self.cull_margin = cull_margin
+        self.max_sessions = max_sessions
+        self.sessions: "OrderedDict[Optional[str], SessionState]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def template(self) -> str:
+        return self.templates.default
+
+    @property
+    def formatter(self) -> CompiledTemplate:
+        return self.templates.formatter
+
+    def set_template(
+        self, template: str, trace: Optional[TraceSelector] = None
+    ) -> None:
+        self.templates.set(template, trace)
+
+    @property
+    def follows_view(self) -> bool:
+        """Whether the tooltips are clustered or culled for the visible ranges."""
+        return bool(self.cluster_grid) or self.cull_margin is not None
+
+    def session(self, session_id: Optional[str] = None) -> SessionState:
+        """
+        Tooltips of the graph in a browser session, created on first use.
+
+        Beyond ``max_sessions``, the least recently used session is forgotten:
+        its tooltips stay in its figure, but their removal cannot be undone.
+        Calls without a session ID share the default session. The sessions are
+        looked up and evicted under a lock, as Dash serves callbacks from several
+        threads; they are held in this process only, and not shared between the
+        workers of a multi-process server.
+        """
+        sessions = self.sessions
+        with self._lock:
+            state = sessions.get(session_id)
+            if state is not None:
+                sessions.move_to_end(session_id)
+                return state
+            state = sessions[session_id] = SessionState(
+                self.history_size,
+                AnchorRegistry(self.anchor) if self.anchor else None,
+                TooltipRecords() if self.sync_edits else None,
+                (
+                    TooltipView(self.cluster_grid, self.cull_margin)
+                    if self.follows_view
+                    else None
+                ),
+                AnnotationPlacer() if self.avoid_overlap else None,
+            )
+            if len(sessions) > self.max_sessions:
+                sessions.popitem(last=False)
+            return state
+
+    @property
+    def click_index(self) -> ClickIndex:
+        """Index of the default session, see `session`."""
+        return self.session().click_index
+
+    @property
+    def history(self) -> OperationHistory:
+        """Undo history of the default session, see `session`."""
+        return self.session().history
+
+    @property
+    def anchors(self) -> Optional[AnchorRegistry]:
+        """Anchored tooltips of the default session, see `session`."""
+        return self.session().anchors
+
+    @property
+    def records(self) -> Optional[TooltipRecords]:
+        """Tooltip records of the default session, see `session`."""
+        return self.session().records
+
+    @property
+    def view(self) -> Optional[TooltipView]:
+        """Tooltip view of the default session, see `session`."""
+        return self.session().view
+
+    @property
+    def placer(self) -> Optional[AnnotationPlacer]:
+        """Tooltip placer of the default session, see `session`."""
+        return self.session().placer
@@ -0,0 +1,82 @@
+import copy
+from types import MappingProxyType
+from typing import Any, Dict, Hashable, Mapping, Optional, Tuple, Union
+
+from .config import DEFAULT_ANNOTATION_CONFIG
+
+TraceSelector = Union[int, str]
+
+
+def _freeze(value: Any) -> Any:
+    """Read-only copy of a style: mappings become proxies and lists tuples."""
+    if isinstance(value, Mapping):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _thaw(value: Any) -> Any:
+    """Mutable copy of a frozen style, as expected by plotly."""
+    if isinstance(value, Mapping):
+        return {key: _thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(item) for item in value]
+    return value
+
+
+def _merge(base: Mapping, override: Mapping) -> Dict[Any, Any]:
+    """Recursive merge of two styles into a new dictionary; inputs are not modified."""
+    merged = {key: copy.deepcopy(_thaw(value)) for key, value in base.items()}
+    for key, value in override.items():
+        if isinstance(value, Mapping) and isinstance(merged.get(key), dict):
+            merged[key] = _merge(merged[key], value)
+        else:
+            merged[key] = copy.deepcopy(_thaw(value))
+    return merged
+
+
+class TooltipStyle:
+    """
+    Annotation style of a graph, resolved once when tooltips are registered.
+
+    The style is merged over ``DEFAULT_ANNOTATION_CONFIG`` and frozen, so neither
+    the module defaults nor another graph's style can be changed through it.
+    ``trace_styles`` maps a trace index (``int``) or trace name (``str``) to
+    style overrides; a name rule is applied after an index rule. The style of a
+    trace is computed on its first click and then only looked up.
+    """
+
+    __slots__ = ("base", "trace_styles", "_cache")
+
+    def __init__(
+        self,
+        style: Optional[Mapping] = None,
+        trace_styles: Optional[Mapping[TraceSelector, Mapping]] = None,
+    ):
+        self.base: Mapping = _freeze(_merge(DEFAULT_ANNOTATION_CONFIG, style or {}))
+        self.trace_styles: Mapping = MappingProxyType(
+            {selector: _freeze(rule) for selector, rule in (trace_styles or {}).items()}
+        )
+        self._cache: Dict[Tuple[Hashable, Optional[str]], Mapping] = {}
+
+    def resolve(self, curve_number: Optional[int] = None, name: Any = None) -> Mapping:
+        """Frozen style of the trace ``curve_number`` named ``name``."""
+        key = (curve_number, name)
+        try:
+            return self._cache[key]
+        except KeyError:
+            pass
+        resolved = self.base
+        for selector in (curve_number, name):
+            rule = self.trace_styles.get(selector) if selector is not None else None
+            if rule is not None:
+                resolved = _freeze(_merge(resolved, rule))
+        self._cache[key] = resolved
+        return resolved
+
+    def annotation_kwargs(
+        self, curve_number: Optional[int] = None, name: Any = None
+    ) -> Dict[Any, Any]:
+        """Style of a trace as a fresh dictionary of annotation properties."""
+        return _thaw(self.resolve(curve_number, name))
@@ -1,43 +1,92 @@
+import functools
 import json
 import logging
 import math
 import re
-from typing import Any, Dict, List, Optional, Union
+import warnings
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 import dash
 import plotly.graph_objs as go
 from dash import dcc
 from dash.html import Div
 
-from .config import DEFAULT_ANNOTATION_CONFIG
+from .config import DEFAULT_TEMPLATE
 from .custom_figure import CustomFigure
+from .placement import AnnotationPlacer
+from .registry import _annotation_name, _point_key
+from .style import TooltipStyle
 
 logger = logging.getLogger("dash_tooltip")
 
 
-def add_annotation_store(layout: Div, graph_id: Optional[str] = None) -> str:
+REMOVE_STORE_ID = "tooltip-annotations-to-remove"
+
+
+def add_stores(layout: Div, stores: Dict[str, Any]) -> Dict[str, dcc.Store]:
     """
-    Adds a dcc.Store component to the layout to store annotations for tooltips.
+    Adds the tooltip stores missing from the layout, in one pass over its children.
+
+    The stores are shared by all the graphs, their data keyed by graph ID, so the
+    layout does not grow with the number of graphs. Stores already in the layout
+    without data get their initial data. Children that are not a list, e.g. a
+    tuple or a single component, are turned into one.
 
     Args:
         layout (dash.html.Div): The Dash app layout.
-        graph_id (str, optional): The ID of the graph component to which the store is linked.
+        stores (Dict[str, Any]): The initial data of the stores, by store ID.
 
     Returns:
-        str: The ID of the added dcc.Store component.
+        Dict[str, dcc.Store]: The stores, by ID, for their data to be set in O(1).
     """
-    store_id = "tooltip-annotations-to-remove"
-    if graph_id:
-        store_id += f"-{graph_id}"
-
-    if not any(
-        isinstance(child, dcc.Store) and child.id == store_id
-        for child in layout.children
-    ):
-        if isinstance(layout.children, list):
-            layout.children.append(dcc.Store(id=store_id))
+    children = layout.children
+    if children is None:
+        children = []
+    elif isinstance(children, tuple):
+        children = list(children)
+    elif not isinstance(children, list):
+        children = [children]
+    layout.children = children
+    found = {
+        child.id: child
+        for child in children
+        if isinstance(child, dcc.Store) and isinstance(child.id, str)
+    }
+    added = {}
+    for store_id, data in stores.items():
+        if store_id in found:
+            added[store_id] = found[store_id]
+            if getattr(added[store_id], "data", None) is None:
+                added[store_id].data = data
+        else:
+            added[store_id] = dcc.Store(id=store_id, data=data)
+            children.append(added[store_id])
+    return added
 
-    return store_id
+
+def add_annotation_store(layout: Div, graph_id: Optional[str] = None) -> str:
+    """
+    Adds the dcc.Store component receiving the tooltips deleted in the browser.
+
+    Args:
+        layout (dash.html.Div): The Dash app layout.
+        graph_id (str, optional): Deprecated: the store is shared by all the
+            graphs, and its data names the graph of the deleted tooltips. The
+            per-graph ``tooltip-annotations-to-remove-<graph_id>`` stores are no
+            longer used, so the ID of the shared store is returned.
+
+    Returns:
+        str: The ID of the dcc.Store component.
+    """
+    if graph_id is not None:
+        warnings.warn(
+            "The graph_id argument of add_annotation_store is deprecated: the "
+            f"store {REMOVE_STORE_ID!r} is shared by all the graphs.",
+            DeprecationWarning,
+            stacklevel=2,
+        )
+    add_stores(layout, {REMOVE_STORE_ID: None})
+    return REMOVE_STORE_ID
 
 
 def _find_all_graph_ids(layout: Div) -> List[str]:
@@ -57,23 +106,37 @@ def _find_all_graph_ids(layout: Div) -> List[str]:
     return graph_ids
 
 
-def extract_value_from_point(point: Dict[str, Any], key: str) -> Any:
-    """Extracts the value from the point dictionary using a dot notation key."""
+PathStep = Tuple[str, Optional[int]]
+
+_PLACEHOLDER_PATTERN = re.compile(r"%{(.*?)}")
+_INDEXED_PART_PATTERN = re.compile(r"(\w+)\[(\d+)\]")
+
+
+def _parse_path(key: str) -> List[PathStep]:
+    """Splits a dot notation key such as ``customdata[0]`` into lookup steps."""
+    path: List[PathStep] = []
+    for part in key.split("."):
+        match = _INDEXED_PART_PATTERN.match(part)
+        if match:
+            name, index = match.groups()
+            path.append((name, int(index)))
+        else:
+            path.append((part, None))
+    return path
+
+
+def _extract_path(point: Dict[str, Any], path: List[PathStep], key: str) -> Any:
     try:
-        parts = key.split(".")
         temp: Any = point
-        for part in parts:
-            match = re.match(r"(\w+)\[(\d+)\]", part)
-            if match:
-                name, index = match.groups()
-                index = int(index)
+        for name, index in path:
+            if index is not None:
                 if temp and isinstance(temp, dict) and name in temp:
                     temp = temp.get(name, [])[index]
                 else:
                     return None
             else:
                 if temp and isinstance(temp, dict):
-                    temp = temp.get(part)
+                    temp = temp.get(name)
                 else:
                     return None
         return temp
@@ -82,6 +145,130 @@ def extract_value_from_point(point: Dict[str, Any], key: str) -> Any:
         return None
 
 
+def extract_value_from_point(point: Dict[str, Any], key: str) -> Any:
+    """Extracts the value from the point dictionary using a dot notation key."""
+    return _extract_path(point, _parse_path(key), key)
+
+
+class CompiledTemplate:
+    """
+    A tooltip template parsed once: its placeholders, value paths and formats.
+
+    Rendering a point then only looks values up and formats them, instead of
+    searching the template with regular expressions on every click.
+    """
+
+    __slots__ = ("template", "placeholders")
+
+    def __init__(self, template: str):
+        self.template = template
+        self.placeholders = []
+        for placeholder in dict.fromkeys(_PLACEHOLDER_PATTERN.findall(template)):
+            parts = placeholder.split(":")
+            var_name = parts[0]
+            format_spec = parts[1] if len(parts) > 1 else None
+            self.placeholders.append(
+                (placeholder, var_name, _parse_path(var_name), format_spec)
+            )
+
+    def render(self, point: Dict[str, Any]) -> str:
+        """Fills the template with the values of a clicked point."""
+        text = self.template
+        for placeholder, var_name, path, format_spec in self.placeholders:
+            value = _extract_path(point, path, var_name)
+            if value is None:
+                continue
+            if format_spec:
+                try:
+                    # Applying the format specifier directly
+                    formatted = f"{value:{format_spec}}"
+                except ValueError as e:
+                    logger.error(
+                        f"Error formatting value {value}, with format {format_spec}. Error: {e}"
+                    )
+                    formatted = str(value)
+            else:
+                formatted = str(value)
+            text = text.replace(f"%{{{placeholder}}}", formatted)
+        return text
+
+
+@functools.lru_cache(maxsize=256)
+def compile_template(template: str) -> CompiledTemplate:
+    """Returns the compiled form of a template, parsing each template only once."""
+    return CompiledTemplate(template)
+
+
+TraceSelector = Union[int, str]
+
+
+def _meta_tag(meta: Any) -> Optional[str]:
+    """Tag of a trace ``meta``: the string itself, or its ``"tag"`` entry."""
+    if isinstance(meta, str):
+        return meta
+    if isinstance(meta, dict) and isinstance(meta.get("tag"), str):
+        return meta["tag"]
+    return None
+
+
+class TraceTemplates:
+    """
+    Tooltip templates of a graph: a default and rules for particular traces.
+
+    A rule is keyed by trace index (``int``), or by a trace name or ``meta`` tag
+    (``str``); the name wins over the meta tag, which wins over the index. The
+    compiled template of a trace is chosen on its first click and then looked
+    up by ``(curveNumber, name, tag)``. Updating a template only drops the
+    entries it can change.
+    """
+
+    __slots__ = ("default", "rules", "_compiled")
+
+    def __init__(self, default: str, rules: Optional[Dict[TraceSelector, str]] = None):
+        self.default = default
+        self.rules: Dict[TraceSelector, str] = dict(rules or {})
+        self._compiled: Dict[
+            Tuple[Any, Any, Optional[str]],
+            Tuple[Optional[TraceSelector], CompiledTemplate],
+        ] = {}
+
+    def _match(self, key: Tuple[Any, Any, Optional[str]]) -> Optional[TraceSelector]:
+        curve_number, name, tag = key
+        for selector in (name, tag, curve_number):
+            if selector is not None and selector in self.rules:
+                return selector
+        return None
+
+    def resolve(
+        self, curve_number: Optional[int] = None, name: Any = None, meta: Any = None
+    ) -> CompiledTemplate:
+        """Compiled template of the trace ``curve_number``."""
+        key = (curve_number, name, _meta_tag(meta))
+        entry = self._compiled.get(key)
+        if entry is None:
+            selector = self._match(key)
+            template = self.default if selector is None else self.rules[selector]
+            entry = (selector, compile_template(template))
+            self._compiled[key] = entry
+        return entry[1]
+
+    def set(self, template: str, trace: Optional[TraceSelector] = None) -> None:
+        """Sets the default template, or the template of ``trace``."""
+        if trace is None:
+            self.default = template
+            stale = [key for key, (used, _) in self._compiled.items() if used is None]
+        else:
+            self.rules[trace] = template
+            stale = [key for key in self._compiled if self._match(key) == trace]
+        for key in stale:
+            del self._compiled[key]
+
+    @property
+    def formatter(self) -> CompiledTemplate:
+        """Compiled default template."""
+        return compile_template(self.default)
+
+
 def truncate_json_arrays(json_str: str, limit: int) -> str:
     """
     Truncate arrays in a JSON string representation to a specified limit, both at top level and nested.
@@ -148,13 +335,144 @@ def get_axis_type(fig: go.Figure, axis: str) -> str:
     return fig.layout[axis_key].type
 
 
+def _tooltip_properties(
+    point: Dict[str, Any],
+    template: Union[CompiledTemplate, TraceTemplates],
+    style: TooltipStyle,
+) -> Tuple[str, Dict[Any, Any]]:
+    """Text and annotation properties of the tooltip of a point, with its name."""
+    if isinstance(template, TraceTemplates):
+        template = template.resolve(
+            point.get("curveNumber"), point.get("name"), point.get("meta")
+        )
+    properties = style.annotation_kwargs(point.get("curveNumber"), point.get("name"))
+    key = _point_key(point)
+    if key is not None:
+        properties.setdefault("name", _annotation_name(key))
+    return template.render(point), properties
+
+
+def _log_value(value: Any) -> Any:
+    """``value`` in log10, as Plotly places annotations on log axes."""
+    try:
+        return math.log10(value)
+    except (TypeError, ValueError):
+        return value
+
+
+def make_annotations(
+    click_data: Optional[Dict[str, Any]],
+    traces: Optional[List[Any]] = None,
+    template: Union[str, CompiledTemplate, TraceTemplates] = DEFAULT_TEMPLATE,
+    style: Union[Dict[Any, Any], TooltipStyle, None] = None,
+    log_axes: Tuple[str, ...] = (),
+) -> List[Dict[str, Any]]:
+    """
+    Computes the tooltip annotations of all the points of a click, without
+    building a figure.
+
+    Args:
+        click_data (Dict[str, Any]): The ``clickData`` of a graph.
+        traces (list, optional): The traces of the figure, e.g. ``figure["data"]``,
+            indexed by ``curveNumber``; their ``xaxis``, ``yaxis``, ``name`` and
+            ``meta`` are used.
+        template (Union[str, CompiledTemplate, TraceTemplates]): The template.
+        style (Union[Dict[Any, Any], TooltipStyle], optional): The annotation
+            style, merged over the default one. A `TooltipStyle` is resolved once
+            and reused across calls.
+        log_axes (tuple): References of the log axes, e.g. ("y", "x2"), on which
+            coordinates are converted to log10 as Plotly expects.
+
+    Returns:
+        List[Dict[str, Any]]: The annotations, ready to append to a figure layout.
+    """
+    points = (click_data or {}).get("points") or []
+    if isinstance(template, str):
+        template = compile_template(template)
+    if not isinstance(style, TooltipStyle):
+        style = TooltipStyle(style)
+    traces = traces or []
+    annotations = []
+    for point in points:
+        curve_number = point.get("curveNumber")
+        trace = (
+            traces[curve_number]
+            if curve_number is not None and curve_number < len(traces)
+            else {}
+        )
+        annotations.append(_make_annotation(point, trace, template, style, log_axes))
+    return annotations
+
+
+def make_annotation(
+    click_data: Optional[Dict[str, Any]],
+    trace_meta: Any = None,
+    template: Union[str, CompiledTemplate, TraceTemplates] = DEFAULT_TEMPLATE,
+    style: Union[Dict[Any, Any], TooltipStyle, None] = None,
+    log_axes: Tuple[str, ...] = (),
+) -> Optional[Dict[str, Any]]:
+    """
+    Computes the tooltip annotation of a click, without building a figure, e.g.
+    to append it with a `Patch` or from a clientside pipeline.
+
+    Args:
+        click_data (Dict[str, Any]): The ``clickData`` of a graph; its first point
+            is annotated.
+        trace_meta (optional): The clicked trace, or a dictionary of its
+            ``xaxis``, ``yaxis``, ``name`` and ``meta``.
+        template (Union[str, CompiledTemplate, TraceTemplates]): The template.
+        style (Union[Dict[Any, Any], TooltipStyle], optional): The annotation
+            style, see `make_annotations`.
+        log_axes (tuple): References of the log axes, see `make_annotations`.
+
+    Returns:
+        Optional[Dict[str, Any]]: The annotation, or None without a clicked point.
+    """
+    points = (click_data or {}).get("points")
+    if not points:
+        return None
+    if isinstance(template, str):
+        template = compile_template(template)
+    if not isinstance(style, TooltipStyle):
+        style = TooltipStyle(style)
+    return _make_annotation(points[0], trace_meta or {}, template, style, log_axes)
+
+
+def _make_annotation(
+    point: Dict[str, Any],
+    trace: Any,
+    template: Union[CompiledTemplate, TraceTemplates],
+    style: TooltipStyle,
+    log_axes: Tuple[str, ...],
+) -> Dict[str, Any]:
+    # Traces on the default axes may hold None rather than "x"/"y"
+    xref = (trace["xaxis"] if "xaxis" in trace else None) or "x"
+    yref = (trace["yaxis"] if "yaxis" in trace else None) or "y"
+    extra = {key: trace[key] for key in ("meta", "name") if key in trace}
+    if extra:
+        # The click data of the caller is left untouched
+        point = dict(point, **extra)
+    text, properties = _tooltip_properties(point, template, style)
+    x, y = point.get("x"), point.get("y")
+    annotation = {
+        "x": _log_value(x) if xref in log_axes else x,
+        "y": _log_value(y) if yref in log_axes else y,
+        "xref": xref,
+        "yref": yref,
+        "text": text,
+    }
+    annotation.update(properties)
+    return annotation
+
+
 def _display_click_data(
     clickData: Dict[str, Any],
     figure: Union[CustomFigure, Dict[str, Any]],  # Allow both go.Figure and dictionary
-    template: str,
-    config: Dict[Any, Any],
+    template: Union[str, CompiledTemplate, TraceTemplates],
+    config: Union[Dict[Any, Any], TooltipStyle],
     apply_log_fix: bool = True,
     debug: bool = False,
+    placer: Optional[AnnotationPlacer] = None,
 ) -> CustomFigure:
     """
     Displays the tooltip on the graph when a data point is clicked.
@@ -162,10 +480,14 @@ def _display_click_data(
     Args:
         clickData (Dict[str, Any]): The data from the click event.
         figure (Union[CustomFigure, Dict[str, Any]]): The figure to update.
-        template (str): The template for the tooltip.
-        config (Dict[Any, Any]): The configuration for the tooltip.
+        template (Union[str, CompiledTemplate, TraceTemplates]): The template for
+            the tooltip, or the templates of the graph chosen per trace.
+        config (Union[Dict[Any, Any], TooltipStyle]): The configuration for the
+            tooltip, or its style already resolved per trace.
         apply_log_fix (bool, optional): Whether to apply the log axis fix. Defaults to True.
         debug (bool, optional): Whether to enable debugging. Defaults to False.
+        placer (AnnotationPlacer, optional): Chooses the tooltip offset so that it
+            avoids the existing annotations. Defaults to None (style offset).
 
     Returns:
         CustomFigure: The updated figure.
@@ -197,9 +519,19 @@ def _display_click_data(
             "The figure provided must be of type 'CustomFigure' or a dictionary."
         )
 
-    fig.update_template(template)
+    if isinstance(template, TraceTemplates):
+        templates: Optional[TraceTemplates] = template
+        compiled = template.formatter
+    else:
+        templates = None
+        compiled = (
+            template
+            if isinstance(template, CompiledTemplate)
+            else compile_template(template)
+        )
+    fig.update_template(compiled.template)
 
-    merged_config = deep_merge_dicts(DEFAULT_ANNOTATION_CONFIG.copy(), config)
+    style = config if isinstance(config, TooltipStyle) else TooltipStyle(config)
 
     if not dash.callback_context:
         raise dash.exceptions.PreventUpdate
@@ -211,13 +543,14 @@ def _display_click_data(
 
         try:
             # Extract the clicked axis information from the curve data
+            # Traces on the default axes may hold None rather than "x"/"y"
             if "xaxis" in fig["data"][point["curveNumber"]]:
-                xaxis = fig["data"][point["curveNumber"]]["xaxis"]
+                xaxis = fig["data"][point["curveNumber"]]["xaxis"] or "x"
             else:
                 xaxis = "x"
 
             if "yaxis" in fig["data"][point["curveNumber"]]:
-                yaxis = fig["data"][point["curveNumber"]]["yaxis"]
+                yaxis = fig["data"][point["curveNumber"]]["yaxis"] or "y"
             else:
                 yaxis = "y"
 
@@ -257,31 +590,16 @@ def _display_click_data(
                 ),
             )
 
-        placeholders = re.findall(r"%{(.*?)}", fig.layout._tooltip_template)
-
-        template_data = {}
-        for placeholder in placeholders:
-            parts = placeholder.split(":")
-            var_name = parts[0]
-            format_spec = parts[1] if len(parts) > 1 else None
-
-            value = extract_value_from_point(point, var_name)
-            if value is not None:
-                if format_spec:
-                    try:
-                        # Applying the format specifier directly
-                        template_data[placeholder] = f"{value:{format_spec}}"
-                    except ValueError as e:
-                        logger.error(
-                            f"Error formatting value {value}, with format {format_spec}. Error: {e}"
-                        )
-                        template_data[placeholder] = str(value)
-                else:
-                    template_data[placeholder] = str(value)
+        tooltip_template, merged_config = _tooltip_properties(
+            point, templates or compiled, style
+        )
 
-        tooltip_template = fig.layout._tooltip_template
-        for placeholder, value in template_data.items():
-            tooltip_template = tooltip_template.replace(f"%{{{placeholder}}}", value)
+        if placer is not None:
+            offset = placer.place(
+                fig, x_val, y_val, xaxis, yaxis, tooltip_template, merged_config
+            )
+            if offset is not None:
+                merged_config["ax"], merged_config["ay"] = offset
 
         try:
             fig.add_annotation(
@@ -297,4 +615,6 @@ def _display_click_data(
                 f"Failed to add annotation due to invalid properties in {merged_config}. Error: {e}"
             )
             raise e
+        if placer is not None:
+            placer.added(fig.layout.annotations[-1].to_plotly_json())
     return fig
@@ -0,0 +1,282 @@
+import bisect
+import re
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from .links import _x_numbers
+from .overlay import TOOLTIP_UID_PREFIX
+from .placement import _axis_key
+
+CLUSTER_UID_PREFIX = TOOLTIP_UID_PREFIX + "clusters"
+
+_RANGE_KEY_PATTERN = re.compile(r"^([xy]axis\d*)\.(range\[([01])\]|range|autorange)$")
+
+Axes = Tuple[str, str]
+Range = Tuple[float, float]
+
+# Tooltips indexed per view, beyond which the oldest ones are forgotten
+VIEW_SIZE = 10000
+
+
+def _number(value: Any) -> Optional[float]:
+    """A coordinate as a float, dates in nanoseconds; None when not comparable."""
+    numbers = _x_numbers([value])
+    if numbers is None or numbers[0] != numbers[0]:  # NaN
+        return None
+    return float(numbers[0])
+
+
+class RangeIndex:
+    """
+    Tooltips of one pair of axes sorted by x, so that the ones within an x range
+    are found by bisection; added and removed tooltips are inserted in place.
+    """
+
+    __slots__ = ("xs", "names")
+
+    def __init__(self) -> None:
+        self.xs: List[float] = []
+        self.names: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def add(self, name: str, x: float) -> None:
+        position = bisect.bisect_right(self.xs, x)
+        self.xs.insert(position, x)
+        self.names.insert(position, name)
+
+    def remove(self, name: str, x: float) -> None:
+        position = bisect.bisect_left(self.xs, x)
+        while position < len(self.xs) and self.xs[position] == x:
+            if self.names[position] == name:
+                del self.xs[position]
+                del self.names[position]
+                return
+            position += 1
+
+    def query(self, low: float, high: float) -> List[str]:
+        """Names of the tooltips with ``low <= x <= high``."""
+        start = bisect.bisect_left(self.xs, low)
+        return self.names[start : bisect.bisect_right(self.xs, high)]
+
+
+class TooltipView:
+    """
+    Tooltips of a graph in one browser session indexed by position, to follow
+    zooming and panning.
+
+    Tooltips within the same cell of a ``grid`` x ``grid`` division of the visible
+    axis ranges are replaced by a cluster badge showing their count; zooming in
+    splits the cells and shows them again. With a ``margin``, the figure only
+    holds the tooltips within the visible ranges widened by that fraction of
+    their span on each side, and the others are kept here until they come into
+    view. Each update only visits the tooltips within the visible ranges.
+
+    At most ``size`` tooltips are indexed: beyond it, the least recently added
+    or moved one is forgotten, and is no longer clustered, or culled if it was
+    out of the figure.
+    """
+
+    __slots__ = (
+        "grid",
+        "margin",
+        "size",
+        "points",
+        "indices",
+        "ranges",
+        "hidden",
+        "shown",
+    )
+
+    def __init__(
+        self,
+        grid: Optional[int] = None,
+        margin: Optional[float] = None,
+        size: int = VIEW_SIZE,
+    ):
+        self.grid = grid
+        self.margin = margin
+        self.size = size
+        self.points: Dict[str, Tuple[Axes, float, float, Dict[str, Any]]] = {}
+        self.indices: Dict[Axes, RangeIndex] = {}
+        self.ranges: Dict[str, Range] = {}
+        self.hidden: Set[str] = set()
+        # Tooltips in the figure, when the others are culled
+        self.shown: Set[str] = set()
+
+    def add(self, name: str, annotation: Dict[str, Any]) -> None:
+        """Indexes a tooltip of the figure, or re-indexes it after it moved."""
+        self.remove(name)
+        self.shown.add(name)
+        x, y = _number(annotation.get("x")), _number(annotation.get("y"))
+        if x is None or y is None:
+            return  # e.g. categories: always shown
+        axes = (annotation.get("xref") or "x", annotation.get("yref") or "y")
+        self.points[name] = (axes, x, y, annotation)
+        self.indices.setdefault(axes, RangeIndex()).add(name, x)
+        if len(self.points) > self.size:
+            self.remove(next(iter(self.points)))
+
+    def remove(self, name: str) -> None:
+        point = self.points.pop(name, None)
+        if point is not None:
+            self.indices[point[0]].remove(name, point[1])
+        self.hidden.discard(name)
+        self.shown.discard(name)
+
+    def culled(self) -> List[str]:
+        """Names of the tooltips kept out of the figure."""
+        return [name for name in self.points if name not in self.shown]
+
+    def relayout(self, relayout_data: Optional[Dict[str, Any]]) -> bool:
+        """
+        Follows the axis ranges of a ``relayoutData`` event.
+
+        Returns:
+            bool: Whether a range changed.
+        """
+        changed = False
+        bounds: Dict[str, Dict[int, Any]] = {}
+        for key, value in (relayout_data or {}).items():
+            match = _RANGE_KEY_PATTERN.match(key)
+            if not match:
+                continue
+            axis, kind, side = match.groups()
+            if kind == "autorange":
+                changed |= self.ranges.pop(axis, None) is not None
+            elif kind == "range" and isinstance(value, (list, tuple)):
+                bounds.setdefault(axis, {}).update(enumerate(value[:2]))
+            else:
+                bounds.setdefault(axis, {})[int(side)] = value
+        for axis, values in bounds.items():
+            low, high = _number(values.get(0)), _number(values.get(1))
+            if low is None or high is None:
+                continue
+            new_range = (min(low, high), max(low, high))
+            changed |= self.ranges.get(axis) != new_range
+            self.ranges[axis] = new_range
+        return changed
+
+    def _range(self, ref: str) -> Optional[Range]:
+        axis_range = self.ranges.get(_axis_key(ref))
+        if axis_range is None or not self.margin:
+            return axis_range
+        low, high = axis_range
+        extra = (high - low) * self.margin
+        return low - extra, high + extra
+
+    def visible(self, axes: Axes) -> List[str]:
+        """Names of the tooltips of ``axes`` within the visible ranges and margin."""
+        index = self.indices.get(axes)
+        if index is None:
+            return []
+        x_range = self._range(axes[0])
+        names = index.query(*x_range) if x_range else index.names
+        y_range = self._range(axes[1])
+        if y_range is None:
+            return list(names)
+        low, high = y_range
+        return [name for name in names if low <= self.points[name][2] <= high]
+
+    def _extent(self, names: List[str], axis: str, item: int) -> Range:
+        known = self.ranges.get(axis)
+        if known is not None:
+            return known
+        values = [self.points[name][item] for name in names]
+        return min(values), max(values)
+
+    def _clusters(self, axes: Axes, names: List[str]) -> List[List[str]]:
+        """Groups of at least two visible tooltips sharing a grid cell."""
+        if self.grid is None or len(names) < 2:
+            return []
+        x_low, x_high = self._extent(names, _axis_key(axes[0]), 1)
+        y_low, y_high = self._extent(names, _axis_key(axes[1]), 2)
+        x_cell = (x_high - x_low) / self.grid or 1.0
+        y_cell = (y_high - y_low) / self.grid or 1.0
+        cells: Dict[Tuple[int, int], List[str]] = {}
+        for name in names:
+            _, x, y, _ = self.points[name]
+            cell = (int((x - x_low) // x_cell), int((y - y_low) // y_cell))
+            cells.setdefault(cell, []).append(name)
+        return [members for members in cells.values() if len(members) > 1]
+
+    def update(self) -> Dict[str, Any]:
+        """
+        Changes to apply to the figure for the current ranges.
+
+        Returns:
+            Dict[str, Any]: The names of the tooltips to ``hide`` and to ``show``,
+            the cluster badge ``traces``, one per pair of axes, and when culling,
+            the names of the tooltips to ``remove`` from the figure and the
+            annotations to ``add`` to it.
+        """
+        hidden: Set[str] = set()
+        traces = []
+        in_view: List[str] = []
+        for axes in self.indices:
+            names = self.visible(axes)
+            in_view += names
+            clusters = self._clusters(axes, names)
+            if not clusters:
+                continue
+            badges: Dict[str, List[Any]] = {"x": [], "y": [], "text": [], "hover": []}
+            for members in clusters:
+                hidden.update(members)
+                annotation = self.points[members[0]][3]
+                badges["x"].append(annotation.get("x"))
+                badges["y"].append(annotation.get("y"))
+                badges["text"].append(str(len(members)))
+                badges["hover"].append(f"{len(members)} tooltips")
+            traces.append(_badge_trace(axes, badges))
+        remove: List[str] = []
+        add: List[str] = []
+        if self.margin is not None:
+            kept = set(in_view)
+            remove = sorted(name for name in self.shown - kept if name in self.points)
+            add = [name for name in in_view if name not in self.shown]
+            self.shown.difference_update(remove)
+            self.shown.update(add)
+        added = set(add)
+        changes = {
+            "hide": sorted(name for name in hidden - self.hidden if name not in added),
+            "show": sorted(
+                name
+                for name in self.hidden - hidden
+                if name in self.shown and name not in added
+            ),
+            "traces": traces,
+            "remove": remove,
+            "add": [
+                dict(self.points[name][3], visible=False)
+                if name in hidden
+                else self.points[name][3]
+                for name in add
+            ],
+        }
+        self.hidden = hidden
+        return changes
+
+
+def _badge_trace(axes: Axes, badges: Dict[str, List[Any]]) -> Dict[str, Any]:
+    return {
+        "type": "scatter",
+        "uid": f"{CLUSTER_UID_PREFIX}-{axes[0]}-{axes[1]}",
+        "name": "tooltip clusters",
+        "x": badges["x"],
+        "y": badges["y"],
+        "xaxis": axes[0],
+        "yaxis": axes[1],
+        "text": badges["text"],
+        "hovertext": badges["hover"],
+        "hoverinfo": "text",
+        "mode": "markers+text",
+        "textposition": "middle center",
+        "textfont": {"color": "white", "size": 11},
+        "marker": {"color": "rgba(40, 40, 40, 0.8)", "size": 22},
+        "showlegend": False,
+    }
+
+
+def view_ids() -> Dict[str, str]:
+    """IDs of the stores of the axis ranges of the graphs and of the view updates."""
+    return {"ranges": "tooltip-ranges", "view": "tooltip-view"}
@@ -0,0 +1,130 @@
+import math
+from typing import Any, Dict, Hashable, Optional
+
+import numpy as np
+
+from .crosshair import _explicit_x
+from .indexing import IndexCache, SparseTable, _as_array, _length, data_key
+from .links import SortedX
+
+WINDOW_STATS = ("mean", "min", "max", "std", "count")
+
+
+def _span(dx: Any) -> float:
+    """``dx`` in the numeric units of x: time deltas are counted in nanoseconds."""
+    if hasattr(dx, "total_seconds"):
+        return dx.total_seconds() * 1e9
+    if isinstance(dx, np.timedelta64):
+        return float(dx.astype("timedelta64[ns]").astype(np.int64))
+    return float(dx)
+
+
+class WindowStats:
+    """
+    Statistics of the y values of a trace over any window of samples.
+
+    Prefix sums of the values, of their squares and of the non-NaN counts give
+    the mean, standard deviation and count of a window, and a `SparseTable` its
+    minimum and maximum, so each query costs O(1) whatever the window size.
+    Samples are taken in x order, so that windows of ±Δx are contiguous; samples
+    whose x is NaN are not plotted, and left out.
+    """
+
+    __slots__ = ("x", "rank", "table", "_offset", "_sums", "_squares", "_counts")
+
+    def __init__(self, trace: Any):
+        y = _as_array(trace["y"], dtype=float).ravel()
+        x = _explicit_x(trace, y.size)
+        self.x = SortedX(x if _length(x) == y.size else None)
+        self.rank: Optional[np.ndarray] = None
+        if len(self.x) and not np.array_equal(self.x.order, np.arange(y.size)):
+            # Samples whose x is NaN keep a rank of -1
+            self.rank = np.full(y.size, -1)
+            self.rank[self.x.order] = np.arange(len(self.x))
+            y = y[self.x.order]
+        self.table = SparseTable(y)
+        valid = ~np.isnan(y)
+        # Values are centred for the variance to keep its precision
+        self._offset = float(y[valid].mean()) if valid.any() else 0.0
+        centred = np.where(valid, y - self._offset, 0.0)
+        self._sums = np.concatenate([[0.0], np.cumsum(centred)])
+        self._squares = np.concatenate([[0.0], np.cumsum(centred * centred)])
+        self._counts = np.concatenate([[0], np.cumsum(valid)])
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+    def query(
+        self, point_number: int, points: Optional[int] = None, dx: Any = None
+    ) -> Dict[str, Any]:
+        """
+        Statistics of the samples within ``points`` samples or ``dx`` of x around a
+        sample.
+
+        Returns:
+            Dict[str, Any]: ``mean``, ``min``, ``max``, ``std`` (population) and
+            ``count`` of the non-NaN values; None values for an empty window.
+        """
+        n = len(self)
+        position = point_number if self.rank is None else int(self.rank[point_number])
+        if position < 0:
+            return dict(dict.fromkeys(WINDOW_STATS), count=0)
+        if dx is not None and len(self.x):
+            center = self.x.values[position]
+            span = _span(dx)
+            start = int(np.searchsorted(self.x.values, center - span, "left"))
+            stop = int(np.searchsorted(self.x.values, center + span, "right"))
+        else:
+            half = points or 0
+            start, stop = max(0, position - half), min(n, position + half + 1)
+        count = int(self._counts[stop] - self._counts[start])
+        if not count:
+            return dict(dict.fromkeys(WINDOW_STATS), count=0)
+        total = (self._sums[stop] - self._sums[start]) / count
+        variance = (self._squares[stop] - self._squares[start]) / count - total**2
+        return {
+            "mean": float(self._offset + total),
+            "min": float(self.table.values[self.table.argmin(start, stop)]),
+            "max": float(self.table.values[self.table.argmax(start, stop)]),
+            "std": math.sqrt(max(variance, 0.0)),
+            "count": count,
+        }
+
+
+def window_stats(
+    trace: Any,
+    point_number: int,
+    points: Optional[int] = None,
+    dx: Any = None,
+    cache: Optional[IndexCache] = None,
+    revision: Hashable = None,
+) -> Dict[str, Any]:
+    """
+    Statistics of the ``win.*`` placeholders for a clicked sample.
+
+    Args:
+        trace: The clicked trace.
+        point_number (int): The index of the clicked sample.
+        points (int, optional): Half-width of the window, in samples.
+        dx (optional): Half-width of the window, in x units; a time delta on date
+            axes. Takes precedence over ``points``.
+        cache (IndexCache, optional): Cache of the per-trace indices, keyed on
+            ``revision`` and on the length and ends of x and y (see `data_key`).
+        revision (Hashable, optional): The data revision of the figure, see
+            `data_revision`.
+
+    Returns:
+        Dict[str, Any]: The statistics, see `WindowStats.query`.
+    """
+    if cache is None:
+        stats = WindowStats(trace)
+    else:
+        x = trace["x"] if "x" in trace else None
+        key = ("window", revision, data_key(x), data_key(trace["y"]))
+        if x is None:
+            key += (
+                trace["x0"] if "x0" in trace else None,
+                trace["dx"] if "dx" in trace else None,
+            )
+        stats = cache.get_or_build(key, lambda: WindowStats(trace))
+    return stats.query(point_number, points, dx)
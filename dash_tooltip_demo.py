@@ -149,7 +149,7 @@ app2.layout = dbc.Container(
 )
 
 # Add the dcc.Store for annotations (optional for other uses)
-dcc_store_id = add_annotation_store(app2.layout, graphid_2)
+dcc_store_id = add_annotation_store(app2.layout)
 print("dcc_store_id:", dcc_store_id)
 
 # Add the tooltip functionality to the app
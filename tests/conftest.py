@@ -0,0 +1,71 @@
+"""
+Fixtures shared by the tests: copies of the scatter figure most click tests
+use, the click data of a sample, and tooltip managers of apps whose graphs show
+a figure.
+"""
+
+import copy
+from typing import Any, Callable, Dict, List, Union
+
+import pytest
+from dash import Dash, dcc, html
+
+from dash_tooltip import TooltipManager, tooltip, tooltip_controls
+
+FIGURE = {
+    "data": [{"type": "scatter", "mode": "markers", "x": [1, 2, 3], "y": [4, 5, 6]}],
+    "layout": {},
+}
+
+
+def click_data(
+    point_number: int, figure: Dict[str, Any] = FIGURE, curve_number: int = 0
+) -> Dict[str, Any]:
+    """The ``clickData`` of a sample of ``figure``, as sent by plotly.js."""
+    trace = figure["data"][curve_number]
+    point = {
+        "curveNumber": curve_number,
+        "pointNumber": point_number,
+        "x": trace["x"][point_number],
+        "y": trace["y"][point_number],
+    }
+    return {"points": [point]}
+
+
+@pytest.fixture
+def new_figure() -> Callable[[], Dict[str, Any]]:
+    """Returns a new copy of `FIGURE` per call: handling a click pops its trace types."""
+    return lambda: copy.deepcopy(FIGURE)
+
+
+@pytest.fixture
+def click() -> Callable[..., Dict[str, Any]]:
+    """Returns `click_data`."""
+    return click_data
+
+
+@pytest.fixture
+def make_manager() -> Callable[..., TooltipManager]:
+    """
+    Returns a function building an app of graphs showing ``figure``, with
+    `tooltip_controls` when ``controls`` is True, and calling `tooltip` on it.
+    """
+
+    def make(
+        graph_ids: Union[str, List[str]],
+        figure: Dict[str, Any] = FIGURE,
+        controls: bool = False,
+        **kwargs: Any,
+    ) -> TooltipManager:
+        if isinstance(graph_ids, str):
+            graph_ids = [graph_ids]
+        app = Dash(__name__)
+        children = []
+        for graph_id in graph_ids:
+            children.append(dcc.Graph(id=graph_id, figure=figure))
+            if controls:
+                children.append(tooltip_controls(graph_id))
+        app.layout = html.Div(children)
+        return tooltip(app, graph_ids=graph_ids, **kwargs)
+
+    return make
@@ -0,0 +1,142 @@
+"""
+Test 17: Peak Snapping and Automatic Extremum Annotation
+========================================================
+
+Description:
+------------
+This test suite covers the peak helpers used for Matlab-style datatips:
+
+1. **Sparse Table Test:**
+    Checks that range max/min queries answered by `SparseTable` match a plain
+    slice scan for windows that fit in one block, span two blocks or cover many.
+
+2. **Peak Detection Test:**
+    Ensures `find_peaks` finds local maxima and minima, treats plateaus as a
+    single peak, and keeps the top-K peaks separated by `distance`.
+
+3. **Snapping Test:**
+    Verifies that a click is moved to the local extremum of its trace with
+    `snap_click_data`, including x, y and customdata of the new sample. The
+    range index is cached per data revision; without one, only the window is
+    read, so a change to any single value is followed. Points of 2-D traces are
+    left as clicked.
+
+5. **Typed Array Slice Test:**
+    Checks that `_array_slice` decodes any slice of a plotly typed array like
+    the whole array.
+
+4. **Auto Annotation Test:**
+    Checks that `annotate_peaks` adds one tooltip per requested peak.
+"""
+
+import base64
+
+import numpy as np
+import pytest
+
+from dash_tooltip import annotate_peaks, find_peaks
+from dash_tooltip.indexing import IndexCache, SparseTable, _array_slice
+from dash_tooltip.peaks import snap_click_data
+
+
+def test_sparse_table_matches_slice_scan() -> None:
+    rng = np.random.default_rng(0)
+    values = rng.normal(size=1000)
+    values[[10, 500]] = np.nan
+    table = SparseTable(values, block_size=16)
+    for start, stop in [(0, 5), (3, 20), (15, 17), (0, 1000), (123, 877), (990, 1000)]:
+        window = values[start:stop]
+        assert table.argmax(start, stop) == start + np.nanargmax(window)
+        assert table.argmin(start, stop) == start + np.nanargmin(window)
+    with pytest.raises(ValueError):
+        table.argmax(5, 5)
+
+
+def test_find_peaks() -> None:
+    values = [0, 3, 1, 5, 5, 2, 4, 4, 6, 0]
+    assert find_peaks(values).tolist() == [1, 3, 8]
+    assert find_peaks(values, kind="min").tolist() == [2, 5]
+    assert find_peaks(values, k=2).tolist() == [8, 3]
+    assert find_peaks(values, k=2, distance=6).tolist() == [8, 1]
+
+
+def test_snap_click_data_moves_point_to_extremum() -> None:
+    y = [0, 1, 2, 9, 2, 1, -5, -7, 0]
+    figure = {
+        "data": [
+            {
+                "type": "scatter",
+                "x": [10 * i for i in range(len(y))],
+                "y": y,
+                "customdata": [f"c{i}" for i in range(len(y))],
+            }
+        ]
+    }
+    click_data = {
+        "points": [
+            {"curveNumber": 0, "pointNumber": 1, "x": 10, "y": 1, "customdata": "c1"}
+        ]
+    }
+    cache = IndexCache()
+
+    snapped = snap_click_data(click_data, figure, "max", 3, cache, ("g", 1, 0))
+    point = snapped["points"][0]
+    assert (point["pointNumber"], point["x"], point["y"]) == (3, 30, 9)
+    assert point["customdata"] == "c3"
+    assert click_data["points"][0]["pointNumber"] == 1, "Input must not be mutated."
+
+    snapped = snap_click_data(
+        {"points": [{"curveNumber": 0, "pointNumber": 6, "x": 60, "y": -5}]},
+        figure,
+        "auto",
+        window=2,
+        cache=cache,
+        revision=("g", 1, 0),
+    )
+    assert snapped["points"][0]["pointNumber"] == 7
+    assert len(cache) == 1, "The range index should be built once per trace."
+
+
+def test_snap_follows_data_revisions() -> None:
+    y = [0.0] * 1000
+    figure = {"data": [{"type": "scatter", "y": y}]}
+    click_data = {"points": [{"curveNumber": 0, "pointNumber": 500, "y": 0.0}]}
+    cache = IndexCache()
+    snapped = snap_click_data(click_data, figure, "max", 10, cache)
+    assert snapped["points"][0]["pointNumber"] == 490, "Ties keep the leftmost."
+    assert len(cache) == 0, "Without a revision, only the window is read."
+
+    y[501] = 50.0
+    snapped = snap_click_data(click_data, figure, "max", 10, cache)
+    assert snapped["points"][0]["pointNumber"] == 501
+
+    snap_click_data(click_data, figure, "max", 10, cache, ("g", 1, 1))
+    y[502] = 60.0
+    snapped = snap_click_data(click_data, figure, "max", 10, cache, ("g", 1, 1))
+    assert snapped["points"][0]["pointNumber"] == 501, "Cached for the revision."
+    snapped = snap_click_data(click_data, figure, "max", 10, cache, ("g", 1, 2))
+    assert snapped["points"][0]["pointNumber"] == 502
+    assert len(cache) == 2
+
+
+def test_snap_leaves_2d_points() -> None:
+    figure = {"data": [{"type": "heatmap", "y": [0, 1], "z": [[1, 2], [3, 4]]}]}
+    click_data = {"points": [{"curveNumber": 0, "pointNumber": [1, 0]}]}
+    assert snap_click_data(click_data, figure, "max", 1) is click_data
+
+
+def test_typed_array_slice() -> None:
+    for dtype in ("f8", "f4", "i2", "u1"):
+        values = (np.arange(101) * 7 % 23).astype(dtype)
+        typed = {"dtype": dtype, "bdata": base64.b64encode(values.tobytes()).decode()}
+        for start, stop in [(0, 1), (1, 4), (37, 62), (99, 101), (95, 200)]:
+            assert _array_slice(typed, start, stop).tolist() == (
+                values[start:stop].tolist()
+            )
+
+
+def test_annotate_peaks() -> None:
+    x = np.linspace(0, 4 * np.pi, 400)
+    figure = {"data": [{"type": "scatter", "x": x.tolist(), "y": np.sin(x).tolist()}]}
+    fig = annotate_peaks(figure, k=2, template="%{y:.1f}")
+    assert [a.text for a in fig.layout.annotations] == ["1.0", "1.0"]
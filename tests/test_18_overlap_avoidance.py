@@ -0,0 +1,119 @@
+"""
+Test 18: Annotation Collision Avoidance
+=======================================
+
+Description:
+------------
+This test suite covers the optional placement engine that picks the `ax`/`ay`
+offset of new tooltips so that they do not cover existing ones.
+
+1. **Grid Index Test:**
+    Checks insertion, overlap counting and removal in `GridIndex`.
+
+2. **Placement Test:**
+    Clicks the same point several times with a placer and verifies that every
+    tooltip gets a distinct offset and that the estimated boxes do not overlap.
+
+3. **Sync Test:**
+    Ensures the placer follows annotations deleted from the figure, so a freed
+    spot is reused by the next tooltip.
+
+4. **Incremental Test:**
+    Checks that tooltips added and removed by the manager update the index of
+    the session without reading the figure again, and that each browser
+    session is placed against its own tooltips.
+"""
+
+import plotly.graph_objs as go
+
+from dash_tooltip import CustomFigure, _display_click_data
+from dash_tooltip.config import DEFAULT_ANNOTATION_CONFIG
+from dash_tooltip.placement import AnnotationPlacer, GridIndex
+
+TEMPLATE = "x: %{x},<br>y: %{y}"
+CLICK_DATA = {"points": [{"x": 2, "y": 3, "curveNumber": 0}]}
+
+
+def _figure() -> CustomFigure:
+    return CustomFigure(
+        data=[go.Scatter(x=[1, 2, 3], y=[1, 3, 2])],
+        layout={"width": 700, "height": 450},
+    )
+
+
+def test_grid_index() -> None:
+    index = GridIndex(cell_size=10)
+    index.insert("a", (0, 0, 25, 5))
+    index.insert("b", (100, 100, 110, 110))
+    assert index.count_overlaps((20, 0, 30, 10)) == 1
+    assert index.count_overlaps((50, 50, 60, 60)) == 0
+    index.remove("a")
+    assert index.count_overlaps((20, 0, 30, 10)) == 0
+    assert len(index) == 1
+
+
+def test_tooltips_do_not_overlap() -> None:
+    placer = AnnotationPlacer()
+    fig = _figure()
+    for _ in range(4):
+        fig = _display_click_data(
+            CLICK_DATA, fig, TEMPLATE, DEFAULT_ANNOTATION_CONFIG, placer=placer
+        )
+
+    offsets = [(a.ax, a.ay) for a in fig.layout.annotations]
+    assert offsets[0] == (-10, -30), "The first tooltip keeps the default offset."
+    assert len(set(offsets)) == 4, "Every tooltip should get its own offset."
+
+    # The four tooltips were added to the index as they were placed
+    placer.place(fig, 2, 3, "x", "y", "x: 2,<br>y: 3", DEFAULT_ANNOTATION_CONFIG)
+    assert len(placer.index) == 4
+    boxes = list(placer.index._boxes.values())
+    for i, box in enumerate(boxes):
+        assert all(placer.index.count_overlaps(box) == 1 for box in boxes[i:])
+
+
+def test_placer_follows_deleted_annotations() -> None:
+    placer = AnnotationPlacer()
+    fig = _figure()
+    for _ in range(2):
+        fig = _display_click_data(
+            CLICK_DATA, fig, TEMPLATE, DEFAULT_ANNOTATION_CONFIG, placer=placer
+        )
+    second_offset = (fig.layout.annotations[1].ax, fig.layout.annotations[1].ay)
+
+    fig.layout.annotations = fig.layout.annotations[1:]
+    fig = _display_click_data(
+        CLICK_DATA, fig, TEMPLATE, DEFAULT_ANNOTATION_CONFIG, placer=placer
+    )
+    assert (fig.layout.annotations[1].ax, fig.layout.annotations[1].ay) == (-10, -30)
+    assert (fig.layout.annotations[0].ax, fig.layout.annotations[0].ay) == second_offset
+
+
+def test_incremental_session_placers(
+    make_manager, click, new_figure, monkeypatch
+) -> None:
+    manager = make_manager("graph18", avoid_overlap=True, repeat_click="toggle")
+    syncs = []
+    sync = AnnotationPlacer.sync
+
+    def counted_sync(self, annotations):
+        syncs.append(len(annotations))
+        sync(self, annotations)
+
+    monkeypatch.setattr(AnnotationPlacer, "sync", counted_sync)
+
+    fig_a = new_figure()
+    for i in (0, 1, 2):
+        fig_a = manager.handle_click("graph18", click(i), fig_a, session="a")
+        fig_a = fig_a.to_plotly_json()
+    assert syncs == [0], "Only the first placement reads the figure."
+    placer_a = manager.graphs["graph18"].session("a").placer
+    assert len(placer_a.index) == 3
+
+    fig_a = manager.handle_click("graph18", click(1), fig_a, session="a")
+    assert len(placer_a.index) == 2, "Toggling a tooltip off removes its box."
+
+    fig_b = manager.handle_click("graph18", click(0), new_figure(), session="b")
+    placer_b = manager.graphs["graph18"].session("b").placer
+    assert placer_b is not placer_a and len(placer_b.index) == 1
+    assert fig_b.to_plotly_json()["layout"]["annotations"][0]["ax"] == -10
@@ -0,0 +1,70 @@
+"""
+Test 19: Idempotent Click Handling
+==================================
+
+Description:
+------------
+Tooltips are keyed by `(curveNumber, pointNumber)` and `TooltipManager` keeps a
+hash index of them per graph. This test suite checks that:
+
+1. **Ignore Test:**
+    A second click on the same point does not add a second annotation.
+
+2. **Toggle Test:**
+    With `repeat_click="toggle"`, a second click removes the tooltip with a
+    `Patch` rather than re-sending the figure.
+
+3. **Stale Index Test:**
+    The index recovers when the figure no longer holds the tooltip, e.g. after
+    the figure was regenerated by another callback.
+"""
+
+from typing import Any, Dict
+
+import dash
+import pytest
+from dash import Patch
+
+
+def _as_dict(fig: Any) -> Dict[str, Any]:
+    return fig.to_plotly_json()
+
+
+def test_repeated_click_is_ignored(make_manager, click, new_figure) -> None:
+    manager = make_manager("graph19a")
+
+    fig = _as_dict(manager.handle_click("graph19a", click(1), new_figure()))
+    assert fig["layout"]["annotations"][0]["name"] == "dash-tooltip-0-1"
+
+    with pytest.raises(dash.exceptions.PreventUpdate):
+        manager.handle_click("graph19a", click(1), fig)
+
+    fig = _as_dict(manager.handle_click("graph19a", click(2), fig))
+    assert len(fig["layout"]["annotations"]) == 2
+
+
+def test_repeated_click_toggles_tooltip(make_manager, click, new_figure) -> None:
+    manager = make_manager("graph19b", repeat_click="toggle")
+    fig = _as_dict(manager.handle_click("graph19b", click(0), new_figure()))
+    fig = _as_dict(manager.handle_click("graph19b", click(2), fig))
+
+    patch = manager.handle_click("graph19b", click(0), fig)
+    assert isinstance(patch, Patch)
+    assert patch.to_plotly_json()["operations"] == [
+        {"operation": "Delete", "location": ["layout", "annotations", 0], "params": {}}
+    ]
+    del fig["layout"]["annotations"][0]
+
+    patch = manager.handle_click("graph19b", click(2), fig)
+    assert patch.to_plotly_json()["operations"][0]["location"][-1] == 0
+
+
+def test_index_recovers_from_regenerated_figure(
+    make_manager, click, new_figure
+) -> None:
+    manager = make_manager("graph19c")
+    manager.handle_click("graph19c", click(1), new_figure())
+
+    # The figure was replaced by another callback: the click must add a tooltip
+    fig = _as_dict(manager.handle_click("graph19c", click(1), new_figure()))
+    assert len(fig["layout"]["annotations"]) == 1
@@ -0,0 +1,59 @@
+"""
+Test 20: Compact Per-Graph State
+================================
+
+Description:
+------------
+`TooltipManager` keeps one small `GraphState` record per graph instead of a
+plotly figure. This test suite checks that:
+
+1. **Record Test:**
+    Graph states use `__slots__` and hold the template, its compiled formatter
+    and the style.
+
+2. **Template Update Test:**
+    `update_template` only changes the graph it targets, and the next click on
+    that graph uses the new template while the other graphs keep theirs.
+
+3. **Compiled Template Test:**
+    `compile_template` parses a template once and renders nested, indexed and
+    formatted placeholders like the original click handler.
+"""
+
+from dash_tooltip.state import GraphState
+from dash_tooltip.utils import compile_template
+
+GRAPH_IDS = ["graph20a", "graph20b"]
+
+
+def test_graph_state_is_compact(make_manager) -> None:
+    manager = make_manager(GRAPH_IDS, template="x: %{x}")
+    assert not hasattr(manager, "figures")
+    state = manager.graphs["graph20a"]
+    assert isinstance(state, GraphState)
+    assert not hasattr(state, "__dict__")
+    assert state.formatter is compile_template("x: %{x}")
+
+
+def test_update_template_targets_one_graph(make_manager, click, new_figure) -> None:
+    manager = make_manager(GRAPH_IDS, template="x: %{x}")
+    manager.update_template("graph20b", "y: %{y}")
+    assert manager.templates == {"graph20a": "x: %{x}", "graph20b": "y: %{y}"}
+
+    fig_a = manager.handle_click("graph20a", click(1), new_figure())
+    fig_b = manager.handle_click("graph20b", click(1), new_figure())
+    assert fig_a.layout.annotations[0].text == "x: 2"
+    assert fig_b.layout.annotations[0].text == "y: 5"
+
+
+def test_compiled_template_rendering() -> None:
+    template = "%{name}: %{customdata[1]} %{meta.unit} %{y:.2f} %{missing} %{y:.2f}"
+    compiled = compile_template(template)
+    assert compile_template(template) is compiled
+    point = {
+        "name": "Sensor",
+        "customdata": ["a", "b"],
+        "meta": {"unit": "V"},
+        "y": 1.2345,
+    }
+    assert compiled.render(point) == "Sensor: b V 1.23 %{missing} 1.23"
@@ -0,0 +1,94 @@
+"""
+Test 21: Precomputed Style Resolution
+=====================================
+
+Description:
+------------
+Tooltip styles are merged over the defaults once, when tooltips are registered,
+into frozen `TooltipStyle` objects. This test suite checks that:
+
+1. **Isolation Test:**
+    Merging a custom font leaves `DEFAULT_ANNOTATION_CONFIG` and the user's style
+    untouched, and the resolved style cannot be modified.
+
+2. **Trace Rule Test:**
+    Per-trace rules are matched by trace index and by trace name, and the style
+    of a trace is resolved once and then looked up.
+
+3. **Manager Test:**
+    Clicks on different traces of a graph get their own style, and
+    `update_style` only changes the graph it targets.
+"""
+
+import copy
+
+import pytest
+from dash import Dash, dcc, html
+
+from dash_tooltip import tooltip
+from dash_tooltip.config import DEFAULT_ANNOTATION_CONFIG
+from dash_tooltip.style import TooltipStyle
+
+FIGURE = {
+    "data": [
+        {"type": "scatter", "x": [1, 2, 3], "y": [4, 5, 6], "name": "a"},
+        {"type": "scatter", "x": [1, 2, 3], "y": [6, 5, 4], "name": "b"},
+    ],
+    "layout": {},
+}
+GRAPH_IDS = ["graph21a", "graph21b"]
+
+
+def test_style_does_not_leak() -> None:
+    defaults = copy.deepcopy(DEFAULT_ANNOTATION_CONFIG)
+    user_style = {"font": {"color": "red"}}
+    style = TooltipStyle(user_style)
+
+    assert style.base["font"]["color"] == "red"
+    assert style.base["font"]["family"] == "Arial"
+    assert DEFAULT_ANNOTATION_CONFIG == defaults
+    assert user_style == {"font": {"color": "red"}}
+
+    with pytest.raises(TypeError):
+        style.base["font"]["color"] = "blue"  # type: ignore[index]
+
+    kwargs = style.annotation_kwargs()
+    kwargs["font"]["color"] = "blue"
+    assert style.base["font"]["color"] == "red"
+
+
+def test_trace_rules() -> None:
+    style = TooltipStyle(
+        {"arrowcolor": "black"},
+        trace_styles={1: {"arrowcolor": "blue"}, "b": {"font": {"size": 20}}},
+    )
+    assert style.resolve(0, "a") is style.base
+    resolved = style.resolve(1, "b")
+    assert resolved["arrowcolor"] == "blue"
+    assert resolved["font"]["size"] == 20
+    assert resolved["font"]["family"] == "Arial"
+    assert style.resolve(1, "b") is resolved, "Resolution should be cached."
+    assert style.resolve(3, "b")["arrowcolor"] == "black"
+
+
+def test_manager_styles() -> None:
+    app = Dash(__name__)
+    app.layout = html.Div([dcc.Graph(id=graph_id) for graph_id in GRAPH_IDS])
+    manager = tooltip(
+        app,
+        style={"arrowcolor": "green"},
+        graph_ids=GRAPH_IDS,
+        trace_styles={"b": {"arrowcolor": "blue"}},
+    )
+
+    def click(graph_id, curve_number):
+        point = {"curveNumber": curve_number, "pointNumber": 1, "x": 2, "y": 5}
+        fig = manager.handle_click(graph_id, {"points": [point]}, copy.deepcopy(FIGURE))
+        return fig.layout.annotations[0].arrowcolor
+
+    assert click("graph21a", 0) == "green"
+    assert click("graph21a", 1) == "blue"
+
+    manager.update_style("graph21b", {"arrowcolor": "red"})
+    assert click("graph21b", 1) == "red"
+    assert click("graph21a", 1) == "blue"
@@ -0,0 +1,87 @@
+"""
+Test 22: Per-Trace Templates
+============================
+
+Description:
+------------
+A graph can give its traces different tooltip templates, selected by trace
+index, trace name or `meta` tag. This test suite checks that:
+
+1. **Selection Test:**
+    Each trace gets the template of the most specific matching rule (name, then
+    meta tag, then index) and the other traces use the default template.
+
+2. **Invalidation Test:**
+    Updating a template only drops the compiled entries it affects.
+
+3. **Manager Test:**
+    Clicks on the traces of a graph render their own template, including after
+    `update_template` targets one trace.
+"""
+
+import copy
+
+from dash import Dash, dcc, html
+
+from dash_tooltip import tooltip
+from dash_tooltip.utils import TraceTemplates, compile_template
+
+FIGURE = {
+    "data": [
+        {"type": "scatter", "x": [1, 2], "y": [3, 4], "name": "Sensor"},
+        {"type": "scatter", "x": [1, 2], "y": [5, 6], "meta": {"tag": "event"}},
+    ],
+    "layout": {},
+}
+
+
+def test_template_selection() -> None:
+    templates = TraceTemplates(
+        "x: %{x}", {"Sensor": "s: %{y}", "event": "e: %{y}", 1: "one: %{y}"}
+    )
+    assert templates.resolve(0, "Sensor") is compile_template("s: %{y}")
+    assert templates.resolve(1, None, {"tag": "event"}).template == "e: %{y}"
+    assert templates.resolve(1, "other").template == "one: %{y}"
+    assert templates.resolve(2, "other", "event").template == "e: %{y}"
+    assert templates.resolve(2, "other").template == "x: %{x}"
+
+
+def test_selective_invalidation() -> None:
+    templates = TraceTemplates("x: %{x}", {"Sensor": "s: %{y}"})
+    templates.resolve(0, "Sensor")
+    templates.resolve(1, "other")
+    templates.resolve(2, "Other")
+
+    templates.set("x = %{x}")
+    assert set(templates._compiled) == {(0, "Sensor", None)}
+    assert templates.resolve(1, "other").template == "x = %{x}"
+
+    templates.set("one: %{y}", trace=1)
+    assert set(templates._compiled) == {(0, "Sensor", None)}
+    assert templates.resolve(1, "other").template == "one: %{y}"
+
+
+def test_manager_trace_templates() -> None:
+    app = Dash(__name__)
+    app.layout = html.Div([dcc.Graph(id="graph22")])
+    manager = tooltip(
+        app,
+        graph_ids=["graph22"],
+        template="x: %{x}",
+        trace_templates={"Sensor": "%{name}: %{y} V", "event": "code %{y}"},
+    )
+
+    def click(curve_number):
+        point = {"curveNumber": curve_number, "pointNumber": 0, "x": 1, "y": 3}
+        fig = manager.handle_click(
+            "graph22", {"points": [point]}, copy.deepcopy(FIGURE)
+        )
+        return fig.layout.annotations[0].text
+
+    assert click(0) == "Sensor: 3 V"
+    assert click(1) == "code 3"
+
+    manager.update_template("graph22", "event %{y}", trace="event")
+    assert click(1) == "event 3"
+    assert click(0) == "Sensor: 3 V"
+    assert manager.templates == {"graph22": "x: %{x}"}
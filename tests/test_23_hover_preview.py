@@ -0,0 +1,101 @@
+"""
+Test 23: Hover Preview
+======================
+
+Description:
+------------
+With `hover_preview=True`, the tooltip of the hovered point is rendered in the
+browser from the graph templates. This test suite checks that:
+
+1. **Clientside Test:**
+    The preview adds a `dcc.Tooltip` and the templates store to the layout and is
+    handled by a clientside callback only: hovering sends no server request.
+
+2. **Enrichment Test:**
+    With `hover_enrich`, hovered points reach the server through a clientside
+    throttle set to `hover_throttle`, and the enrichment result is keyed by the
+    hovered point.
+
+3. **Template Store Test:**
+    The templates store mirrors the graph templates, keyed by graph, including after
+    `update_template`.
+"""
+
+from dash import Dash, dcc, html
+
+from dash_tooltip import tooltip
+from dash_tooltip.clientside import CONFIG_STORE_ID
+from dash_tooltip.hover import preview_ids
+
+
+def _app(graph_id: str) -> Dash:
+    app = Dash(__name__)
+    app.layout = html.Div([dcc.Graph(id=graph_id)])
+    return app
+
+
+def _server_outputs(app: Dash):
+    # Outputs shared by graphs are suffixed with a hash
+    return {
+        key.split("@")[0]
+        for key, value in app.callback_map.items()
+        if "callback" in value
+    }
+
+
+def test_preview_is_clientside() -> None:
+    app = _app("graph23a")
+    tooltip(app, graph_ids=["graph23a"], hover_preview=True)
+    ids = preview_ids("graph23a")
+
+    assert isinstance(app.layout[ids["tooltip"]], dcc.Tooltip)
+    assert app.layout["graph23a"].clear_on_unhover is True
+    preview = [key for key in app.callback_map if ids["tooltip"] in key]
+    assert len(preview) == 1
+    assert preview[0] not in _server_outputs(app)
+    assert f"{ids['enriched']}.data" not in _server_outputs(app)
+
+
+def test_enrichment_is_throttled() -> None:
+    app = _app("graph23b")
+    manager = tooltip(
+        app,
+        graph_ids=["graph23b"],
+        hover_enrich=lambda graph_id, point: f"{graph_id}: {point['y'] * 2}",
+        hover_throttle=200,
+    )
+    ids = preview_ids("graph23b")
+
+    assert manager.hover_preview
+    assert f"{ids['enriched']}.data" in _server_outputs(app)
+    config = app.layout[CONFIG_STORE_ID].data
+    assert config["graphs"]["graph23b"]["throttle"] == 200
+
+    point = {"curveNumber": 0, "pointNumber": 3, "x": 1, "y": 2}
+    assert manager.handle_hover("graph23b", point) == {
+        "graph": "graph23b",
+        "curveNumber": 0,
+        "pointNumber": 3,
+        "text": "graph23b: 4",
+    }
+    assert manager.handle_hover("graph23b", None) is None
+
+
+def test_template_store() -> None:
+    app = _app("graph23c")
+    manager = tooltip(
+        app,
+        graph_ids=["graph23c"],
+        template="x: %{x}",
+        trace_templates={1: "one", "Sensor": "s"},
+        hover_preview=True,
+    )
+    store = app.layout[preview_ids("graph23c")["templates"]]
+    assert store.data["graph23c"] == {
+        "default": "x: %{x}",
+        "names": {"Sensor": "s"},
+        "indices": {"1": "one"},
+    }
+
+    manager.update_template("graph23c", "y: %{y}")
+    assert store.data["graph23c"]["default"] == "y: %{y}"
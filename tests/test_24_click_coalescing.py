@@ -0,0 +1,76 @@
+"""
+Test 24: Click Coalescing
+=========================
+
+Description:
+------------
+With `coalesce_clicks=True`, clicks made while a request is in flight are queued
+in the browser and sent together. This test suite checks that:
+
+1. **Registration Test:**
+    `clickData` only feeds a clientside callback, and the figure is updated by
+    a server callback on the batch store that also acknowledges the batch.
+
+2. **Batch Test:**
+    The points of a batch are applied in order to a single figure, and the
+    batch sequence number is returned as the acknowledgement.
+
+3. **Repeated Click Test:**
+    Repeated points inside a batch follow `repeat_click`, and a batch that does
+    not change the figure is still acknowledged.
+"""
+
+from typing import Any, Dict, List
+
+from dash import no_update
+
+from dash_tooltip.clicks import coalesce_ids
+
+
+def _batch(seq: int, point_numbers: List[int]) -> Dict[str, Any]:
+    points = [
+        {"curveNumber": 0, "pointNumber": i, "x": i + 1, "y": i + 4}
+        for i in point_numbers
+    ]
+    return {"seq": seq, "points": points}
+
+
+def test_coalesced_callbacks(make_manager) -> None:
+    app = make_manager("graph24a", coalesce_clicks=True).app
+    ids = coalesce_ids()
+
+    batch_callbacks = [
+        key
+        for key, value in app.callback_map.items()
+        if {"id": "graph24a", "property": "clickData"} in value["inputs"]
+    ]
+    assert [key.split("@")[0] for key in batch_callbacks] == [f"{ids['batch']}.data"]
+    assert "callback" not in app.callback_map[batch_callbacks[0]]
+
+    figure_callbacks = [
+        value
+        for value in app.callback_map.values()
+        if value["inputs"] == [{"id": ids["batch"], "property": "data"}]
+    ]
+    assert len(figure_callbacks) == 1 and "callback" in figure_callbacks[0]
+
+
+def test_batch_is_applied_in_order(make_manager, new_figure) -> None:
+    manager = make_manager("graph24b", coalesce_clicks=True)
+    fig, ack = manager.handle_clicks("graph24b", _batch(1, [2, 0, 1]), new_figure())
+    assert ack == 1
+    assert [a.text for a in fig.layout.annotations] == [
+        "x: 3,<br>y: 6",
+        "x: 1,<br>y: 4",
+        "x: 2,<br>y: 5",
+    ]
+
+
+def test_repeated_points_in_batch(make_manager, new_figure) -> None:
+    manager = make_manager("graph24c", coalesce_clicks=True, repeat_click="toggle")
+    fig, _ = manager.handle_clicks("graph24c", _batch(1, [0, 1, 0]), new_figure())
+    assert [a.name for a in fig.layout.annotations] == ["dash-tooltip-0-1"]
+
+    ignoring = make_manager("graph24d", coalesce_clicks=True)
+    fig, _ = ignoring.handle_clicks("graph24d", _batch(1, [0]), new_figure())
+    assert ignoring.handle_clicks("graph24d", _batch(2, [0, 0]), fig) == (no_update, 2)
@@ -0,0 +1,121 @@
+"""
+Test 25: Overlay Rendering
+==========================
+
+Description:
+------------
+With `overlay_threshold`, only the most recent tooltips are kept as annotations
+and older ones are drawn by a single scatter trace. This test suite checks that:
+
+1. **Threshold Test:**
+    The number of tooltip annotations never exceeds the threshold, and the older
+    tooltips end up in one overlay trace with their text.
+
+2. **Promotion Test:**
+    Clicking an overlay point restores its annotation unchanged, and moves the
+    oldest annotation to the overlay instead.
+
+3. **Log Axis Test:**
+    Overlay points are placed at data coordinates, while annotations on log
+    axes hold the log10 of their position.
+
+4. **Undo Test:**
+    Undoing a click removes its tooltip and promotes the tooltip it demoted
+    back, so every tooltip, demoted or not, is removed by undoing its click;
+    redoing the click demotes it again.
+"""
+
+from typing import Any, Dict
+
+from dash_tooltip.overlay import is_overlay_trace
+
+X = [1, 10, 100, 1000, 10000]
+FIGURE = {
+    "data": [{"type": "scatter", "mode": "markers", "x": X, "y": [5, 6, 7, 8, 9]}],
+    "layout": {},
+}
+
+
+def _click_all(manager, graph_id: str, layout: Dict[str, Any], click) -> Dict[str, Any]:
+    fig = {"data": [dict(FIGURE["data"][0])], "layout": layout}
+    for i in range(len(X)):
+        fig = manager.handle_click(graph_id, click(i, fig), fig).to_plotly_json()
+    return fig
+
+
+def test_overlay_threshold(make_manager, click) -> None:
+    manager = make_manager("graph25a", FIGURE, overlay_threshold=2)
+    fig = _click_all(manager, "graph25a", {}, click)
+
+    annotations = fig["layout"]["annotations"]
+    assert [a["name"] for a in annotations] == ["dash-tooltip-0-3", "dash-tooltip-0-4"]
+    overlays = [trace for trace in fig["data"] if is_overlay_trace(trace)]
+    assert len(overlays) == 1
+    assert list(overlays[0]["x"]) == [1, 10, 100]
+    assert list(overlays[0]["text"]) == [
+        "x: 1,<br>y: 5",
+        "x: 10,<br>y: 6",
+        "x: 100,<br>y: 7",
+    ]
+
+
+def test_overlay_promotion(make_manager, click) -> None:
+    manager = make_manager("graph25b", FIGURE, overlay_threshold=2)
+    fig = _click_all(manager, "graph25b", {}, click)
+    demoted = fig["data"][1]["customdata"][1]
+
+    fig = manager.handle_click("graph25b", click(1, fig, 1), fig).to_plotly_json()
+    names = [a["name"] for a in fig["layout"]["annotations"]]
+    assert names == ["dash-tooltip-0-4", "dash-tooltip-0-1"]
+    assert fig["layout"]["annotations"][-1] == demoted
+    customdata = fig["data"][1]["customdata"]
+    assert [item["name"] for item in customdata] == [
+        "dash-tooltip-0-0",
+        "dash-tooltip-0-2",
+        "dash-tooltip-0-3",
+    ]
+
+    # Clicking the sample itself also brings its tooltip back
+    fig = manager.handle_click("graph25b", click(0, fig), fig).to_plotly_json()
+    assert fig["layout"]["annotations"][-1]["name"] == "dash-tooltip-0-0"
+    assert len(fig["data"][1]["x"]) == 3
+
+
+def test_overlay_on_log_axis(make_manager, click) -> None:
+    manager = make_manager("graph25c", FIGURE, overlay_threshold=2)
+    fig = _click_all(manager, "graph25c", {"xaxis": {"type": "log"}}, click)
+    assert fig["layout"]["annotations"][-1]["x"] == 4
+    assert list(fig["data"][1]["x"]) == [1, 10, 100]
+
+
+def _names(fig: Dict[str, Any]):
+    overlay = [item["name"] for item in fig["data"][1].get("customdata") or []]
+    return [a["name"] for a in fig["layout"].get("annotations", [])], overlay
+
+
+def test_overlay_undo(make_manager, click) -> None:
+    manager = make_manager("graph25d", FIGURE, overlay_threshold=2)
+    fig = {"data": [dict(FIGURE["data"][0])], "layout": {}}
+    for i in range(3):
+        fig = manager.handle_click("graph25d", click(i, fig), fig).to_plotly_json()
+    assert _names(fig) == (
+        ["dash-tooltip-0-1", "dash-tooltip-0-2"],
+        ["dash-tooltip-0-0"],
+    )
+
+    fig = manager.undo("graph25d", fig).to_plotly_json()
+    assert _names(fig) == (["dash-tooltip-0-0", "dash-tooltip-0-1"], [])
+    fig = manager.redo("graph25d", fig).to_plotly_json()
+    assert _names(fig) == (
+        ["dash-tooltip-0-1", "dash-tooltip-0-2"],
+        ["dash-tooltip-0-0"],
+    )
+
+    for expected in (
+        ["dash-tooltip-0-0", "dash-tooltip-0-1"],
+        ["dash-tooltip-0-0"],
+        [],
+    ):
+        fig = manager.undo("graph25d", fig).to_plotly_json()
+        assert _names(fig) == (expected, [])
+    assert not manager.graphs["graph25d"].click_index.slots
@@ -0,0 +1,92 @@
+"""
+Test 26: Data-Identity Anchoring
+================================
+
+Description:
+------------
+With `anchor`, tooltips are anchored to `(trace key, sample key)` pairs rather
+than to clicked coordinates. This test suite checks that:
+
+1. **Sample Index Test:**
+    `SampleIndex` follows appended samples and rolling windows incrementally,
+    and rebuilds itself when a trace changed in another way.
+
+2. **Streaming Test:**
+    `extend_data` removes the tooltips whose samples left a rolling window, with
+    a `Patch` deleting only those annotations.
+
+3. **Regeneration Test:**
+    `reanchor` moves the tooltips of a regenerated figure to the new position
+    and value of their sample, and drops the ones whose sample is gone. A later
+    click on the same sample is still recognised.
+"""
+
+import copy
+
+import dash
+import pytest
+
+from dash_tooltip.anchors import SampleIndex
+
+FIGURE = {
+    "data": [
+        {"type": "scatter", "uid": "s", "x": [0, 1, 2, 3, 4], "y": [10, 11, 12, 13, 14]}
+    ],
+    "layout": {},
+}
+
+
+def _with_tooltips(manager, graph_id: str, point_numbers, click):
+    fig = copy.deepcopy(FIGURE)
+    for point_number in point_numbers:
+        fig = manager.handle_click(graph_id, click(point_number, fig), fig)
+        fig = fig.to_plotly_json()
+    return fig
+
+
+def test_sample_index() -> None:
+    index = SampleIndex(["a", "b", "c"])
+    assert index.extend(["d", "e"], max_points=3) == ["a", "b"]
+    assert [index.position(k) for k in "bcde"] == [None, 0, 1, 2]
+
+    assert index.sync(["d", "e", "f"]) == ["c"]
+    assert index._base == 3, "A shifted trace is followed without a rebuild."
+    assert index.position("f") == 2
+
+    assert sorted(index.sync(["x", "d"])) == ["e", "f"]
+    assert (index.position("x"), index.position("d")) == (0, 1)
+
+
+def test_extend_data_prunes_tooltips(make_manager, click) -> None:
+    manager = make_manager("graph26a", FIGURE, anchor="x")
+    fig = _with_tooltips(manager, "graph26a", [1, 3], click)
+    names = [a["name"] for a in fig["layout"]["annotations"]]
+    assert names == ["dash-tooltip-s-1", "dash-tooltip-s-3"]
+
+    patch = manager.extend_data("graph26a", [{"x": [[5, 6]], "y": [[15, 16]]}, [0], 5])
+    assert patch.to_plotly_json()["operations"] == [
+        {"operation": "Delete", "location": ["layout", "annotations", 0], "params": {}}
+    ]
+    assert list(manager.graphs["graph26a"].anchors.tooltips) == ["dash-tooltip-s-3"]
+
+
+def test_reanchor_regenerated_figure(make_manager, click) -> None:
+    manager = make_manager("graph26b", FIGURE, anchor="x")
+    _with_tooltips(manager, "graph26b", [1, 3], click)
+
+    regenerated = {
+        "data": [
+            {"type": "scatter", "uid": "s", "x": [2, 3, 4, 5], "y": [22, 23, 24, 25]}
+        ],
+        "layout": {},
+    }
+    fig = manager.reanchor("graph26b", regenerated).to_plotly_json()
+    (annotation,) = fig["layout"]["annotations"]
+    assert (annotation["name"], annotation["x"], annotation["y"]) == (
+        "dash-tooltip-s-3",
+        3,
+        23,
+    )
+
+    with pytest.raises(dash.exceptions.PreventUpdate):
+        manager.handle_click("graph26b", click(1, fig), fig)
@@ -0,0 +1,100 @@
+"""
+Test 27: Stable Tooltip IDs
+===========================
+
+Description:
+------------
+Every tooltip annotation carries a stable id in its `name`, and removals and
+edits address tooltips by id rather than by list position. This test suite
+checks that:
+
+1. **Index Test:**
+    `ClickIndex` keeps the positions of the remaining tooltips right after
+    removals, without rebuilding itself.
+
+2. **Removal Test:**
+    `remove_tooltips` deletes the right annotations after another callback
+    reordered them, and still removes the other annotations, named or not,
+    by name or position.
+
+3. **Id Test:**
+    Tooltips added with `repeat_click="add"` get distinct ids, and
+    `update_tooltip` edits a tooltip found by id.
+"""
+
+import pytest
+
+from dash_tooltip.registry import ClickIndex
+
+
+def _operations(patch):
+    return [
+        (op["operation"], op["location"]) for op in patch.to_plotly_json()["operations"]
+    ]
+
+
+def test_index_removals() -> None:
+    index = ClickIndex()
+    names = [f"dash-tooltip-0-{i}" for i in range(6)]
+    for i, name in enumerate(names):
+        index.added(name, i, i + 1)
+    index.removed(names[1])
+    index.removed(names[3])
+    slots = index.slots
+
+    assert [index.position(name) for name in names] == [0, None, 1, None, 2, 3]
+    annotations = [{"name": name} for name in names if name not in names[1:4:2]]
+    assert index.find(names[4], annotations) == 2
+    assert index.slots is slots, "Lookups after removals need no rebuild."
+
+
+def test_remove_reordered_tooltips(make_manager, click, new_figure) -> None:
+    manager = make_manager("graph27a")
+    fig = new_figure()
+    for i in range(3):
+        fig = manager.handle_click("graph27a", click(i), fig).to_plotly_json()
+
+    # Another callback reversed the annotations and added one without a name
+    fig["layout"]["annotations"] = fig["layout"]["annotations"][::-1] + [
+        {"text": "note"}
+    ]
+    patch = manager.remove_tooltips("graph27a", ["dash-tooltip-0-2", 3], fig)
+    assert _operations(patch) == [
+        ("Delete", ["layout", "annotations", 3]),
+        ("Delete", ["layout", "annotations", 0]),
+    ]
+
+
+def test_remove_named_annotations(make_manager, click, new_figure) -> None:
+    manager = make_manager("graph27c")
+    fig = manager.handle_click("graph27c", click(0), new_figure())
+    fig = fig.to_plotly_json()
+    # The user's own annotations, whose text was cleared
+    fig["layout"]["annotations"] += [{"name": "note", "text": ""}, {"text": ""}]
+    patch = manager.remove_tooltips("graph27c", ["note"], fig)
+    assert _operations(patch) == [("Delete", ["layout", "annotations", 1])]
+    patch = manager.remove_tooltips("graph27c", [2], fig)
+    assert _operations(patch) == [("Delete", ["layout", "annotations", 2])]
+    patch = manager.remove_tooltips("graph27c", ["dash-tooltip-0-0"], fig)
+    assert _operations(patch) == [("Delete", ["layout", "annotations", 0])]
+
+
+def test_unique_ids_and_edits(make_manager, click, new_figure) -> None:
+    manager = make_manager("graph27b", repeat_click="add")
+    fig = new_figure()
+    for _ in range(2):
+        fig = manager.handle_click("graph27b", click(1), fig).to_plotly_json()
+    names = [a["name"] for a in fig["layout"]["annotations"]]
+    assert len(set(names)) == 2
+    assert all(name.startswith("dash-tooltip-0-1#") for name in names)
+
+    patch = manager.update_tooltip("graph27b", names[1], fig, text="edited")
+    assert patch.to_plotly_json()["operations"] == [
+        {
+            "operation": "Assign",
+            "location": ["layout", "annotations", 1, "text"],
+            "params": {"value": "edited"},
+        }
+    ]
+    with pytest.raises(ValueError):
+        manager.update_tooltip("graph27b", "dash-tooltip-9-9", fig, text="x")
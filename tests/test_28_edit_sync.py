@@ -0,0 +1,91 @@
+"""
+Test 28: Tooltip Edit Sync
+==========================
+
+Description:
+------------
+With `sync_edits=True`, tooltips dragged or rewritten in the browser are sent to
+the server as small deltas by tooltip id, and the server-side records are put
+back on the figure when the page is reloaded. This test suite checks that:
+
+1. **Record Test:**
+    Added tooltips are recorded, and removed ones, by toggle or by id, are
+    forgotten.
+
+2. **Edit Test:**
+    `apply_edits` changes only the editable properties of known tooltips.
+
+3. **Layout Test:**
+    The records are not served with the layout, which all sessions share: each
+    session is sent its own records once its id is known, and the edit
+    callbacks are registered without sending the figure to the server.
+"""
+
+from dash_tooltip.edits import edit_ids
+from dash_tooltip.state import SESSION_STORE_ID
+
+
+def test_records_follow_tooltips(make_manager, click, new_figure) -> None:
+    manager = make_manager("graph28a", sync_edits=True, repeat_click="toggle")
+    records = manager.graphs["graph28a"].records
+    fig = new_figure()
+    for i in range(3):
+        fig = manager.handle_click("graph28a", click(i), fig).to_plotly_json()
+    names = [a["name"] for a in fig["layout"]["annotations"]]
+    assert list(records.annotations) == names
+    assert (
+        records.annotations[names[0]]["text"] == fig["layout"]["annotations"][0]["text"]
+    )
+
+    manager.handle_click("graph28a", click(1), fig)
+    manager.remove_tooltips("graph28a", [names[2]])
+    assert list(records.annotations) == [names[0]]
+
+
+def test_apply_edits(make_manager, click, new_figure) -> None:
+    manager = make_manager("graph28b", sync_edits=True)
+    fig = manager.handle_click("graph28b", click(0), new_figure())
+    name = fig.layout.annotations[0].name
+
+    changed = manager.apply_edits(
+        "graph28b",
+        {name: {"ax": -40, "text": "peak", "visible": False}, "unknown": {"ax": 1}},
+    )
+    record = manager.graphs["graph28b"].records.annotations[name]
+    assert changed == 1
+    assert (record["ax"], record["text"]) == (-40, "peak")
+    assert "visible" not in record
+    assert manager.apply_edits("graph28b", None) == 0
+
+
+def test_layout_and_callbacks(make_manager, click, new_figure) -> None:
+    manager = make_manager("graph28c", sync_edits=True)
+    ids = edit_ids()
+    assert manager.app.layout[ids["records"]].data is None
+
+    manager.handle_click("graph28c", click(2), new_figure(), session="a")
+    manager.handle_click("graph28c", click(0), new_figure(), session="b")
+    records = manager.session_records("a")
+    assert list(records) == ["graph28c"]
+    assert list(records["graph28c"]) == ["dash-tooltip-0-2"]
+    assert manager.session_records("c") == {}, "Sessions only get their own records."
+
+    server = [
+        c for c in manager.app.callback_map.values() if c.get("callback") is not None
+    ]
+    sync = [
+        c for c in server if c["inputs"] == [{"id": ids["edits"], "property": "data"}]
+    ]
+    assert len(sync) == 1
+    assert sync[0]["state"] == [{"id": SESSION_STORE_ID, "property": "data"}]
+    sent = [
+        key
+        for key, c in manager.app.callback_map.items()
+        if c["inputs"] == [{"id": SESSION_STORE_ID, "property": "data"}]
+    ]
+    assert sent == [f"{ids['records']}.data"]
+    assert any(
+        (c.get("clientside_function") or {}).get("function_name") == "collectEdits"
+        and c["output"].split("@")[0] == f"{ids['edits']}.data"
+        for c in manager.app._callback_list
+    )
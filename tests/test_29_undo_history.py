@@ -0,0 +1,166 @@
+"""
+Test 29: Undo, Redo, Clear and Hide
+===================================
+
+Description:
+------------
+Tooltip operations are kept per graph and browser session in a bounded ring
+buffer, and undone, redone, cleared or hidden with minimal figure patches. This
+test suite checks that:
+
+1. **History Test:**
+    `OperationHistory` forgets the oldest operations beyond its size, and the
+    oldest live annotations beyond its annotation size; a new operation clears
+    the redo stack.
+
+2. **Undo Test:**
+    `undo` and `redo` delete and re-append the tooltips of the last operations,
+    including removals, as `Patch` operations.
+
+3. **Clear Test:**
+    `clear_tooltips` removes every tooltip as one undoable operation, and
+    `set_visible` only sets the visibility of the tooltips.
+
+4. **Controls Test:**
+    `tooltip_controls` buttons in the layout get a server callback for undo,
+    redo and clear, with the figure and the session, and a clientside one for
+    hiding.
+
+5. **Session Test:**
+    Each browser session has its own history and index: undoing in one session
+    only deletes its own tooltip, found by name in its figure, and the least
+    recently used session is forgotten beyond `max_sessions`.
+"""
+
+import pytest
+
+from dash_tooltip.history import OperationHistory, control_ids
+from dash_tooltip.state import SESSION_STORE_ID
+
+
+def _operations(patch):
+    return [
+        (op["operation"], op["location"]) for op in patch.to_plotly_json()["operations"]
+    ]
+
+
+@pytest.fixture
+def clicked(click, new_figure):
+    """Returns a function clicking ``points`` of a new figure in turn."""
+
+    def clicked(manager, graph_id: str, points):
+        fig = new_figure()
+        for i in points:
+            fig = manager.handle_click(graph_id, click(i), fig).to_plotly_json()
+        return fig
+
+    return clicked
+
+
+def test_bounded_history() -> None:
+    history = OperationHistory(size=2)
+    for i in range(3):
+        history.record("add", [(f"t{i}", {}, None)])
+    assert [op.tooltips[0][0] for op in history.done] == ["t1", "t2"]
+
+    assert history.undo().kind == "remove"
+    history.record("add", [("t3", {}, None)])
+    assert history.redo() is None
+    history.record("add", [])
+    assert len(history.done) == 2
+
+    history = OperationHistory(annotations_size=2)
+    for name in ("t0", "t1", "t0", "t2"):
+        history.remember(name, {})
+    assert list(history.annotations) == ["t0", "t2"]
+
+
+def test_undo_redo(make_manager, click, clicked) -> None:
+    manager = make_manager("graph29a", repeat_click="toggle")
+    fig = clicked(manager, "graph29a", [0, 1, 2])
+    annotations = fig["layout"]["annotations"]
+
+    # Toggling the second tooltip off, then undoing it, re-appends it
+    manager.handle_click("graph29a", click(1), fig)
+    patch = manager.undo("graph29a")
+    assert _operations(patch) == [("Append", ["layout", "annotations"])]
+    assert patch.to_plotly_json()["operations"][0]["params"]["value"] == annotations[1]
+
+    # Then the last click is undone, at the index position of its tooltip
+    assert _operations(manager.undo("graph29a")) == [
+        ("Delete", ["layout", "annotations", 1])
+    ]
+    assert _operations(manager.redo("graph29a")) == [
+        ("Append", ["layout", "annotations"])
+    ]
+    assert manager.graphs["graph29a"].click_index.position(annotations[2]["name"]) == 2
+
+
+def test_clear_and_hide(make_manager, clicked) -> None:
+    manager = make_manager("graph29b")
+    fig = clicked(manager, "graph29b", [0, 1])
+    fig["layout"]["annotations"].insert(0, {"text": "note"})
+
+    assert _operations(manager.clear_tooltips("graph29b", fig)) == [
+        ("Delete", ["layout", "annotations", 2]),
+        ("Delete", ["layout", "annotations", 1]),
+    ]
+    assert not manager.graphs["graph29b"].click_index.slots
+    assert len(_operations(manager.undo("graph29b"))) == 2
+    # The note stays first: the restored tooltips are back at 1 and 2
+    assert _operations(manager.undo("graph29b")) == [
+        ("Delete", ["layout", "annotations", 2])
+    ]
+
+    patch = manager.set_visible("graph29b", False)
+    assert _operations(patch) == [("Assign", ["layout", "annotations", 1, "visible"])]
+
+
+def test_controls(make_manager) -> None:
+    manager = make_manager("graph29c", controls=True)
+    ids = control_ids("graph29c")
+    server = [
+        c for c in manager.app.callback_map.values() if c.get("callback") is not None
+    ]
+    buttons = [
+        c
+        for c in server
+        if {i["id"] for i in c["inputs"]} == {ids["undo"], ids["redo"], ids["clear"]}
+    ]
+    assert len(buttons) == 1
+    assert buttons[0]["state"] == [
+        {"id": "graph29c", "property": "figure"},
+        {"id": SESSION_STORE_ID, "property": "data"},
+    ]
+    clientside = [
+        c
+        for c in manager.app.callback_map.values()
+        if c["inputs"] == [{"id": ids["hide"], "property": "n_clicks"}]
+    ]
+    assert len(clientside) == 1 and clientside[0].get("callback") is None
+
+
+def test_sessions(make_manager, click, new_figure) -> None:
+    manager = make_manager("graph29d", max_sessions=2)
+    fig_a = new_figure()
+    fig_a = manager.handle_click("graph29d", click(0), fig_a, session="a")
+    fig_a = fig_a.to_plotly_json()
+    fig_b = new_figure()
+    for i in (1, 2):
+        fig_b = manager.handle_click("graph29d", click(i), fig_b, session="b")
+        fig_b = fig_b.to_plotly_json()
+
+    # A note added by another callback shifts the tooltip of session a
+    fig_a["layout"]["annotations"].insert(0, {"text": "note"})
+    patch = manager.undo("graph29d", fig_a, session="a")
+    assert _operations(patch) == [("Delete", ["layout", "annotations", 1])]
+    assert _operations(manager.undo("graph29d", fig_a, session="a")) == []
+    state = manager.graphs["graph29d"]
+    assert len(state.session("b").history.done) == 2
+    assert list(state.session("b").click_index.slots) == [
+        a["name"] for a in fig_b["layout"]["annotations"]
+    ]
+
+    state.session("c")
+    assert list(state.sessions) == ["b", "c"]
+    assert not state.session("a").history.done
@@ -0,0 +1,171 @@
+"""
+Test 30: Linked Graphs
+======================
+
+Description:
+------------
+Graphs listed together in `link_groups` share their clicks: a click in one graph
+adds tooltips at the nearest x in every trace of the other graphs of the group,
+in a single callback. This test suite checks that:
+
+1. **Nearest Sample Test:**
+    `SortedX` finds the nearest sample of unsorted numeric and date x values
+    with a binary search, and `linked_points` handles implicit x values.
+
+2. **Linked Click Test:**
+    A click returns a `Patch` appending the new tooltips for the clicked graph
+    and for each linked graph.
+
+3. **Registration Test:**
+    A group gets one callback updating all its figures, and invalid groups are
+    rejected.
+
+4. **Link Cache Test:**
+    Each linked graph keeps the sorted x values of all its traces, so clicks on
+    graphs with more traces than the default cache size build them only once.
+
+5. **Concurrency Test:**
+    The caches and sessions shared by the callback threads stay consistent
+    when used from several threads at once.
+"""
+
+import copy
+import threading
+
+import pytest
+from dash import Dash, dcc, html
+
+from dash_tooltip import links, tooltip
+from dash_tooltip.indexing import IndexCache
+from dash_tooltip.links import SortedX, linked_points
+
+TIMES = ["2024-01-01 00:00", "2024-01-01 00:10", "2024-01-01 00:20"]
+
+FIGURES = {
+    "a": {
+        "data": [{"type": "scatter", "x": TIMES, "y": [1, 2, 3]}],
+        "layout": {},
+    },
+    "b": {
+        "data": [
+            {"type": "scatter", "x": TIMES[::-1], "y": [30, 20, 10]},
+            {"type": "scatter", "x": ["2024-01-01 00:12"], "y": [7]},
+        ],
+        "layout": {},
+    },
+}
+
+
+def _manager(prefix: str, **kwargs):
+    app = Dash(__name__)
+    app.layout = html.Div(
+        [dcc.Graph(id=prefix + key, figure=fig) for key, fig in FIGURES.items()]
+    )
+    graph_ids = [prefix + key for key in FIGURES]
+    return tooltip(app, graph_ids=graph_ids, link_groups=[graph_ids], **kwargs)
+
+
+def test_nearest_sample() -> None:
+    index = SortedX([5.0, 1.0, None, 3.0])
+    assert [index.nearest(x) for x in (0, 2.1, 3.9, 4.1, 9)] == [1, 3, 3, 0, 0]
+    assert SortedX(TIMES).nearest("2024-01-01 00:14") == 1
+    assert SortedX(["a", "b"]).nearest("a") is None
+
+    cache = IndexCache()
+    points = linked_points(FIGURES["b"], "2024-01-01 00:09", cache)
+    assert [(p["curveNumber"], p["pointNumber"]) for p in points] == [(0, 1), (1, 0)]
+    assert len(cache) == 2
+    linked_points(FIGURES["b"], "2024-01-01 00:19", cache)
+    assert len(cache) == 2, "Sorted x values are reused across clicks."
+
+    implicit = {"data": [{"type": "scatter", "y": [1, 2, 3], "x0": 10, "dx": 5}]}
+    assert linked_points(implicit, 21)[0]["pointNumber"] == 2
+
+
+def test_linked_click() -> None:
+    manager = _manager("graph30a")
+    figures = {
+        graph_id: copy.deepcopy(FIGURES[graph_id[-1]])
+        for graph_id in ("graph30aa", "graph30ab")
+    }
+    click = {"points": [{"curveNumber": 0, "pointNumber": 0, "x": TIMES[0], "y": 1}]}
+    updates = manager.handle_linked_click("graph30aa", click, figures)
+
+    operations = updates["graph30aa"].to_plotly_json()["operations"]
+    assert [op["operation"] for op in operations] == ["Append"]
+    assert operations[0]["params"]["value"]["y"] == 1
+    operations = updates["graph30ab"].to_plotly_json()["operations"]
+    assert [op["operation"] for op in operations] == ["Append", "Append"]
+    assert [op["params"]["value"]["y"] for op in operations] == [10, 7]
+
+
+def test_registration() -> None:
+    manager = _manager("graph30b")
+    linked = [
+        c
+        for c in manager.app.callback_map.values()
+        if {i["id"] for i in c["inputs"]} == {"graph30ba", "graph30bb"}
+    ]
+    assert len(linked) == 1
+    assert len(linked[0]["output"]) == 2  # one output per graph
+
+    app = Dash(__name__)
+    app.layout = html.Div([dcc.Graph(id="graph30c")])
+    with pytest.raises(ValueError):
+        tooltip(app, graph_ids=["graph30c"], link_groups=[["graph30c", "missing"]])
+
+
+def test_link_cache(monkeypatch) -> None:
+    built = []
+
+    class CountedSortedX(SortedX):
+        def __init__(self, values):
+            built.append(values)
+            super().__init__(values)
+
+    monkeypatch.setattr(links, "SortedX", CountedSortedX)
+    many = {
+        "data": [
+            {"type": "scatter", "x": [0, 1, 2], "y": [i, i + 1, i + 2]}
+            for i in range(40)
+        ],
+        "layout": {},
+    }
+    app = Dash(__name__)
+    app.layout = html.Div([dcc.Graph(id="graph30da"), dcc.Graph(id="graph30db")])
+    manager = tooltip(
+        app,
+        graph_ids=["graph30da", "graph30db"],
+        link_groups=[["graph30da", "graph30db"]],
+        repeat_click="add",
+    )
+    for x in (0, 2):
+        click = {"points": [{"curveNumber": 0, "pointNumber": x, "x": x, "y": x}]}
+        figures = {"graph30da": copy.deepcopy(many), "graph30db": copy.deepcopy(many)}
+        manager.handle_linked_click("graph30da", click, figures)
+    assert len(built) == 40, "Sorted x values are built once per trace."
+
+
+def test_concurrency() -> None:
+    app = Dash(__name__)
+    app.layout = html.Div([dcc.Graph(id="graph30e")])
+    manager = tooltip(app, graph_ids=["graph30e"], max_sessions=2)
+    state = manager.graphs["graph30e"]
+    cache = IndexCache(maxsize=2)
+    errors = []
+
+    def use(worker: int) -> None:
+        try:
+            for i in range(2000):
+                state.session(f"s{(worker + i) % 5}")
+                cache.get_or_build((worker + i) % 5, lambda: i)
+        except Exception as error:  # pragma: no cover - reported below
+            errors.append(error)
+
+    threads = [threading.Thread(target=use, args=(w,)) for w in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert len(state.sessions) == 2 and len(cache) == 2
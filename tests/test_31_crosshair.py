@@ -0,0 +1,100 @@
+"""
+Test 31: Crosshair Tooltips
+===========================
+
+Description:
+------------
+With `crosshair="nearest"` or `crosshair="interpolate"`, a click adds a single
+tooltip listing the value of every visible trace at the clicked x. This test
+suite checks that:
+
+1. **Index Test:**
+    `CrosshairIndex` groups traces sharing exactly equal x values, and returns
+    nearest or interpolated values, skipping NaNs and x values out of range.
+
+2. **Cache Test:**
+    The index of a figure is built once per data revision and reused across
+    clicks. Without a revision, it is keyed on the length and end samples of
+    each trace, which are read without looking at the other samples.
+
+3. **Tooltip Test:**
+    The default crosshair template lists the visible traces by name, and
+    invalid modes are rejected.
+"""
+
+import copy
+
+import numpy as np
+import pytest
+from dash import Dash, dcc, html
+
+from dash_tooltip import tooltip
+from dash_tooltip.crosshair import CrosshairIndex, crosshair_index
+from dash_tooltip.indexing import IndexCache
+
+FIGURE = {
+    "data": [
+        {"type": "scatter", "x": [0, 1, 2], "y": [0, 10, 20], "name": "a"},
+        {"type": "scatter", "x": [0, 1, 2], "y": [5, 5, None], "name": "b"},
+        {"type": "scatter", "x": [2, 0, 1], "y": [2, 0, 1], "name": "c"},
+        {"type": "scatter", "y": [1, 2, 3], "x0": 0.5, "visible": "legendonly"},
+    ],
+    "layout": {},
+}
+
+
+def test_index_values() -> None:
+    index = CrosshairIndex(FIGURE["data"])
+    assert len(index.groups) == 3
+    assert index.values(1.6) == [(0, 20.0), (2, 2.0), (3, 2.0)]
+    assert index.values(1.6, "interpolate") == pytest.approx(
+        [(0, 16.0), (2, 1.6), (3, 2.1)]
+    )
+    assert index.values(-1, "interpolate") == []
+    assert index.names[3] == "trace 3"
+
+
+def test_index_groups_equal_x_only() -> None:
+    x = np.arange(1000.0)
+    shifted = x.copy()
+    shifted[500] = 900.5
+    y = np.zeros(1000)
+    y[500] = 7.0
+    index = CrosshairIndex(
+        [{"x": x, "y": x, "name": "a"}, {"x": shifted, "y": y, "name": "b"}]
+    )
+    assert len(index.groups) == 2
+    assert index.values(500) == [(0, 500.0), (1, 0.0)]
+    assert index.values(900.5) == [(0, 900.0), (1, 7.0)]
+
+
+def test_cache_per_revision() -> None:
+    cache = IndexCache()
+    first = crosshair_index(FIGURE, cache)
+    assert crosshair_index(copy.deepcopy(FIGURE), cache) is first
+    assert crosshair_index(FIGURE, cache, ("g", 4, 1)) is not first
+    assert crosshair_index(FIGURE, cache, ("g", 4, 1)) is crosshair_index(
+        FIGURE, cache, ("g", 4, 1)
+    )
+
+    extended = copy.deepcopy(FIGURE)
+    extended["data"][0]["y"][-1] = 30
+    assert crosshair_index(extended, cache) is not first
+    # Values changed in place between the ends need a new datarevision
+    extended["data"][0]["y"][1] = 11
+    assert crosshair_index(extended, cache) is crosshair_index(extended, cache)
+
+
+def test_crosshair_tooltip() -> None:
+    app = Dash(__name__)
+    app.layout = html.Div([dcc.Graph(id="graph31a", figure=FIGURE)])
+    manager = tooltip(app, graph_ids=["graph31a"], crosshair="nearest")
+    click = {"points": [{"curveNumber": 0, "pointNumber": 1, "x": 1, "y": 10}]}
+    fig = manager.handle_click("graph31a", click, copy.deepcopy(FIGURE))
+
+    annotations = fig.layout.annotations
+    assert len(annotations) == 1
+    assert annotations[0].text == "x: 1<br>a: 10<br>b: 5<br>c: 1"
+
+    with pytest.raises(ValueError):
+        tooltip(app, graph_ids=["graph31a"], crosshair="all")
@@ -0,0 +1,107 @@
+"""
+Test 32: Window Statistics Placeholders
+=======================================
+
+Description:
+------------
+The `%{win.mean}`, `%{win.min}`, `%{win.max}`, `%{win.std}` and `%{win.count}`
+placeholders summarize the samples around the clicked one, within
+`stats_window` samples or `stats_dx` of x. This test suite checks that:
+
+1. **Statistics Test:**
+    `WindowStats` matches a direct NumPy computation for windows of samples,
+    including NaNs and unsorted x values, and the cached statistics of a trace
+    are rebuilt when any single value changes with the data revision.
+
+2. **Delta Test:**
+    Windows of ±Δx follow the x values, including dates with time deltas, and
+    an empty window has no statistics. Samples whose x is NaN are left out of
+    the windows of samples and of ±Δx.
+
+3. **Template Test:**
+    A click renders the placeholders in the tooltip text.
+"""
+
+import copy
+import datetime
+
+import numpy as np
+import pytest
+from dash import Dash, dcc, html
+
+from dash_tooltip import tooltip
+from dash_tooltip.indexing import IndexCache
+from dash_tooltip.window import WindowStats, window_stats
+
+
+def test_window_statistics() -> None:
+    rng = np.random.default_rng(32)
+    y = rng.normal(1e6, 10, 500)
+    y[[7, 40]] = np.nan
+    stats = WindowStats({"y": y})
+    for point_number, half in ((0, 5), (42, 3), (250, 100), (499, 1000)):
+        window = y[max(0, point_number - half) : point_number + half + 1]
+        result = stats.query(point_number, points=half)
+        assert result["count"] == np.count_nonzero(~np.isnan(window))
+        assert result["mean"] == pytest.approx(np.nanmean(window))
+        assert result["std"] == pytest.approx(np.nanstd(window), rel=1e-6)
+        assert (result["min"], result["max"]) == (np.nanmin(window), np.nanmax(window))
+
+    # Samples are taken in x order
+    reversed_trace = {"x": np.arange(500)[::-1], "y": y[::-1]}
+    assert window_stats(reversed_trace, 499 - 42, points=3)["max"] == pytest.approx(
+        stats.query(42, points=3)["max"]
+    )
+
+
+def test_cache_follows_any_changed_value() -> None:
+    y = [0.0] * 1000
+    cache = IndexCache()
+    assert window_stats({"y": y}, 500, 3, cache=cache, revision=1)["mean"] == 0.0
+    y[502] = 7.0
+    stats = window_stats({"y": y}, 500, 3, cache=cache, revision=2)
+    assert (stats["mean"], stats["max"], stats["count"]) == (1.0, 7.0, 7)
+
+
+def test_delta_windows() -> None:
+    trace = {"x": [0.0, 0.5, 1.0, 3.0, 3.2], "y": [1, 2, 3, 4, 5]}
+    assert window_stats(trace, 1, dx=0.5)["count"] == 3
+    assert window_stats(trace, 3, dx=0.25)["mean"] == pytest.approx(4.5)
+
+    dates = {"x": ["2024-01-01", "2024-01-02", "2024-01-05"], "y": [1, 2, 3]}
+    assert window_stats(dates, 1, dx=datetime.timedelta(days=1))["count"] == 2
+
+    empty = window_stats({"y": [np.nan, np.nan]}, 0, points=1)
+    assert empty == {"mean": None, "min": None, "max": None, "std": None, "count": 0}
+
+    cache = IndexCache()
+    window_stats(trace, 0, points=1, cache=cache)
+    window_stats(trace, 4, points=2, cache=cache)
+    assert len(cache) == 1
+
+
+def test_nan_x() -> None:
+    trace = {"x": [0.0, np.nan, 1.0, 2.0, np.nan, 3.0], "y": [1, 50, 2, 3, 60, 4]}
+    # Only dx is given: the window follows the finite x values
+    stats = window_stats(trace, 2, dx=1.0)
+    assert (stats["count"], stats["mean"]) == (3, pytest.approx(2.0))
+    assert window_stats(trace, 5, points=1)["max"] == 4
+    assert window_stats(trace, 1, dx=1.0)["count"] == 0
+
+
+def test_placeholders() -> None:
+    figure = {
+        "data": [{"type": "scatter", "x": [0, 1, 2, 3], "y": [1, 5, 3, 7]}],
+        "layout": {},
+    }
+    app = Dash(__name__)
+    app.layout = html.Div([dcc.Graph(id="graph32a", figure=figure)])
+    manager = tooltip(
+        app,
+        graph_ids=["graph32a"],
+        template="%{win.mean:.1f} [%{win.min}, %{win.max}] n=%{win.count}",
+        stats_window=1,
+    )
+    click = {"points": [{"curveNumber": 0, "pointNumber": 1, "x": 1, "y": 5}]}
+    fig = manager.handle_click("graph32a", click, copy.deepcopy(figure))
+    assert fig.layout.annotations[0].text == "3.0 [1.0, 5.0] n=3"
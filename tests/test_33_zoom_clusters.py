@@ -0,0 +1,104 @@
+"""
+Test 33: Zoom-Level Clustering
+==============================
+
+Description:
+------------
+With `cluster_grid`, tooltips that share a cell of a grid over the visible axis
+ranges are replaced by a badge showing their count, and shown again when zooming
+in. This test suite checks that:
+
+1. **Range Index Test:**
+    `RangeIndex` keeps tooltips sorted by x as they are added and removed, and
+    finds the ones in an x range.
+
+2. **Relayout Test:**
+    `TooltipView.relayout` follows range, range item and autorange entries,
+    and ignores other relayout events.
+
+3. **Cluster Test:**
+    Zooming out clusters close tooltips into one badge trace, zooming in shows
+    them again, and removed tooltips leave the view.
+
+4. **Session Test:**
+    Badges and axis ranges are kept per browser session: a session only
+    clusters its own tooltips, and its zoom does not change the view of another.
+"""
+
+import copy
+
+from dash_tooltip.viewport import CLUSTER_UID_PREFIX, RangeIndex, TooltipView
+
+FIGURE = {
+    "data": [
+        {
+            "type": "scatter",
+            "mode": "markers",
+            "x": [0.0, 0.1, 0.2, 5.0, 9.0],
+            "y": [1.0, 1.1, 1.2, 5.0, 9.0],
+        }
+    ],
+    "layout": {},
+}
+
+
+def test_range_index() -> None:
+    index = RangeIndex()
+    for name, x in (("a", 3.0), ("b", 1.0), ("c", 3.0), ("d", 7.0)):
+        index.add(name, x)
+    assert index.names == ["b", "a", "c", "d"]
+    assert index.query(2.0, 3.0) == ["a", "c"]
+    index.remove("c", 3.0)
+    index.remove("missing", 3.0)
+    assert index.query(0.0, 10.0) == ["b", "a", "d"]
+
+
+def test_relayout() -> None:
+    view = TooltipView(grid=4)
+    assert view.relayout({"xaxis.range[0]": 2, "xaxis.range[1]": 1})
+    assert view.ranges == {"xaxis": (1.0, 2.0)}
+    assert view.relayout({"yaxis2.range": ["2024-01-01", "2024-01-02"]})
+    assert not view.relayout({"xaxis.range": [1, 2], "annotations[0].ax": 10})
+    assert view.relayout({"xaxis.autorange": True})
+    assert list(view.ranges) == ["yaxis2"]
+
+
+def test_clusters(make_manager, click) -> None:
+    manager = make_manager("graph33a", FIGURE, cluster_grid=4)
+    fig = copy.deepcopy(FIGURE)
+    for i in range(5):
+        fig = manager.handle_click("graph33a", click(i, FIGURE), fig).to_plotly_json()
+    names = [a["name"] for a in fig["layout"]["annotations"]]
+
+    wide = {"xaxis.range": [0, 10], "yaxis.range": [0, 10]}
+    changes = manager.update_view("graph33a", wide)
+    assert changes["hide"] == sorted(names[:3])
+    (badges,) = changes["traces"]
+    assert badges["uid"].startswith(CLUSTER_UID_PREFIX)
+    assert badges["text"] == ["3"]
+    assert manager.update_view("graph33a", wide) is None
+
+    changes = manager.update_view("graph33a", {"xaxis.range": [0, 0.3]})
+    assert changes["show"] == sorted(names[:3]) and changes["traces"] == []
+
+    manager.update_view("graph33a", wide)
+    manager.remove_tooltips("graph33a", [names[0]])
+    changes = manager.update_view("graph33a", {"yaxis.range": [0, 9.5]})
+    assert changes["hide"] == [] and changes["traces"][0]["text"] == ["2"]
+
+
+def test_sessions(make_manager, click) -> None:
+    manager = make_manager("graph33b", FIGURE, cluster_grid=4)
+    figures = {"a": copy.deepcopy(FIGURE), "b": copy.deepcopy(FIGURE)}
+    for session, points in (("a", range(3)), ("b", [0, 3])):
+        for i in points:
+            figures[session] = manager.handle_click(
+                "graph33b", click(i, FIGURE), figures[session], session=session
+            ).to_plotly_json()
+
+    wide = {"xaxis.range": [0, 10], "yaxis.range": [0, 10]}
+    changes = manager.update_view("graph33b", wide, "a")
+    assert changes["traces"][0]["text"] == ["3"]
+    changes = manager.update_view("graph33b", wide, "b")
+    assert changes["hide"] == [] and changes["traces"] == []
+    assert manager.update_view("graph33b", wide, "a") is None
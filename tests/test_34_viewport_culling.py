@@ -0,0 +1,123 @@
+"""
+Test 34: Viewport Culling
+=========================
+
+Description:
+------------
+With `cull_margin`, the figure only holds the tooltips within the visible axis
+ranges plus a margin; the others are kept on the server and added back when they
+come into view. This test suite checks that:
+
+1. **View Test:**
+    `TooltipView` removes the tooltips leaving the widened ranges and adds back
+    the ones coming into view, hidden when they belong to a cluster.
+
+2. **Culling Test:**
+    Zooming and panning remove and add tooltips, the click index follows the
+    browser, and culled tooltips can still be removed and cleared.
+
+3. **Option Test:**
+    A negative margin is rejected.
+
+4. **Session Test:**
+    Each browser session has its own view: the tooltips culled in one session
+    are never added to the figure of another, and a view forgets its oldest
+    tooltips beyond its size.
+"""
+
+import copy
+
+import pytest
+
+from dash_tooltip.viewport import TooltipView
+
+FIGURE = {
+    "data": [
+        {
+            "type": "scatter",
+            "mode": "markers",
+            "x": [0.0, 1.0, 2.0, 50.0, 51.0, 99.0],
+            "y": [0.0, 1.0, 2.0, 3.0, 4.0, 5.0],
+        }
+    ],
+    "layout": {},
+}
+
+
+def test_view_culling() -> None:
+    view = TooltipView(grid=2, margin=0.5)
+    for name, x in (("a", 0.0), ("b", 0.1), ("c", 5.0), ("d", 20.0)):
+        view.add(name, {"name": name, "x": x, "y": 0.0})
+
+    view.relayout({"xaxis.range": [0, 4]})
+    changes = view.update()
+    assert changes["remove"] == ["d"] and changes["add"] == []
+    assert changes["hide"] == ["a", "b"]
+    assert view.culled() == ["d"]
+
+    # Back into view, with the cluster it falls into
+    view.relayout({"xaxis.range": [18, 22]})
+    changes = view.update()
+    assert changes["remove"] == ["a", "b", "c"]
+    assert [a["name"] for a in changes["add"]] == ["d"]
+    assert changes["show"] == [] and changes["hide"] == []
+
+    view.add("e", {"name": "e", "x": 20.5, "y": 0.0})
+    view.relayout({"xaxis.range": [-2, 2]})
+    changes = view.update()
+    assert changes["remove"] == ["d", "e"]
+    added = {a["name"]: a for a in changes["add"]}
+    assert set(added) == {"a", "b"}
+    assert added["a"]["visible"] is False and "visible" not in view.points["a"][3]
+
+
+def test_culling(make_manager, click) -> None:
+    manager = make_manager("graph34a", FIGURE, cull_margin=0.1)
+    fig = copy.deepcopy(FIGURE)
+    for i in range(6):
+        fig = manager.handle_click("graph34a", click(i, FIGURE), fig).to_plotly_json()
+    names = [a["name"] for a in fig["layout"]["annotations"]]
+    state = manager.graphs["graph34a"]
+
+    changes = manager.update_view("graph34a", {"xaxis.range": [0, 10]})
+    assert changes["remove"] == sorted(names[3:]) and changes["add"] == []
+    assert sorted(state.click_index.slots) == sorted(names[:3])
+    assert state.click_index.position(names[2]) == 2
+
+    changes = manager.update_view("graph34a", {"xaxis.range": [45, 55]})
+    assert [a["name"] for a in changes["add"]] == names[3:5]
+    assert state.click_index.position(names[4]) == 1
+
+    # Culled tooltips are only known to the server, and can still be removed
+    manager.remove_tooltips("graph34a", [names[0]])
+    assert names[0] not in state.view.points
+    manager.clear_tooltips("graph34a")
+    assert state.view.points == {} and state.history.annotations == {}
+    manager.undo("graph34a")
+    assert len(state.history.annotations) == 5
+
+
+def test_invalid_margin(make_manager) -> None:
+    with pytest.raises(ValueError):
+        make_manager("graph34b", FIGURE, cull_margin=-0.5)
+
+
+def test_sessions(make_manager, click) -> None:
+    manager = make_manager("graph34c", FIGURE, cull_margin=0.1)
+    fig = copy.deepcopy(FIGURE)
+    fig = manager.handle_click("graph34c", click(4, FIGURE), fig, session="a")
+    name = fig.layout.annotations[0].name
+    changes = manager.update_view("graph34c", {"xaxis.range": [0, 10]}, "a")
+    assert changes["remove"] == [name]
+
+    changes = manager.update_view("graph34c", {"xaxis.range": [45, 55]}, "b")
+    assert changes["add"] == [] and changes["remove"] == []
+    assert manager.graphs["graph34c"].session("b").view.points == {}
+    changes = manager.update_view("graph34c", {"xaxis.range": [45, 55]}, "a")
+    assert [a["name"] for a in changes["add"]] == [name]
+
+    view = TooltipView(margin=0.1, size=2)
+    for name, x in (("a", 0.0), ("b", 1.0), ("a", 2.0), ("c", 3.0)):
+        view.add(name, {"name": name, "x": x, "y": 0.0})
+    assert list(view.points) == ["a", "c"]
+    assert view.indices[("x", "y")].names == ["a", "c"]
@@ -0,0 +1,115 @@
+"""
+Test 35: Server-Side Figure Cache
+=================================
+
+Description:
+------------
+With `figure_cache`, the traces of the figures returned by the click callback are
+cached on the server, and clicks send their key and the layout instead of the
+whole figure. This test suite checks that:
+
+1. **Cache Test:**
+    `FigureCache` returns the cached traces by graph and key, and evicts the
+    least recently used ones.
+
+2. **Click Test:**
+    A click sent with a key adds the tooltip to the cached traces and the sent
+    layout, and a click sent with the figure is cached for the next one.
+
+3. **Session Test:**
+    Each session keeps only its last figure per graph, so one session clicking
+    many times does not evict the figures of the others.
+
+4. **Miss Test:**
+    An unknown key sends the click back as a miss, for the browser to send the
+    figure.
+
+5. **Callback Test:**
+    The click callback is registered on the request store instead of the graph
+    click data.
+"""
+
+import copy
+
+from dash import no_update
+
+from dash_tooltip.figures import FigureCache, figure_ids
+
+FIGURE = {
+    "data": [{"type": "scatter", "x": [0, 1, 2], "y": [3, 4, 5]}],
+    "layout": {"xaxis": {"range": [0, 2]}},
+}
+
+
+def test_cache() -> None:
+    cache = FigureCache(2)
+    first = cache.put("g", [{"type": "scatter"}])
+    second = cache.put("g", [])
+    assert cache.get("other", first) is None
+    assert cache.get("g", first) == [{"type": "scatter"}]
+    cache.put("g", [])
+    assert cache.get("g", second) is None and len(cache) == 2
+
+
+def test_cached_clicks(make_manager, click) -> None:
+    manager = make_manager("graph35a", FIGURE, figure_cache=4)
+
+    request = {"clickData": click(0, FIGURE), "figure": copy.deepcopy(FIGURE)}
+    fig, cached = manager.handle_cached_click("graph35a", request)
+    assert len(fig["layout"]["annotations"]) == 1
+
+    # The browser zoomed: its layout is used with the cached traces
+    layout = copy.deepcopy(fig["layout"])
+    layout["xaxis"]["range"] = [0.5, 1.5]
+    request = {"clickData": click(1, FIGURE), "key": cached["key"], "layout": layout}
+    fig, cached = manager.handle_cached_click("graph35a", request)
+    assert len(fig["layout"]["annotations"]) == 2
+    assert tuple(fig["layout"]["xaxis"]["range"]) == (0.5, 1.5)
+    assert tuple(fig["data"][0]["y"]) == (3, 4, 5)
+    assert manager.figure_cache.get("graph35a", cached["key"]) is fig["data"]
+    assert len(manager.figure_cache) == 1, "The previous figure is replaced."
+
+
+def test_one_figure_per_session(make_manager, click) -> None:
+    manager = make_manager("graph35d", FIGURE, figure_cache=4, repeat_click="toggle")
+    request = {"clickData": click(0, FIGURE), "figure": copy.deepcopy(FIGURE)}
+    _, other = manager.handle_cached_click("graph35d", request)
+
+    # Another session clicks more often than the cache size
+    request = {"clickData": click(0, FIGURE), "figure": copy.deepcopy(FIGURE)}
+    _, cached = manager.handle_cached_click("graph35d", request)
+    for _ in range(16):
+        request = {"clickData": click(1, FIGURE), "key": cached["key"], "layout": {}}
+        _, cached = manager.handle_cached_click("graph35d", request)
+    assert len(manager.figure_cache) == 2
+    assert manager.figure_cache.get("graph35d", other["key"]) is not None
+
+    # A figure uploaded again replaces the one under the key sent with it
+    request = {
+        "clickData": click(2, FIGURE),
+        "figure": copy.deepcopy(FIGURE),
+        "key": cached["key"],
+    }
+    manager.handle_cached_click("graph35d", request)
+    assert manager.figure_cache.get("graph35d", cached["key"]) is None
+    assert len(manager.figure_cache) == 2
+
+
+def test_cache_miss(make_manager, click) -> None:
+    manager = make_manager("graph35b", FIGURE, figure_cache=4)
+    request = {"clickData": click(2, FIGURE), "key": "evicted", "layout": {}}
+    update, cached = manager.handle_cached_click("graph35b", request)
+    assert update is no_update and cached == {"miss": click(2, FIGURE)}
+
+
+def test_callbacks(make_manager) -> None:
+    app = make_manager("graph35c", FIGURE, figure_cache=4).app
+    ids = figure_ids()
+    assert {ids["request"], ids["key"]} <= {i for i in app.layout if isinstance(i, str)}
+    inputs = [
+        callback["inputs"]
+        for callback in app.callback_map.values()
+        if "callback" in callback
+    ]
+    assert [{"id": ids["request"], "property": "data"}] in inputs
+    assert [{"id": "graph35c", "property": "clickData"}] not in inputs
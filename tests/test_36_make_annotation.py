@@ -0,0 +1,72 @@
+"""
+Test 36: Annotation-Only API
+============================
+
+Description:
+------------
+`make_annotation` and `make_annotations` compute tooltip annotations from click
+data without building a figure, for apps that update their figures themselves.
+This test suite checks that:
+
+1. **Annotation Test:**
+    The annotation of a click matches the one the click callback adds to the
+    figure, and the click data is left untouched.
+
+2. **Batch Test:**
+    `make_annotations` annotates every point of a click with the axes, name and
+    templates of its trace, and converts coordinates on log axes.
+"""
+
+import copy
+
+from dash import Dash, dcc, html
+
+from dash_tooltip import make_annotation, make_annotations, tooltip
+from dash_tooltip.style import TooltipStyle
+from dash_tooltip.utils import TraceTemplates
+
+FIGURE = {
+    "data": [
+        {"type": "scatter", "x": [1, 2, 3], "y": [4, 5, 6], "name": "a"},
+        {"type": "scatter", "x": [1, 10, 100], "y": [1, 2, 3], "xaxis": "x2"},
+    ],
+    "layout": {"xaxis2": {"type": "log"}},
+}
+
+
+def _point(curve_number: int, point_number: int):
+    trace = FIGURE["data"][curve_number]
+    return {
+        "curveNumber": curve_number,
+        "pointNumber": point_number,
+        "x": trace["x"][point_number],
+        "y": trace["y"][point_number],
+    }
+
+
+def test_make_annotation() -> None:
+    app = Dash(__name__)
+    app.layout = html.Div([dcc.Graph(id="graph36a", figure=FIGURE)])
+    manager = tooltip(app, graph_ids=["graph36a"], template="%{name}: %{y}")
+    click = {"points": [_point(0, 1)]}
+    fig = manager.handle_click("graph36a", copy.deepcopy(click), copy.deepcopy(FIGURE))
+
+    expected = fig.layout.annotations[0].to_plotly_json()
+    annotation = make_annotation(click, FIGURE["data"][0], "%{name}: %{y}")
+    assert annotation == expected
+    assert click == {"points": [_point(0, 1)]}
+    assert make_annotation({"points": []}) is None
+
+
+def test_make_annotations() -> None:
+    click = {"points": [_point(0, 0), _point(1, 2)]}
+    templates = TraceTemplates("y=%{y}", {"a": "a=%{y}"})
+    style = TooltipStyle({"font": {"size": 20}})
+    annotations = make_annotations(
+        click, FIGURE["data"], templates, style, log_axes=("x2",)
+    )
+    assert [a["text"] for a in annotations] == ["a=4", "y=3"]
+    assert [(a["xref"], a["yref"]) for a in annotations] == [("x", "y"), ("x2", "y")]
+    assert annotations[1]["x"] == 2.0
+    assert annotations[0]["font"]["size"] == 20
+    assert annotations[0]["name"] != annotations[1]["name"]
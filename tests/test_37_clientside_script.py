@@ -0,0 +1,154 @@
+"""
+Test 37: Clientside Script
+==========================
+
+Description:
+------------
+The clientside callbacks are served as one static, fingerprinted script instead
+of inline code per graph, with their settings in a single store. This test
+suite checks that:
+
+1. **Script Test:**
+    The index page loads the fingerprinted script, served with a long-lived
+    cache, and embeds no inline callback code.
+
+2. **Callback Test:**
+    Every clientside callback refers to a function of the script, and the
+    number of callbacks, not their code, grows with the number of graphs.
+
+3. **Config Test:**
+    The config store holds the shared constants once and the settings of each
+    graph, such as `debug`.
+
+4. **Format Test:**
+    The hover preview, run by Node.js when it is installed, formats numbers
+    like the Python templates, including the general format and invalid specs.
+"""
+
+import json
+import os
+import re
+import shutil
+import subprocess
+
+import pytest
+from dash import Dash, dcc, html
+
+import dash_tooltip
+from dash_tooltip import tooltip, tooltip_controls
+from dash_tooltip.clientside import CONFIG_STORE_ID, NAMESPACE, SCRIPT
+from dash_tooltip.utils import CompiledTemplate
+
+# Runs the preview of one hovered point per template, in a stub browser window
+PREVIEW_RUNNER = """
+const [script, cases] = process.argv.slice(1);
+global.window = {dash_clientside: {callback_context: {inputs_list: [{id: "g"}]}}};
+require(script);
+const preview = window.dash_clientside.dash_tooltip.previewHover;
+const texts = JSON.parse(cases).map(([template, value]) => preview(
+    {points: [{curveNumber: 0, v: value}]}, null, null,
+    {g: {names: {}, indices: {}, default: template}}
+)[2][0]);
+console.log(JSON.stringify(texts));
+"""
+
+FORMAT_CASES = [
+    (1234567, "g"),
+    (1234567.5, "g"),
+    (123456.0, "g"),
+    (0.0001, "g"),
+    (0.00001234, "+.2g"),
+    (100.5, ".0g"),
+    (9.99, ".2g"),
+    (1234567.5, ",G"),
+    (0, "g"),
+    (1234.56, ".4"),
+    (123.4, ".5"),
+    (0.5, ".1"),
+    (1e16 + 2, ""),
+    (1e-5, ""),
+    (0.1, ".17"),
+    (12345678.9, ",.3f"),
+    (1234567, ","),
+    (0.25, ".1%"),
+    (1234.5, ".2E"),
+    (-2.5, " .1f"),
+    (2.5, "d"),
+    (5, ".3"),
+    (5, "s"),
+    (7, "x"),
+    (2.5, None),
+]
+
+
+def _app(graph_ids):
+    app = Dash(__name__)
+    children = []
+    for graph_id in graph_ids:
+        children += [dcc.Graph(id=graph_id), tooltip_controls(graph_id)]
+    app.layout = html.Div(children)
+    return app
+
+
+def test_static_script() -> None:
+    app = _app(["graph37a"])
+    tooltip(app, graph_ids=["graph37a"], hover_preview=True, sync_edits=True)
+    client = app.server.test_client()
+    page = client.get("/").get_data(as_text=True)
+    (url,) = [
+        src
+        for src in re.findall(r'src="([^"]+)"', page)
+        if f"/_dash-component-suites/{NAMESPACE}/" in src
+    ]
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.cache_control.max_age == 31536000
+    assert app._inline_scripts == []
+
+
+def test_clientside_functions() -> None:
+    with open(os.path.join(os.path.dirname(dash_tooltip.__file__), SCRIPT)) as f:
+        defined = set(re.findall(r"^        (\w+): function\(", f.read(), re.M))
+    app = _app(["graph37b", "graph37c"])
+    tooltip(
+        app,
+        graph_ids=["graph37b", "graph37c"],
+        debug=True,
+        hover_enrich=lambda graph_id, point: None,
+        sync_edits=True,
+        coalesce_clicks=True,
+        cluster_grid=4,
+    )
+    clientside = [c for c in app._callback_list if c.get("clientside_function")]
+    used = [c["clientside_function"] for c in clientside]
+    assert {f["namespace"] for f in used} == {NAMESPACE}
+    assert {f["function_name"] for f in used} <= defined
+    counts = [
+        sum(any(graph_id in i["id"] for i in c["inputs"]) for c in clientside)
+        for graph_id in ("graph37b", "graph37c")
+    ]
+    assert counts[0] == counts[1]
+    # Shared: the view update, the restored records and the session
+    assert len(used) - sum(counts) == 3
+
+    config = app.layout[CONFIG_STORE_ID].data
+    assert config["graphs"]["graph37b"] == {"debug": True, "throttle": 150}
+    assert set(config["graphs"]) == {"graph37b", "graph37c"}
+    assert "annotationPrefix" in config["constants"]
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="Node.js is not installed")
+def test_format_parity() -> None:
+    templates = [
+        "%{v}" if spec is None else f"%{{v:{spec}}}" for _, spec in FORMAT_CASES
+    ]
+    cases = [[t, value] for t, (value, _) in zip(templates, FORMAT_CASES)]
+    script = os.path.join(os.path.dirname(dash_tooltip.__file__), SCRIPT)
+    output = subprocess.run(
+        ["node", "-e", PREVIEW_RUNNER, script, json.dumps(cases)],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    expected = [CompiledTemplate(t).render({"v": value}) for t, value in cases]
+    assert json.loads(output) == expected
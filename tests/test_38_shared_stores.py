@@ -0,0 +1,169 @@
+"""
+Test 38: Shared Stores
+======================
+
+Description:
+------------
+The tooltip stores are shared by all the graphs, their data naming or keyed by
+graph, so the layout does not grow with the number of graphs. This test suite
+checks that:
+
+1. **Store Count Test:**
+    An app with 50 graphs has as many stores as an app with one graph, and
+    the per-graph data, such as the settings and templates, is keyed by graph.
+
+2. **Layout Test:**
+    Stores are added to layouts whose children are a single component, and
+    stores already in the layout are reused. `add_annotation_store` returns
+    the shared store, and warns that its ``graph_id`` argument is deprecated.
+
+3. **Dispatch Test:**
+    Tooltips deleted in one graph are removed from that graph only, by one
+    server callback shared by the graphs.
+
+4. **Managers Test:**
+    Calling `tooltip` twice on one app registers the callbacks whose outputs
+    are only shared stores once, and they serve the graphs of both managers.
+"""
+
+import copy
+import json
+from typing import Optional
+
+import pytest
+from dash import Dash, dcc, html
+
+from dash_tooltip import tooltip
+from dash_tooltip.clientside import CONFIG_STORE_ID
+from dash_tooltip.edits import edit_ids
+from dash_tooltip.hover import preview_ids
+from dash_tooltip.utils import REMOVE_STORE_ID, add_annotation_store, add_stores
+from dash_tooltip.viewport import view_ids
+
+FIGURE = {"data": [{"type": "scatter", "x": [0, 1, 2], "y": [3, 4, 5]}]}
+
+
+def _stores(app: Dash):
+    return [child for child in app.layout.children if isinstance(child, dcc.Store)]
+
+
+@pytest.fixture
+def manager_of(make_manager):
+    """Returns a function making a manager of ``graph_ids`` using every store."""
+
+    def manager_of(graph_ids):
+        return make_manager(
+            graph_ids,
+            FIGURE,
+            hover_enrich=lambda graph_id, point: None,
+            coalesce_clicks=True,
+            sync_edits=True,
+            cluster_grid=8,
+        )
+
+    return manager_of
+
+
+def test_store_count(manager_of) -> None:
+    one = manager_of(["graph38a"]).app
+    many = manager_of([f"graph38b-{i}" for i in range(50)]).app
+    assert len(_stores(many)) == len(_stores(one))
+
+    config = many.layout[CONFIG_STORE_ID].data
+    assert len(config["graphs"]) == 50
+    templates = many.layout[preview_ids("graph38b-0")["templates"]].data
+    assert set(templates) == set(config["graphs"])
+
+
+def test_layout_children() -> None:
+    app = Dash(__name__)
+    app.layout = html.Div(dcc.Graph(id="graph38c"))
+    tooltip(app, graph_ids=["graph38c"])
+    assert isinstance(app.layout.children, list)
+    assert app.layout[REMOVE_STORE_ID].data is None
+
+    existing = dcc.Store(id="graph38c-store")
+    layout = html.Div((existing,))
+    stores = add_stores(layout, {"graph38c-store": {}, "graph38c-other": None})
+    assert stores["graph38c-store"] is existing and existing.data == {}
+    assert len(layout.children) == 2
+
+    assert add_annotation_store(layout) == REMOVE_STORE_ID
+    with pytest.warns(DeprecationWarning, match="graph_id"):
+        assert add_annotation_store(layout, "graph38c") == REMOVE_STORE_ID
+    assert len(layout.children) == 3
+
+
+def _post(app: Dash, input_id: str, value, session: Optional[str] = None):
+    """
+    Runs the server callback on the shared store ``input_id`` with ``value``, in
+    the browser ``session``.
+    """
+    key, callback = next(
+        (key, value)
+        for key, value in app.callback_map.items()
+        if value["inputs"] == [{"id": input_id, "property": "data"}]
+        and "callback" in value
+    )
+    outputs = [
+        {"id": graph_id, "property": prop.split("@")[0]}
+        for graph_id, prop in (o.strip(".").split(".", 1) for o in key.split("..."))
+    ]
+    return app.server.test_client().post(
+        "/_dash-update-component",
+        json={
+            "output": key,
+            "outputs": outputs if key.startswith("..") else outputs[0],
+            "inputs": [{"id": input_id, "property": "data", "value": value}],
+            "changedPropIds": [f"{input_id}.data"],
+            "state": [dict(state, value=session) for state in callback["state"]],
+        },
+    )
+
+
+def test_dispatch(manager_of, click) -> None:
+    graph_ids = ["graph38d", "graph38e"]
+    manager = manager_of(graph_ids)
+    app = manager.app
+    for graph_id in graph_ids:
+        manager.handle_click(graph_id, click(1, FIGURE), copy.deepcopy(FIGURE))
+    name = list(manager.graphs["graph38e"].records.annotations)[0]
+
+    removal = {"graph": "graph38e", "ids": [name], "names": [name]}
+    response = _post(app, REMOVE_STORE_ID, removal)
+    assert response.status_code == 200
+    updated = json.loads(response.data)["response"]
+    assert list(updated) == ["graph38e"]
+    assert manager.graphs["graph38d"].records.annotations
+    assert not manager.graphs["graph38e"].records.annotations
+
+
+def test_managers_of_one_app(click) -> None:
+    app = Dash(__name__)
+    app.layout = html.Div([dcc.Graph(id="graph38f"), dcc.Graph(id="graph38g")])
+    managers = [
+        tooltip(
+            app,
+            graph_ids=[graph_id],
+            hover_enrich=lambda graph_id, point: graph_id,
+            sync_edits=True,
+            cluster_grid=8,
+        )
+        for graph_id in ("graph38f", "graph38g")
+    ]
+    outputs = [key.split("@")[0] for key in app.callback_map]
+    for store_id in (edit_ids()["ack"], view_ids()["view"], "tooltip-enriched"):
+        assert outputs.count(f"{store_id}.data") == 1
+
+    # The callback registered once serves the graphs of both managers
+    for manager, graph_id in zip(managers, ("graph38f", "graph38g")):
+        manager.handle_click(graph_id, click(1, FIGURE), copy.deepcopy(FIGURE))
+        name = list(manager.graphs[graph_id].records.annotations)[0]
+        edits = {"graph": graph_id, "edits": {name: {"text": "moved"}}}
+        response = _post(app, edit_ids()["edits"], edits)
+        assert json.loads(response.data)["response"] == {edit_ids()["ack"]: {"data": 1}}
+        assert manager.graphs[graph_id].records.annotations[name]["text"] == "moved"
+        hover = {"graph": graph_id, "point": {"curveNumber": 0, "pointNumber": 1}}
+        response = _post(app, "tooltip-hover", hover)
+        enriched = json.loads(response.data)["response"]["tooltip-enriched"]["data"]
+        assert enriched["text"] == graph_id
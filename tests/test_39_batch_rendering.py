@@ -0,0 +1,97 @@
+"""
+Test 39: Batch Rendering
+========================
+
+Description:
+------------
+`render_batch` writes figures with their saved tooltips to HTML or JSON files
+across a process pool, without a Dash app. This test suite checks that:
+
+1. **Annotation Test:**
+    Saved points are annotated like clicks, with the template, style and log
+    axis fix, and saved annotation records are appended as they are.
+
+2. **Serial Test:**
+    With one process, the JSON files are written in job order and the report
+    counts them.
+
+3. **Pool Test:**
+    Figure factories are built and rendered to HTML in worker processes, in
+    chunks.
+
+4. **Validation Test:**
+    Unknown formats and duplicated job names are rejected.
+"""
+
+import json
+import os
+
+import plotly.graph_objects as go
+import pytest
+
+from dash_tooltip import BatchJob, annotate_figure, render_batch
+from dash_tooltip.utils import make_annotations
+
+FIGURE = {
+    "data": [{"type": "scatter", "x": [1, 10, 100], "y": [3, 4, 5], "name": "s"}],
+    "layout": {"xaxis": {"type": "log"}},
+}
+POINT = {"curveNumber": 0, "pointNumber": 2, "x": 100, "y": 5}
+
+
+def _factory() -> go.Figure:
+    return go.Figure(FIGURE)
+
+
+def test_annotate_figure() -> None:
+    record = {"name": "tooltip-saved", "text": "kept", "x": 0, "y": 0}
+    figure = annotate_figure(
+        FIGURE, [POINT, record], "%{name}: %{y}", {"font": {"size": 9}}
+    )
+    saved, clicked = figure["layout"]["annotations"]
+    assert saved == record
+    assert (
+        clicked
+        == make_annotations(
+            {"points": [POINT]},
+            FIGURE["data"],
+            "%{name}: %{y}",
+            {"font": {"size": 9}},
+            ("x",),
+        )[0]
+    )
+    assert clicked["text"] == "s: 5" and clicked["x"] == 2
+    assert "annotations" not in FIGURE["layout"], "The given figure is unchanged."
+
+
+def test_serial_json(tmp_path) -> None:
+    jobs = [
+        BatchJob(f"figure{i}", FIGURE, {"points": [dict(POINT, pointNumber=i)]})
+        for i in range(3)
+    ]
+    report = render_batch(jobs, str(tmp_path), fmt="json", processes=1)
+    assert report.count == 3 and report.processes == 1
+    assert report.paths == [str(tmp_path / f"figure{i}.json") for i in range(3)]
+    with open(report.paths[0]) as file:
+        assert len(json.load(file)["layout"]["annotations"]) == 1
+
+
+def test_process_pool(tmp_path) -> None:
+    jobs = [BatchJob(f"page{i}", _factory, [POINT]) for i in range(4)]
+    report = render_batch(
+        jobs, str(tmp_path), processes=2, chunksize=1, include_plotlyjs=False
+    )
+    assert report.processes == 2 and report.chunksize == 1
+    assert [os.path.basename(path) for path in report.paths] == [
+        f"page{i}.html" for i in range(4)
+    ]
+    with open(report.paths[3]) as file:
+        assert "x: 100" in file.read()
+    assert report.throughput > 0
+
+
+def test_validation(tmp_path) -> None:
+    with pytest.raises(ValueError, match="Invalid format"):
+        render_batch([], str(tmp_path), fmt="png")
+    with pytest.raises(ValueError, match="Invalid job name"):
+        render_batch([BatchJob("a", FIGURE), BatchJob("a", FIGURE)], str(tmp_path))
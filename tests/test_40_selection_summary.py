@@ -0,0 +1,121 @@
+"""
+Test 40: Selection Summary
+==========================
+
+Description:
+------------
+With `selection_template`, a box or lasso selection gets one summary annotation
+with the `sel.*` statistics of each selected trace, computed with NumPy over the
+full-resolution data. This test suite checks that:
+
+1. **Box Test:**
+    The statistics of a box selection cover every sample within the range,
+    including samples missing from `selectedData`, and skip gaps.
+
+2. **Lasso Test:**
+    Samples inside a lasso polygon are selected, and those of its bounding box
+    outside the polygon are not.
+
+3. **Summary Test:**
+    The template is rendered for each trace with selected samples, and the
+    summary is placed at their centroid; dates are summarized as dates.
+
+4. **Callback Test:**
+    The summary replaces the previous one, and is removed when the selection is
+    cleared.
+"""
+
+import numpy as np
+from dash import Dash, dcc, html
+
+from dash_tooltip import tooltip
+from dash_tooltip.selection import (
+    SELECTION_NAME,
+    SELECTION_STORE_ID,
+    selection_stats,
+    summarize_selection,
+)
+
+X = np.arange(1000, dtype=float)
+FIGURE = {
+    "data": [
+        {"type": "scattergl", "x": X, "y": X * 2, "name": "double"},
+        {"type": "scattergl", "x": X, "y": -X, "name": "negative"},
+    ],
+    "layout": {},
+}
+BOX = {"range": {"x": [10, 19], "y": [0, 100]}}
+
+
+def test_box_stats() -> None:
+    y = X * 2
+    y[15] = np.nan
+    stats = selection_stats({"x": X, "y": y}, BOX)
+    assert stats == {
+        "count": 9,
+        "x_min": 10.0,
+        "x_max": 19.0,
+        "mean": float(np.mean([20, 22, 24, 26, 28, 32, 34, 36, 38])),
+        "min": 20.0,
+        "max": 38.0,
+    }
+    assert selection_stats({"x": X, "y": y, "xaxis": "x2"}, BOX) is None
+
+
+def test_lasso_stats() -> None:
+    # A triangle: (0, 0), (100, 0), (0, 100)
+    lasso = {"lassoPoints": {"x": [0, 100, 0], "y": [0, 0, 100]}}
+    x, y = np.meshgrid(np.arange(101.0) + 0.5, np.arange(101.0) + 0.5)
+    stats = selection_stats({"x": x.ravel(), "y": y.ravel()}, lasso)
+    assert stats["count"] == 100 * 99 / 2
+    assert stats["max"] == 98.5
+
+
+def test_summary() -> None:
+    annotation = summarize_selection(
+        FIGURE, BOX, "%{name}: %{sel.count} mean %{sel.mean:.1f}"
+    )
+    assert annotation["text"] == "double: 10 mean 29.0"
+    assert annotation["name"] == SELECTION_NAME
+    assert (annotation["x"], annotation["y"]) == (14.5, 29.0)
+
+    lines = summarize_selection(FIGURE, {"range": {"x": [10, 19]}}, "%{name}")
+    assert lines["text"] == "double<br>negative"
+
+    dates = {
+        "data": [{"x": ["2024-01-01", "2024-01-02", "2024-01-03"], "y": [1, 2, 3]}],
+        "layout": {"yaxis": {"type": "log"}},
+    }
+    box = {"range": {"x": ["2024-01-01 12:00", "2024-01-03"]}}
+    annotation = summarize_selection(dates, box, "%{sel.x_min:%d/%m}")
+    assert annotation["text"] == "02/01"
+    assert annotation["x"] == "2024-01-02 12:00:00"
+    assert annotation["y"] == np.log10(2.5)
+    assert summarize_selection(dates, {"range": {"x": [0, 1]}}) is None
+
+
+def test_callbacks() -> None:
+    app = Dash(__name__)
+    app.layout = html.Div([dcc.Graph(id="graph40a")])
+    manager = tooltip(app, graph_ids=["graph40a"], selection_template="%{sel.count}")
+    assert app.layout[SELECTION_STORE_ID].data is None
+
+    figure = {"data": FIGURE["data"], "layout": {"annotations": [{"text": "a"}]}}
+    patch = manager.handle_selection("graph40a", dict(BOX, figure=figure))
+    (operation,) = patch._operations
+    assert operation["operation"] == "Append"
+    assert operation["params"]["value"]["text"] == "10"
+
+    figure["layout"]["annotations"].append(operation["params"]["value"])
+    patch = manager.handle_selection(
+        "graph40a", {"range": {"x": [0, 4]}, "curves": [1], "figure": figure}
+    )
+    (operation,) = patch._operations
+    assert operation["operation"] == "Assign"
+    assert operation["location"] == ["layout", "annotations", 1]
+    assert operation["params"]["value"]["text"] == "5"
+
+    patch = manager.handle_selection("graph40a", {"figure": figure})
+    (operation,) = patch._operations
+    assert operation["operation"] == "Delete"
+    assert operation["location"] == ["layout", "annotations", 1]
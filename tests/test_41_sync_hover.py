@@ -0,0 +1,94 @@
+"""
+Test 41: Synced Hover Templates
+===============================
+
+Description:
+------------
+With `sync_hover`, the tooltip templates are translated once into Plotly
+hovertemplates, set on the traces of the graph figures, so that hovering shows
+the tooltip text without server requests. This test suite checks that:
+
+1. **Translation Test:**
+    `%{name}` becomes `%{fullData.name}`, number formats are kept, date formats
+    use the `|` separator, and the trace name box is hidden.
+
+2. **Server Placeholder Test:**
+    Templates using placeholders computed by the server, or formats plotly.js
+    does not share, are not translated.
+
+3. **Registration Test:**
+    Each trace of the figure in the layout gets the hovertemplate of its own
+    tooltip template, and follows template updates.
+
+4. **Callback Figure Test:**
+    Figures built by the app's own callbacks can be synced, as dictionaries.
+"""
+
+import plotly.graph_objects as go
+import pytest
+from dash import Dash, dcc, html
+
+from dash_tooltip import tooltip
+from dash_tooltip.hover import hover_template
+
+
+def test_translation() -> None:
+    assert hover_template("x: %{x},<br>y: %{y}") == (
+        "x: %{x},<br>y: %{y}<extra></extra>"
+    )
+    assert hover_template("%{name}: %{y:,.2f} %{customdata[0]}") == (
+        "%{fullData.name}: %{y:,.2f} %{customdata[0]}<extra></extra>"
+    )
+    assert hover_template("%{x:%d/%m %Hh}") == "%{x|%d/%m %Hh}<extra></extra>"
+    assert hover_template("%{y:.1%}") == "%{y:.1%}<extra></extra>"
+    assert hover_template("%{y:.2f}") is hover_template("%{y:.2f}")
+
+
+def test_server_placeholders() -> None:
+    assert hover_template("%{crosshair}") is None
+    assert hover_template("%{y}<br>mean: %{win.mean:.2f}") is None
+    assert hover_template("%{sel.count}") is None
+    # Python-only formats
+    assert hover_template("%{y:_}") is None
+    assert hover_template("%{y:.2E}") is None
+
+
+def test_registration() -> None:
+    figure = go.Figure(
+        [
+            go.Scatter(y=[1, 2], name="a"),
+            go.Scatter(y=[3, 4], name="b", hovertemplate="%{y}"),
+            go.Scatter(y=[5, 6], name="c"),
+        ]
+    )
+    app = Dash(__name__)
+    app.layout = html.Div([dcc.Graph(id="graph41a", figure=figure)])
+    manager = tooltip(
+        app,
+        template="%{name}: %{y:.1f}",
+        graph_ids=["graph41a"],
+        trace_templates={"b": "b %{x}", 2: "%{win.mean}"},
+        stats_window=3,
+        sync_hover=True,
+    )
+    data = app.layout["graph41a"].figure.data
+    assert data[0].hovertemplate == "%{fullData.name}: %{y:.1f}<extra></extra>"
+    assert data[1].hovertemplate == "b %{x}<extra></extra>"
+    assert data[2].hovertemplate is None
+
+    manager.update_template("graph41a", "%{y:.3f}")
+    assert data[0].hovertemplate == "%{y:.3f}<extra></extra>"
+    assert data[1].hovertemplate == "b %{x}<extra></extra>"
+
+
+def test_callback_figure() -> None:
+    app = Dash(__name__)
+    app.layout = html.Div([dcc.Graph(id="graph41b")])
+    manager = tooltip(app, graph_ids=["graph41b"], sync_hover=True)
+    assert manager.sync_hover_templates("graph41b") is None
+
+    figure = {"data": [{"type": "scatter", "y": [1, 2]}], "layout": {}}
+    assert manager.sync_hover_templates("graph41b", figure) is figure
+    assert figure["data"][0]["hovertemplate"] == "x: %{x},<br>y: %{y}<extra></extra>"
+    with pytest.raises(ValueError, match="Invalid graph ID"):
+        manager.sync_hover_templates("graph41z", figure)